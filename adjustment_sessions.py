@@ -0,0 +1,175 @@
+"""Session-held adjustment conversations for consecutive instruction_adjustment rounds."""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+
+@dataclass
+class AdjustmentSession:
+    """
+    One runtime session's adjustment conversation and the instruction text it last produced.
+
+    After a first round only the produced text is kept; the conversation (messages) is held from
+    the first follow-up on, and is run on a pooled agent for each round rather than pinning one.
+    """
+
+    session_id: str
+    context_key: str
+    tier: str = "large"
+    instructions: str = ""
+    rounds: int = 0
+    messages: list = field(default_factory=list)
+    last_used: float = field(default_factory=time.monotonic)
+    busy: bool = False
+
+    def matches(self, current_instructions: str, context_key: str) -> bool:
+        """True if the caller is adjusting exactly what this conversation last produced, for the same context."""
+        return (
+            self.rounds > 0
+            and self.context_key == context_key
+            and _normalize_text(self.instructions) == _normalize_text(current_instructions)
+        )
+
+    def conversation_chars(self) -> int:
+        """Approximate size of the held conversation."""
+        return len(json.dumps(self.messages, default=str))
+
+
+def _normalize_text(text: str) -> str:
+    return (text or "").replace("\r\n", "\n").strip()
+
+
+def copy_conversation(messages: list) -> list:
+    """
+    Copy a held conversation for one round, so a failed or losing (hedged) round leaves it intact.
+
+    Messages and their content lists are copied; the content blocks are shared, as the round only
+    adds blocks (mark_cache_point, followup_prompt) and never changes existing ones.
+    """
+    return [{**message, "content": list(message.get("content", []))} for message in messages]
+
+
+def mark_cache_point(messages: list) -> None:
+    """
+    Move the prompt-cache point to the end of the conversation so far.
+
+    The next round's prompt then only adds the new feedback after a cached prefix. Earlier cache
+    points are removed because Bedrock allows only a few per request.
+    """
+    for message in messages:
+        message["content"] = [block for block in message.get("content", []) if "cachePoint" not in block]
+    if messages and messages[-1].get("content"):
+        messages[-1]["content"].append({"cachePoint": {"type": "default"}})
+
+
+def followup_prompt(messages: list, text: str):
+    """
+    Add the next round's text to the conversation so user and assistant turns keep alternating.
+
+    A structured-output round ends with a user toolResult turn and Bedrock rejects two user turns
+    in a row, so the text is appended to a trailing user turn (after its cache point) and the
+    returned prompt is empty. Otherwise the text itself is returned as the prompt.
+    """
+    if messages and messages[-1].get("role") == "user":
+        messages[-1]["content"].append({"text": text})
+        return []
+    return text
+
+
+class AdjustmentSessionStore:
+    """
+    Bounded LRU of adjustment sessions keyed by runtime session id.
+
+    Sessions idle longer than idle_seconds are evicted, at most max_sessions are kept (least
+    recently used goes first) and a conversation that grows past max_session_chars is dropped so
+    the next round starts fresh. A session is checked out by one request at a time.
+    """
+
+    def __init__(self, max_sessions: int, idle_seconds: float, max_session_chars: int):
+        """
+        Args:
+            max_sessions: Maximum sessions held.
+            idle_seconds: Idle time after which a session is evicted.
+            max_session_chars: Largest conversation (serialized characters) kept after a round.
+        """
+        self.max_sessions = max(1, int(max_sessions))
+        self.idle_seconds = idle_seconds
+        self.max_session_chars = max_session_chars
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+        self._evictions = {"idle": 0, "capacity": 0, "size": 0}
+        self._busy = 0
+
+    def checkout(self, session_id: str) -> tuple:
+        """
+        Take a session for the duration of one adjustment round.
+
+        Returns:
+            tuple: (session, state) where state is "held" (session returned), "new" (no session;
+                   session is None) or "busy" (another round is using it; session is None).
+        """
+        with self._lock:
+            self._evict_idle_locked(time.monotonic())
+            session = self._sessions.get(session_id)
+            if session is None:
+                return None, "new"
+            if session.busy:
+                self._busy += 1
+                return None, "busy"
+            session.busy = True
+            self._sessions.move_to_end(session_id)
+            return session, "held"
+
+    def checkin(self, session: AdjustmentSession) -> None:
+        """Store a session after a successful round, enforcing the size and count caps."""
+        oversized = session.conversation_chars() > self.max_session_chars
+        with self._lock:
+            session.busy = False
+            session.last_used = time.monotonic()
+            if oversized:
+                self._evictions["size"] += 1
+                self._sessions.pop(session.session_id, None)
+                return
+            self._sessions[session.session_id] = session
+            self._sessions.move_to_end(session.session_id)
+            while len(self._sessions) > self.max_sessions:
+                oldest_id = next((sid for sid, s in self._sessions.items() if not s.busy), None)
+                if oldest_id is None:
+                    break
+                del self._sessions[oldest_id]
+                self._evictions["capacity"] += 1
+
+    def discard(self, session: AdjustmentSession) -> None:
+        """Forget a session whose conversation can no longer be trusted (e.g. the round failed)."""
+        with self._lock:
+            if self._sessions.get(session.session_id) is session:
+                del self._sessions[session.session_id]
+
+    def clear(self) -> int:
+        """Drop all sessions; returns how many were held."""
+        with self._lock:
+            removed = len(self._sessions)
+            self._sessions.clear()
+            return removed
+
+    def _evict_idle_locked(self, now: float) -> None:
+        expired = [
+            sid for sid, s in self._sessions.items() if not s.busy and now - s.last_used > self.idle_seconds
+        ]
+        for sid in expired:
+            del self._sessions[sid]
+        self._evictions["idle"] += len(expired)
+
+    def stats(self) -> dict:
+        """Snapshot of session counters."""
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "conversations": sum(1 for s in self._sessions.values() if s.messages),
+                "max_sessions": self.max_sessions,
+                "busy_rejections": self._busy,
+                "evictions": dict(self._evictions),
+            }
@@ -1,10 +1,19 @@
 """Instruction builder agent for AWS Bedrock AgentCore deployment."""
 
+import asyncio
+import atexit
 import logging
+import os
+import time
 
 from bedrock_agentcore.runtime import BedrockAgentCoreApp
+from starlette.responses import JSONResponse
 
-from instruction_builder_agent import process_instruction_generation, process_instruction_adjustment
+from hedging import DeadlineExceeded, deadline_after_ms, time_left
+from instruction_store import InstructionStore
+from instruction_telemetry import configure_local_telemetry, record_request, set_attributes, stage, tracer
+from request_limiter import PRIORITY_HIGH, PRIORITY_LOW, PRIORITY_NORMAL, AdmissionRejected, InflightLimiter
+from single_flight import SingleFlight, payload_fingerprint
 
 logging.basicConfig(
     format="%(levelname)s | %(name)s | %(message)s",
@@ -12,14 +21,303 @@ logging.basicConfig(
     handlers=[logging.StreamHandler()],
 )
 
+configure_local_telemetry()
+
 app = BedrockAgentCoreApp()
 
+MAX_IN_FLIGHT = int(os.getenv("INSTRUCTION_MAX_IN_FLIGHT", "32"))
+# Requests waiting for a slot beyond this are rejected at once with a retry_after hint.
+MAX_QUEUE = int(os.getenv("INSTRUCTION_MAX_QUEUE", "64"))
+request_limiter = InflightLimiter(MAX_IN_FLIGHT, max_queue=MAX_QUEUE)
+# Queue priority per payload type: a clinician waiting on an adjustment goes before single
+# generations and refreshes, which go before batch jobs (shed first when the queue is full).
+ADMISSION_PRIORITIES = {
+    "instruction_adjustment": PRIORITY_HIGH,
+    "instruction_generation": PRIORITY_NORMAL,
+    "instruction_refresh": PRIORITY_NORMAL,
+    "instruction_generation_batch": PRIORITY_LOW,
+}
+
+COALESCING_ENABLED = os.getenv("INSTRUCTION_COALESCING_ENABLED", "true").lower() in ("1", "true", "yes")
+single_flight = SingleFlight()
+
+# Off unless a path is set; point it at a mounted volume to keep history across restarts.
+instruction_store = InstructionStore(
+    os.getenv("INSTRUCTION_STORE_PATH", ""),
+    queue_size=int(os.getenv("INSTRUCTION_STORE_QUEUE_SIZE", "1000")),
+)
+atexit.register(instruction_store.close)
+STORE_HISTORY_MAX = int(os.getenv("INSTRUCTION_STORE_HISTORY_MAX", "100"))
+
+WARMUP_ENABLED = os.getenv("INSTRUCTION_WARMUP_ENABLED", "true").lower() in ("1", "true", "yes")
+# Without warm-up there is nothing to wait for: the pipeline is set up by the first request.
+readiness = {"ready": True, "warm_up": "disabled"} if not WARMUP_ENABLED else {"ready": False, "warm_up": None}
+
+
+def pipeline():
+    """
+    The instruction pipeline module (strands, pydantic models, prompts), imported on first use.
+
+    Keeping it out of module import lets the runtime start listening sooner; warm_up() imports
+    it before the first request when the app is started directly.
+    """
+    import instruction_builder_agent
+
+    return instruction_builder_agent
+
+
+def streaming():
+    """The streaming pipeline module, imported on first use (see pipeline)."""
+    import instruction_streaming
+
+    return instruction_streaming
+
+
+def warm_up() -> dict:
+    """
+    Prepare for the first request before the app starts serving: import the pipeline, compile
+    the output schemas, pre-build pooled agents and open the model connection.
+
+    Failures are logged and reported rather than raised; the app still serves (and sets up
+    lazily) if a step fails, it just reports ready=false until a warm-up succeeds.
+
+    Returns:
+        dict: Warm-up report with per-step timings in ms (see warm_up_pipeline), or the error.
+    """
+    started = time.perf_counter()
+    with tracer.start_as_current_span("instruction_builder.warm_up") as span:
+        try:
+            builder = pipeline()
+            streaming()
+            import_ms = round((time.perf_counter() - started) * 1000, 1)
+            report = {"import_ms": import_ms, **builder.warm_up_pipeline()}
+        except Exception as e:
+            logging.error(f"Warm-up failed: {e}", exc_info=True)
+            report = {"error": str(e)}
+        report["total_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        set_attributes(span, ready="error" not in report, total_ms=report["total_ms"])
+    readiness.update(ready="error" not in report, warm_up=report)
+    logging.info(f"Warm-up finished in {report['total_ms']}ms: {report}")
+    return report
+
+
+async def ready(request):
+    """GET /ready: 200 once warm-up has finished (or when it is disabled), 503 before or if it failed."""
+    return JSONResponse(readiness, status_code=200 if readiness["ready"] else 503)
+
+
+app.add_route("/ready", ready, methods=["GET"])
+
+
+def _error(message: str, instructions: str = "") -> dict:
+    return {
+        "error": message,
+        "instructions": instructions,
+        "reasoning": "",
+    }
+
+
+def _rejected(error: AdmissionRejected, instructions: str = "") -> dict:
+    return {**_error(str(error), instructions), "retry_after": error.retry_after}
+
+
+def _priority(payload_type: str) -> int:
+    return ADMISSION_PRIORITIES.get(payload_type, PRIORITY_NORMAL)
+
+
+async def _stream_response(events, payload_type: str, started: float, payload: dict = None):
+    """
+    Relay streaming events, converting a mid-stream failure into a final error event.
+
+    The final result of a streamed generation or adjustment is recorded in the instruction store
+    like a non-streaming response.
+    """
+    outcome = "ok"
+    key = request_hash(payload) if payload is not None and instruction_store.enabled else None
+    try:
+        async with request_limiter.slot(_priority(payload_type)):
+            async for event in events:
+                if payload is not None and event.get("type") == "result":
+                    response = {k: v for k, v in event.items() if k != "type"}
+                    _record_stored(payload, payload_type.removeprefix("instruction_"), response, key=key)
+                yield event
+    except AdmissionRejected as e:
+        outcome = "rejected"
+        logging.warning(f"Rejected streaming {payload_type}: {e}")
+        yield {"type": "error", **_rejected(e)}
+    except Exception as e:
+        outcome = "error"
+        logging.error(f"Error streaming instruction builder payload: {e}", exc_info=True)
+        yield {"type": "error", **_error(str(e))}
+    finally:
+        record_request(payload_type, started, outcome)
+
+
+async def _run_limited(payload: dict, process, **kwargs):
+    """
+    Run a pipeline call under the in-flight limit at the payload type's priority, sharing the
+    result of an identical request that is already in progress (only the first of a set of
+    duplicates takes a slot).
+
+    Raises:
+        AdmissionRejected: If the wait queue is full.
+        DeadlineExceeded: If kwargs["deadline"] passed while waiting for a slot or in the model call.
+    """
+
+    async def run():
+        # The deadline budget includes queueing for a slot, not just the model call.
+        async with request_limiter.slot(_priority(payload.get("type")), kwargs.get("deadline")):
+            return await process(**kwargs)
+
+    if not COALESCING_ENABLED:
+        return await run()
+    key_fields = {**payload, "session_id": kwargs.get("session_id")}
+    key = payload_fingerprint(key_fields, ignore=("stream", "deadline_ms"))
+    return await single_flight.run(key, run, rerun=_rerun_after_deadline(kwargs.get("deadline")))
+
+
+def _rerun_after_deadline(deadline: float):
+    """
+    single_flight rerun predicate: deadline_ms is not part of the coalescing key, so a caller whose
+    own deadline has time left does not take over a result the leader lost to its deadline.
+    """
+
+    def rerun(outcome) -> bool:
+        if deadline is not None and time_left(deadline) <= 0:
+            return False
+        if isinstance(outcome, DeadlineExceeded):
+            return True
+        return isinstance(outcome, dict) and bool(outcome.get("deadline_exceeded") or outcome.get("degraded"))
+
+    return rerun
+
+
+def request_hash(payload: dict) -> str:
+    """
+    Hash of everything in a request that affects its result: the payload, the prompts, the model
+    routing (tiers and model ids) and the store generation, which cache_invalidate bumps.
+    """
+    fields = {
+        **payload,
+        "prompts": pipeline().PROMPTS_FINGERPRINT,
+        "models": pipeline().routing_config(),
+        "store_generation": instruction_store.generation,
+    }
+    return payload_fingerprint(fields, ignore=("stream", "deadline_ms"))
+
+
+def _record_stored(payload: dict, kind: str, response: dict, key: str = None) -> None:
+    """
+    Queue a successful, non-degraded response as the next version of the payload's procedure.
+
+    Pass the key hashed before the model call, so a response computed across an invalidation is
+    recorded under the generation it was computed for.
+    """
+    procedure_id = (payload.get("context") or {}).get("procedure_id")
+    if not instruction_store.enabled or procedure_id is None:
+        return
+    if "error" in response or response.get("degraded") or response.get("stored_version"):
+        return
+    key = key or request_hash(payload)
+    instruction_store.record(procedure_id, key, kind, response, message=payload.get("message"))
+
+
+async def _run_stored(payload: dict, kind: str, compute, deadline: float = None):
+    """
+    Answer a request that was already served for the same procedure from the instruction store,
+    or compute it and queue the response as the procedure's next version.
+    """
+    procedure_id = (payload.get("context") or {}).get("procedure_id")
+    if not instruction_store.enabled or procedure_id is None:
+        return await compute()
+    key = request_hash(payload)
+    with stage("instruction_store_lookup") as span:
+        stored = await asyncio.to_thread(instruction_store.latest, procedure_id, key)
+        set_attributes(span, hit=stored is not None)
+    if stored is not None:
+        return stored
+
+    async def compute_and_record():
+        response = await compute()
+        _record_stored(payload, kind, response, key=key)
+        return response
+
+    if not COALESCING_ENABLED:
+        return await compute_and_record()
+    # Concurrent duplicates are recorded as one version (and counted under "coalescing").
+    return await single_flight.run(f"store:{key}", compute_and_record, rerun=_rerun_after_deadline(deadline))
+
+
+def _as_int(value):
+    """`value` as an int (integral numbers and numeric strings), or None if it is not one."""
+    if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _history_limit(payload: dict):
+    """The history request's "limit" (20 if absent), or None if it is not a positive integer."""
+    limit = payload.get("limit")
+    if limit is None:
+        return 20
+    limit = _as_int(limit)
+    return limit if limit is not None and limit > 0 else None
+
+
+def validate_payload(payload) -> dict:
+    """
+    Check required fields for the payload type.
+
+    Returns:
+        dict | None: Error response, or None if the payload can be dispatched.
+    """
+    with stage("validate_payload"):
+        if not isinstance(payload, dict):
+            return _error("Payload must be a JSON object")
+        payload_type = payload.get("type")
+        if payload_type == "instruction_adjustment" and payload.get("message") is None:
+            return _error("Missing required field: message", payload.get("current_instructions", ""))
+        if payload_type == "instruction_generation_batch":
+            contexts = payload.get("contexts")
+            if not isinstance(contexts, list) or not contexts:
+                return _error("Missing required field: contexts (non-empty list)")
+            max_concurrency = payload.get("max_concurrency")
+            # Out-of-range values are clamped by the pipeline; only non-integers are refused.
+            if max_concurrency is not None and _as_int(max_concurrency) is None:
+                return _error("max_concurrency must be an integer")
+            max_items = pipeline().BATCH_MAX_ITEMS
+            if len(contexts) > max_items:
+                return _error(f"Too many contexts: {len(contexts)} (max {max_items})")
+        if payload_type == "get_instruction_history":
+            if payload.get("procedure_id") is None:
+                return _error("Missing required field: procedure_id")
+            if _history_limit(payload) is None:
+                return _error("limit must be a positive integer")
+        if payload_type == "instruction_refresh":
+            current_instructions = payload.get("current_instructions")
+            if not current_instructions:
+                return _error("Missing required field: current_instructions")
+            for field in ("old_days_post_op", "new_days_post_op"):
+                if pipeline().recovery_phase(payload.get(field)) is None:
+                    return _error(f"Missing or invalid field: {field} (non-negative integer)", current_instructions)
+        return None
+
 
 @app.entrypoint
-def invoke(payload):
+async def invoke(payload, context=None):
     """
     AgentCore entrypoint for the instruction builder agent.
 
+    Runs on the app's event loop; at most INSTRUCTION_MAX_IN_FLIGHT generation/adjustment
+    requests (each batch item counts as one) run at once. The rest wait in a queue of at most
+    INSTRUCTION_MAX_QUEUE, adjustments first, then generations and refreshes, then batches
+    (in arrival order within each). When the queue is full a request is rejected at once, or
+    a waiting lower-priority request is rejected to make room, with the standard error shape
+    plus "retry_after" (seconds).
+
     Expected payload structure:
 
     instruction_generation:
@@ -35,56 +333,263 @@ def invoke(payload):
             "patient_name": "Jane Doe",
             "doctor_name": "Dr. Smith",
             "procedure_history": [...]
-        }
+        },
+        "mode": "full"
     }
 
+    With "mode": "sectioned" each section (activity, wound care, medications, warning signs,
+    follow-up) is generated by its own concurrent model call and assembled in fixed order.
+
     instruction_adjustment:
     {
         "type": "instruction_adjustment",
         "message": "Add a note about avoiding stairs for 2 weeks",
         "current_instructions": "...",
+        "context": { ... },
+        "mode": "full"
+    }
+
+    With "mode": "patch" the model returns section-level edits (insert/replace/delete anchored on
+    section headings) that are applied locally; the response adds "edits", or "patch_fallback" if
+    the edits could not be applied and the instructions were fully regenerated instead.
+
+    Mechanical adjustments ("change X to Y", "remove the line about X", "add a note saying X")
+    that a local rule recognizes confidently are applied without a model call; the response then
+    carries "fast_path" with the rule name.
+
+    Full-mode adjustments under the same runtimeSessionId continue one conversation: once
+    current_instructions is what the previous round returned the conversation is held, and from
+    then on only the new message is sent and the earlier rounds come from the prompt cache;
+    otherwise everything is re-sent.
+
+    instruction_generation_batch (one generation per context, results in input order):
+    {
+        "type": "instruction_generation_batch",
+        "contexts": [{ ... }, { ... }],
+        "max_concurrency": 4
+    }
+
+    Non-streaming full-mode generation and adjustment accept
+    "deadline_ms", the caller's time budget including queueing. Model calls slower than recent
+    ones are hedged with a duplicate call; if the deadline is reached, generation returns the
+    cached or nearest precomputed instructions with "degraded": true (or, with none, an error with
+    "deadline_exceeded": true), and adjustment returns an error with the current instructions and
+    "deadline_exceeded": true. Time spent queued for an in-flight slot counts against the deadline.
+
+    With INSTRUCTION_STORE_PATH set, generation, adjustment and refresh responses for a context with
+    a procedure_id are kept as versions in the instruction store (streamed results and batch items
+    included); repeating the same non-streaming payload (e.g. a page re-render or a job retry) under
+    the same prompts and models returns the stored response with "stored_version" instead of
+    calling the model. Streams always run the model.
+
+    instruction_refresh (daily sweep as days_post_op advances):
+    {
+        "type": "instruction_refresh",
+        "current_instructions": "...",
+        "old_days_post_op": 3,
+        "new_days_post_op": 10,
         "context": { ... }
     }
 
+    If no recovery-phase boundary was crossed the instructions come back unchanged at once
+    ("unchanged": true, no model call); otherwise only the time-sensitive sections
+    (INSTRUCTION_REFRESH_SECTIONS) are updated from their current text, keeping clinician edits,
+    and the rest is kept verbatim.
+
+    get_instruction_history (stored versions for a procedure, newest first):
+    {
+        "type": "get_instruction_history",
+        "procedure_id": 1,
+        "limit": 20
+    }
+
+    Identical non-streaming generation/adjustment payloads that arrive while one is still running
+    share its result instead of calling the model again ("coalescing" in the metrics payload).
+    A caller that still has time left does not inherit a result the first one lost to its own
+    deadline_ms; it runs the request itself ("reruns").
+
+    Either single-item type accepts "stream": true. The response is then a server-sent event stream of
+    {"type": "chunk", "text": "..."} events as the model writes the instructions, ending with
+    {"type": "result", "instructions": str, "reasoning": str} (or {"type": "error", ...}).
+
+    metrics (pipeline counters for dashboards and load tests):
+    {
+        "type": "metrics"
+    }
+
+    health (readiness and warm-up timings, as served on GET /ready):
+    {
+        "type": "health"
+    }
+
+    cache_invalidate (drop cached instructions and stop serving stored versions after a prompt
+    or model change; the stored history is kept):
+    {
+        "type": "cache_invalidate"
+    }
+
+    Each invocation is traced as an instruction_builder.invoke span with child spans per stage
+    (validation, prompt build, agent construction, model call, parsing); see instruction_telemetry.
+
     Returns:
-        dict: {"instructions": str, "reasoning": str}
+        dict: {"instructions": str, "reasoning": str} ({"results": [...], "succeeded", "failed"} for
+              batches), or an async generator of events when streaming.
     """
-    try:
-        payload_type = payload.get("type")
-        context = payload.get("context") or {}
-
-        if payload_type == "instruction_generation":
-            logging.info("Processing instruction_generation")
-            return process_instruction_generation(context)
-        if payload_type == "instruction_adjustment":
-            message = payload.get("message")
-            current_instructions = payload.get("current_instructions", "")
-            if message is None:
-                return {
-                    "error": "Missing required field: message",
-                    "instructions": current_instructions,
-                    "reasoning": "",
-                }
-            logging.info("Processing instruction_adjustment")
-            return process_instruction_adjustment(
-                message=message,
-                current_instructions=current_instructions,
-                context=context,
-            )
+    started = time.perf_counter()
+    payload_type = payload.get("type") if isinstance(payload, dict) else None
+    with tracer.start_as_current_span("instruction_builder.invoke") as span:
+        set_attributes(span, payload_type=payload_type, stream=bool(payload_type and payload.get("stream")))
+        try:
+            response = await _dispatch(payload, started, getattr(context, "session_id", None))
+        except AdmissionRejected as e:
+            logging.warning(f"Rejected {payload_type}: {e}")
+            set_attributes(span, rejected=True, retry_after=e.retry_after)
+            record_request(payload_type, started, "rejected")
+            return _rejected(e, payload.get("current_instructions", ""))
+        except Exception as e:
+            logging.error(f"Error processing instruction builder payload: {e}", exc_info=True)
+            record_request(payload_type, started, "error")
+            return _error(str(e))
+    if isinstance(response, dict):
+        record_request(payload_type, started, "error" if "error" in response else "ok")
+    return response
 
-        return {
-            "error": f"Unknown or missing type: {payload_type}. Use 'instruction_generation' or 'instruction_adjustment'.",
-            "instructions": "",
-            "reasoning": "",
+
+async def _dispatch(payload, started: float, session_id: str = None):
+    """Validate the payload and route it to the matching pipeline."""
+    error = validate_payload(payload)
+    if error:
+        return error
+    payload_type = payload.get("type")
+    context = payload.get("context") or {}
+    stream = bool(payload.get("stream"))
+    deadline = deadline_after_ms(payload.get("deadline_ms"))
+
+    if payload_type == "instruction_generation":
+        logging.info("Processing instruction_generation")
+        if stream:
+            return _stream_response(
+                streaming().stream_instruction_generation(context), payload_type, started, payload
+            )
+        builder = pipeline()
+        if payload.get("mode") == "sectioned":
+            process, kwargs = builder.process_instruction_generation_sectioned_async, {"context": context}
+        else:
+            process, kwargs = builder.process_instruction_generation_async, {"context": context, "deadline": deadline}
+        return await _run_stored(
+            payload, "generation", lambda: _generate(payload, context, process, kwargs), deadline
+        )
+    if payload_type == "instruction_adjustment":
+        message = payload.get("message")
+        current_instructions = payload.get("current_instructions", "")
+        logging.info("Processing instruction_adjustment")
+        if stream:
+            return _stream_response(
+                streaming().stream_instruction_adjustment(
+                    message=message,
+                    current_instructions=current_instructions,
+                    context=context,
+                ),
+                payload_type,
+                started,
+                payload,
+            )
+        return await _run_stored(
+            payload, "adjustment", lambda: _adjust(payload, context, deadline, session_id), deadline
+        )
+    if payload_type == "instruction_refresh":
+        logging.info("Processing instruction_refresh")
+        kwargs = {
+            "current_instructions": payload["current_instructions"],
+            "old_days_post_op": payload["old_days_post_op"],
+            "new_days_post_op": payload["new_days_post_op"],
+            "context": context,
         }
-    except Exception as e:
-        logging.error(f"Error processing instruction builder payload: {e}", exc_info=True)
+        builder = pipeline()
+        if not builder.phases_crossed(payload["old_days_post_op"], payload["new_days_post_op"]):
+            # Nothing to regenerate: answer without queueing behind model calls.
+            return await builder.process_instruction_refresh_async(**kwargs)
+        return await _run_stored(
+            payload, "refresh", lambda: _run_limited(payload, builder.process_instruction_refresh_async, **kwargs)
+        )
+    if payload_type == "instruction_generation_batch":
+        contexts = payload["contexts"]
+        logging.info(f"Processing instruction_generation_batch ({len(contexts)} items)")
+        # Every item takes its own low-priority slot, so batches count against MAX_IN_FLIGHT per model call.
+        batch = await pipeline().process_instruction_generation_batch_async(
+            contexts,
+            max_concurrency=_as_int(payload.get("max_concurrency")),
+            item_slot=lambda: request_limiter.slot(_priority(payload_type)),
+        )
+        # Each item is recorded as the single generation it is equivalent to.
+        for item_context, result in zip(contexts, batch["results"]):
+            if isinstance(item_context, dict):
+                _record_stored({"type": "instruction_generation", "context": item_context}, "generation", result)
+        return batch
+    if payload_type == "get_instruction_history":
+        procedure_id = payload["procedure_id"]
+        limit = min(_history_limit(payload), STORE_HISTORY_MAX)
+        versions = await asyncio.to_thread(instruction_store.history, procedure_id, limit)
+        return {"procedure_id": str(procedure_id), "versions": versions, "count": len(versions)}
+    if payload_type == "health":
+        return dict(readiness)
+    if payload_type == "metrics":
         return {
-            "error": str(e),
-            "instructions": "",
-            "reasoning": "",
+            "metrics": {
+                "readiness": readiness,
+                **pipeline().get_pipeline_metrics(),
+                "requests": {**request_limiter.stats(), "priorities": ADMISSION_PRIORITIES},
+                "coalescing": single_flight.stats(),
+                "instruction_store": instruction_store.stats(),
+            }
         }
+    if payload_type == "cache_invalidate":
+        removed = pipeline().invalidate_instruction_cache()
+        generation = await asyncio.to_thread(instruction_store.invalidate)
+        logging.info(f"Invalidated instruction cache ({removed} entries), store generation {generation}")
+        return {"invalidated": removed, "store_generation": generation}
+
+    return _error(
+        f"Unknown or missing type: {payload_type}. Use 'instruction_generation' or 'instruction_adjustment'."
+    )
+
+
+async def _generate(payload: dict, context: dict, process, kwargs: dict):
+    """Run a non-streaming generation, serving a degraded answer if the deadline passes first."""
+    try:
+        return await _run_limited(payload, process, **kwargs)
+    except DeadlineExceeded as e:
+        fallback = pipeline().degraded_generation(context)
+        if fallback is None:
+            return {**_error(str(e)), "deadline_exceeded": True}
+        return fallback
+
+
+async def _adjust(payload: dict, context: dict, deadline: float, session_id: str):
+    """Run a non-streaming adjustment: fast path, patch mode, held session or full regeneration."""
+    message = payload.get("message")
+    current_instructions = payload.get("current_instructions", "")
+    builder = pipeline()
+    fast = builder.fast_path_adjustment(message, current_instructions)
+    if fast is not None:
+        return fast
+    kwargs = {"message": message, "current_instructions": current_instructions, "context": context}
+    if payload.get("mode") == "patch":
+        process = builder.process_instruction_patch_async
+    elif session_id and builder.ADJUSTMENT_SESSIONS_ENABLED:
+        process = builder.process_instruction_adjustment_session_async
+        kwargs["session_id"] = session_id
+        kwargs["deadline"] = deadline
+    else:
+        process = builder.process_instruction_adjustment_async
+        kwargs["deadline"] = deadline
+    try:
+        return await _run_limited(payload, process, **kwargs)
+    except DeadlineExceeded as e:
+        return {**_error(str(e), current_instructions), "deadline_exceeded": True}
 
 
 if __name__ == "__main__":
+    if WARMUP_ENABLED:
+        warm_up()
     app.run()
@@ -0,0 +1,342 @@
+"""Bounded pool of pre-built Strands agents that share one system prompt."""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Callable
+
+from strands.telemetry.metrics import EventLoopMetrics
+
+
+class AgentPoolExhausted(RuntimeError):
+    """Raised when no agent could be checked out before the timeout."""
+
+
+# Handed to a waiter instead of an agent when it may build one (an agent was discarded or a build failed).
+_BUILD = object()
+
+
+class _ThreadWaiter:
+    """A synchronous acquirer's place in the wait queue (async acquirers queue an asyncio future)."""
+
+    def __init__(self):
+        self.item = None
+        self.abandoned = False
+        self._event = threading.Event()
+
+    def done(self) -> bool:
+        return self.abandoned or self._event.is_set()
+
+    def set_result(self, item) -> None:
+        self.item = item
+        self._event.set()
+
+    def wait(self, timeout: float) -> None:
+        self._event.wait(timeout)
+
+
+class AgentPool:
+    """
+    Pool of reusable agents built by a single factory.
+
+    Agents are built lazily up to `size` and handed out LIFO so the most recently
+    used agent (and its warm model client) is reused first. Conversation state is
+    cleared on every return; an agent whose invocation raised is discarded and
+    rebuilt on demand instead of being returned to the pool.
+
+    When every agent is checked out, callers wait in one FIFO queue and a returned agent is
+    handed straight to the first of them. Like InflightLimiter, async callers wait on a future
+    of their own event loop, so a waiting request holds no thread.
+    """
+
+    def __init__(self, factory: Callable, size: int, name: str = "agents"):
+        """
+        Args:
+            factory: Zero-argument callable returning a new agent.
+            size: Maximum number of agents alive in this pool.
+            name: Label used in logs and metrics.
+        """
+        self.name = name
+        self.size = max(1, int(size))
+        self._factory = factory
+        self._idle = []
+        self._waiters = deque()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._checked_out = 0
+        self._checkouts = 0
+        self._waits = 0
+        self._wait_time = 0.0
+        self._builds = 0
+        self._build_time = 0.0
+        self._discarded = 0
+
+    def _build(self):
+        started = time.perf_counter()
+        agent = self._factory()
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self._builds += 1
+            self._build_time += elapsed
+        logging.info(f"Built agent for pool {self.name} in {elapsed * 1000:.1f}ms")
+        return agent
+
+    def _take_locked(self):
+        """An idle agent, _BUILD if one may be built, or None if the caller has to wait."""
+        if self._idle:
+            return self._idle.pop()
+        if self._created < self.size:
+            self._created += 1
+            return _BUILD
+        return None
+
+    def _handoff_locked(self, item) -> None:
+        """Give an agent (or permission to build one) to the first live waiter, else keep it."""
+        while self._waiters:
+            loop, waiter = self._waiters.popleft()
+            if waiter.done():
+                continue
+            if loop is None:
+                waiter.set_result(item)
+            else:
+                loop.call_soon_threadsafe(self._grant, waiter, item)
+            return
+        if item is _BUILD:
+            self._created -= 1
+        else:
+            self._idle.append(item)
+
+    def _grant(self, waiter, item) -> None:
+        if waiter.done():
+            # The waiter gave up after being picked; pass the agent on.
+            with self._lock:
+                self._handoff_locked(item)
+        else:
+            waiter.set_result(item)
+
+    def _build_failed(self) -> None:
+        with self._lock:
+            # Let the next waiter try, rather than leaving it to wait for a return that may never come.
+            self._handoff_locked(_BUILD)
+
+    def _checked_out_locked(self, agent):
+        self._checkouts += 1
+        self._checked_out += 1
+        return agent
+
+    def _wait_finished(self, started: float) -> None:
+        with self._lock:
+            self._waits += 1
+            self._wait_time += time.perf_counter() - started
+
+    def acquire(self, timeout: float = None):
+        """
+        Check out an agent, building one if the pool is below its size.
+
+        Args:
+            timeout: Seconds to wait for a free agent when the pool is exhausted (None waits forever).
+
+        Returns:
+            Agent: An agent with an empty conversation.
+
+        Raises:
+            AgentPoolExhausted: If no agent became free within `timeout`.
+        """
+        with self._lock:
+            item = self._take_locked()
+            if item is None:
+                waiter = _ThreadWaiter()
+                self._waiters.append((None, waiter))
+        if item is None:
+            started = time.perf_counter()
+            waiter.wait(timeout)
+            with self._lock:
+                if not waiter.done():
+                    waiter.abandoned = True
+                    self._waiters.remove((None, waiter))
+                item = waiter.item
+            self._wait_finished(started)
+            if item is None:
+                raise AgentPoolExhausted(f"No agent available in pool {self.name} after {timeout}s")
+        if item is _BUILD:
+            try:
+                item = self._build()
+            except BaseException:
+                self._build_failed()
+                raise
+        with self._lock:
+            return self._checked_out_locked(item)
+
+    async def acquire_async(self, timeout: float = None):
+        """
+        Async variant of `acquire` that never blocks the event loop.
+
+        An idle agent is handed out inline and a waiting caller awaits a future, so neither holds
+        a thread; only building a new agent (at most `size` times, plus rebuilds) runs in a worker
+        thread. A caller cancelled while waiting or building (a losing hedge, a deadline, a
+        disconnect) leaves the agent it would have received to the pool.
+        """
+        with self._lock:
+            item = self._take_locked()
+            if item is None:
+                loop = asyncio.get_running_loop()
+                waiter = loop.create_future()
+                self._waiters.append((loop, waiter))
+        if item is None:
+            item = await self._wait_async(loop, waiter, timeout)
+        if item is _BUILD:
+            item = await self._build_async()
+        with self._lock:
+            return self._checked_out_locked(item)
+
+    async def _wait_async(self, loop, waiter, timeout: float):
+        started = time.perf_counter()
+        try:
+            await asyncio.wait({waiter}, timeout=timeout)
+        except asyncio.CancelledError:
+            item = self._abandon(loop, waiter)
+            if item is not None:
+                # Handed over just as we were cancelled.
+                with self._lock:
+                    self._handoff_locked(item)
+            raise
+        finally:
+            self._wait_finished(started)
+        item = waiter.result() if waiter.done() else self._abandon(loop, waiter)
+        if item is None:
+            raise AgentPoolExhausted(f"No agent available in pool {self.name} after {timeout}s")
+        return item
+
+    def _abandon(self, loop, waiter):
+        """Leave the wait queue; returns the item if it was already handed to this waiter, else None."""
+        with self._lock:
+            try:
+                self._waiters.remove((loop, waiter))
+            except ValueError:
+                pass
+        # If a handoff is already scheduled, _grant sees the cancellation and passes the item on.
+        if waiter.cancel():
+            return None
+        return waiter.result()
+
+    async def _build_async(self):
+        future = asyncio.get_running_loop().run_in_executor(None, self._build)
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            # The build carries on in its thread; the agent goes to the pool when it is done.
+            future.add_done_callback(self._adopt_build)
+            raise
+        except BaseException:
+            self._build_failed()
+            raise
+
+    def _adopt_build(self, future) -> None:
+        if future.cancelled() or future.exception() is not None:
+            self._build_failed()
+            return
+        with self._lock:
+            self._handoff_locked(future.result())
+
+    def has_capacity(self) -> bool:
+        """True if an agent can be checked out without waiting (one is idle or can still be built)."""
+        with self._lock:
+            return bool(self._idle) or self._created < self.size
+
+    def release(self, agent, discard: bool = False) -> None:
+        """
+        Return an agent to the pool, handing it directly to the next waiter if there is one.
+
+        Args:
+            agent: Agent previously obtained from `acquire`.
+            discard: Drop the agent instead of reusing it (e.g. after a failed invocation).
+        """
+        if not discard:
+            try:
+                reset_agent(agent)
+            except Exception as e:
+                logging.warning(f"Discarding agent from pool {self.name}: reset failed: {e}")
+                discard = True
+        with self._lock:
+            self._checked_out -= 1
+            if discard:
+                self._discarded += 1
+                # The discarded agent's place goes to a waiter, which builds a replacement.
+                self._handoff_locked(_BUILD)
+            else:
+                self._handoff_locked(agent)
+
+    @contextmanager
+    def checkout(self, timeout: float = None):
+        """Context manager around `acquire`/`release`; discards the agent if the body raises."""
+        agent = self.acquire(timeout=timeout)
+        try:
+            yield agent
+        except BaseException:
+            self.release(agent, discard=True)
+            raise
+        self.release(agent)
+
+    @asynccontextmanager
+    async def acheckout(self, timeout: float = None):
+        """Async context manager around `acquire_async`/`release`; discards the agent if the body raises."""
+        agent = await self.acquire_async(timeout=timeout)
+        try:
+            yield agent
+        except BaseException:
+            self.release(agent, discard=True)
+            raise
+        self.release(agent)
+
+    def prewarm(self, count: int) -> int:
+        """
+        Build agents ahead of demand until `count` are alive (capped at the pool size).
+
+        Returns:
+            int: Number of agents built.
+        """
+        built = 0
+        while True:
+            with self._lock:
+                if self._created >= min(count, self.size):
+                    return built
+                self._created += 1
+            try:
+                agent = self._build()
+            except BaseException:
+                self._build_failed()
+                raise
+            with self._lock:
+                self._handoff_locked(agent)
+            built += 1
+
+    def stats(self) -> dict:
+        """Snapshot of pool counters."""
+        with self._lock:
+            return {
+                "size": self.size,
+                "created": self._created,
+                "idle": len(self._idle),
+                "checked_out": self._checked_out,
+                "waiting": sum(1 for _, waiter in self._waiters if not waiter.done()),
+                "checkouts": self._checkouts,
+                "waits": self._waits,
+                "wait_time_ms": round(self._wait_time * 1000, 3),
+                "builds": self._builds,
+                "build_time_ms": round(self._build_time * 1000, 3),
+                "discarded": self._discarded,
+            }
+
+
+def reset_agent(agent) -> None:
+    """
+    Clear conversation history, agent state and event loop metrics so the next checkout starts
+    from the system prompt only and nothing accumulates over the agent's lifetime.
+    """
+    agent.messages.clear()
+    for key in list(agent.state.get() or {}):
+        agent.state.delete(key)
+    agent.event_loop_metrics = EventLoopMetrics()
@@ -0,0 +1,449 @@
+"""Offline load benchmark of the AgentCore entrypoint against a local stub model (no Bedrock calls)."""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import re
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from strands.models.model import Model
+
+_SECTION_BODIES = (
+    ("ACTIVITY", "- Walk short distances several times a day.\n- Avoid lifting more than 10 pounds."),
+    ("WOUND CARE", "- Keep the incision clean and dry.\n- Change the dressing daily."),
+    ("MEDICATIONS", "- Take pain medication as prescribed.\n- Do not drive while taking opioids."),
+    ("WARNING SIGNS", "- Call [DOCTOR_NAME] for fever above 101F or increasing redness."),
+    ("FOLLOW-UP", "- Keep your follow-up appointment in two weeks."),
+)
+_SECTION_HEADINGS = re.compile(r"SECTION HEADINGS:\n- (.+)")
+# Default directory for results files; ignored by git.
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks", "results")
+
+
+class StubModel(Model):
+    """
+    Strands model that answers structured-output requests locally.
+
+    Simulates time to first token, a streaming token rate and injected failures so the
+    agent's own overhead and concurrency behaviour can be measured without Bedrock.
+    """
+
+    def __init__(
+        self,
+        latency_ms: float = 800.0,
+        tokens_per_second: float = 80.0,
+        output_tokens: int = 400,
+        failure_rate: float = 0.0,
+        seed: int = None,
+        tail_rate: float = 0.0,
+        tail_factor: float = 5.0,
+    ):
+        """
+        Args:
+            latency_ms: Delay before the first output token.
+            tokens_per_second: Output streaming rate (0 streams instantly).
+            output_tokens: Approximate size of generated instructions.
+            failure_rate: Probability (0-1) that a call raises instead of answering.
+            seed: Seed for failure and tail injection.
+            tail_rate: Probability (0-1) that a call is slow.
+            tail_factor: Time-to-first-token multiplier for slow calls.
+        """
+        self.config = {"model_id": "stub"}
+        self.latency_ms = latency_ms
+        self.tokens_per_second = tokens_per_second
+        self.output_tokens = output_tokens
+        self.failure_rate = failure_rate
+        self.tail_rate = tail_rate
+        self.tail_factor = tail_factor
+        self._rng = random.Random(seed)
+        self.calls = 0
+
+    def update_config(self, **model_config):
+        self.config.update(model_config)
+
+    def get_config(self):
+        return self.config
+
+    async def structured_output(self, output_model, prompt, system_prompt=None, **kwargs):
+        """Answer a direct structured-output request with the same scripted output as tool use."""
+        self.calls += 1
+        await asyncio.sleep(self.latency_ms / 1000)
+        if self.failure_rate and self._rng.random() < self.failure_rate:
+            raise RuntimeError("Injected stub model failure")
+        text = "".join(block.get("text", "") for block in prompt[-1]["content"]) if prompt else ""
+        yield {"output": output_model.model_validate_json(self._tool_input(output_model.__name__, text))}
+
+    def _tool_input(self, tool_name: str, prompt: str) -> str:
+        if tool_name == "InstructionPatchResponse":
+            match = _SECTION_HEADINGS.search(prompt)
+            anchor = match.group(1).strip() if match else "Activity"
+            edits = [{"operation": "replace", "anchor": anchor, "content": "- Avoid stairs for 2 weeks."}]
+            return json.dumps({"edits": edits, "reasoning": "Stub patch"})
+        text = "Hello [PATIENT_NAME],\n\n" + "\n\n".join(f"{h}:\n{b}" for h, b in _SECTION_BODIES)
+        target_chars = self.output_tokens * 4
+        while len(text) < target_chars:
+            text += "\n- Rest and follow the plan from [DOCTOR_NAME]."
+        return json.dumps({"instructions": text, "reasoning": "Stub instructions"})
+
+    async def stream(self, messages, tool_specs=None, system_prompt=None, **kwargs):
+        self.calls += 1
+        slow = self.tail_rate and self._rng.random() < self.tail_rate
+        await asyncio.sleep(self.latency_ms * (self.tail_factor if slow else 1) / 1000)
+        if self.failure_rate and self._rng.random() < self.failure_rate:
+            raise RuntimeError("Injected stub model failure")
+        prompt = "".join(block.get("text", "") for block in messages[-1]["content"])
+        input_tokens = (len(prompt) + len(system_prompt or "")) // 4
+        yield {"messageStart": {"role": "assistant"}}
+        if not tool_specs:
+            yield {"contentBlockDelta": {"delta": {"text": "Done."}}}
+            yield {"contentBlockStop": {}}
+            yield {"messageStop": {"stopReason": "end_turn"}}
+            yield {"metadata": {"usage": {"inputTokens": input_tokens, "outputTokens": 2, "totalTokens": input_tokens + 2}, "metrics": {"latencyMs": 0}}}
+            return
+        name = tool_specs[0]["name"]
+        body = self._tool_input(name, prompt)
+        yield {"contentBlockStart": {"start": {"toolUse": {"toolUseId": f"stub-{self.calls}", "name": name}}}}
+        chunk_chars = 80
+        for i in range(0, len(body), chunk_chars):
+            if self.tokens_per_second:
+                await asyncio.sleep(chunk_chars / 4 / self.tokens_per_second)
+            yield {"contentBlockDelta": {"delta": {"toolUse": {"input": body[i:i + chunk_chars]}}}}
+        yield {"contentBlockStop": {}}
+        yield {"messageStop": {"stopReason": "tool_use"}}
+        output_tokens = len(body) // 4
+        yield {
+            "metadata": {
+                "usage": {"inputTokens": input_tokens, "outputTokens": output_tokens, "totalTokens": input_tokens + output_tokens},
+                "metrics": {"latencyMs": int(self.latency_ms)},
+            }
+        }
+
+
+def load_payloads(paths: list) -> list:
+    """
+    Load benchmark cases from JSON lists (test_payloads.json format) or JSONL files.
+
+    Each item is either {"description", "payload"} or a bare payload with a "type".
+
+    Returns:
+        list: (description, payload) tuples.
+    """
+    cases = []
+    for path in paths:
+        with open(path) as f:
+            if path.endswith(".jsonl"):
+                items = [json.loads(line) for line in f if line.strip()]
+            else:
+                items = json.load(f)
+        for i, item in enumerate(items):
+            payload = item.get("payload", item) if isinstance(item, dict) else None
+            if not isinstance(payload, dict) or "type" not in payload:
+                continue
+            cases.append((item.get("description") or f"{os.path.basename(path)}:{i}", payload))
+    return cases
+
+
+async def run_case(invoke, payload: dict) -> dict:
+    """Invoke once, draining streamed responses; returns latency, time to first event and outcome."""
+    started = time.perf_counter()
+    first_ms = None
+    error = None
+    final = {}
+    try:
+        response = await invoke(payload)
+        if hasattr(response, "__aiter__"):
+            async for event in response:
+                if first_ms is None:
+                    first_ms = (time.perf_counter() - started) * 1000
+                if event.get("type") in ("result", "error"):
+                    final = event
+                    error = event.get("error")
+        elif isinstance(response, dict):
+            final = response
+            error = response.get("error")
+    except Exception as e:
+        error = str(e)
+    latency_ms = (time.perf_counter() - started) * 1000
+    return {
+        "type": payload.get("type"),
+        "latency_ms": latency_ms,
+        "first_event_ms": first_ms if first_ms is not None else latency_ms,
+        "error": error,
+        "model_tier": final.get("model_tier") or ("fast_path" if final.get("fast_path") else "none"),
+        "degraded": bool(final.get("degraded")),
+        "rejected": "retry_after" in final,
+    }
+
+
+async def run_load(invoke, cases: list, total: int, concurrency: int) -> tuple:
+    """Run `total` invocations cycling through cases with at most `concurrency` in flight."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        async with semaphore:
+            return await run_case(invoke, cases[i % len(cases)][1])
+
+    started = time.perf_counter()
+    records = await asyncio.gather(*(one(i) for i in range(total)))
+    return records, time.perf_counter() - started
+
+
+async def measure_allocations(invoke, cases: list, samples: int) -> dict:
+    """Sequentially invoke each case under tracemalloc; reports peak and retained bytes per request."""
+    peaks = []
+    retained = []
+    tracemalloc.start()
+    try:
+        for i in range(samples):
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            await run_case(invoke, cases[i % len(cases)][1])
+            current, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - before)
+            retained.append(current - before)
+    finally:
+        tracemalloc.stop()
+    return {
+        "samples": samples,
+        "peak_kb_mean": sum(peaks) / len(peaks) / 1024 if peaks else 0.0,
+        "peak_kb_max": max(peaks, default=0) / 1024,
+        "retained_kb_mean": sum(retained) / len(retained) / 1024 if retained else 0.0,
+    }
+
+
+def percentile(values: list, pct: float) -> float:
+    """Nearest-rank percentile of a list of numbers."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+
+def summarize(records: list, elapsed: float = None) -> dict:
+    """Throughput, latency percentiles and error count for a set of run_case records."""
+    latencies = [r["latency_ms"] for r in records]
+    first = [r["first_event_ms"] for r in records]
+    summary = {
+        "requests": len(records),
+        "errors": sum(1 for r in records if r["error"]),
+        "degraded": sum(1 for r in records if r.get("degraded")),
+        "rejected": sum(1 for r in records if r.get("rejected")),
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+        "max_ms": max(latencies, default=0.0),
+        "first_event_p50_ms": percentile(first, 50),
+    }
+    if elapsed is not None:
+        summary["elapsed_s"] = elapsed
+        summary["throughput_rps"] = len(records) / elapsed if elapsed else 0.0
+    return summary
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def results_path(filename: str) -> str:
+    """Default location for a benchmark results file: benchmarks/results/ in the repo (gitignored)."""
+    return os.path.join(RESULTS_DIR, filename)
+
+
+def print_comparison(results: dict, baseline_path: str) -> None:
+    """Print overall metric deltas against a previous results file."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"\nCompared with {baseline_path} ({baseline.get('git_revision') or '?'}):")
+    for key in ("throughput_rps", "p50_ms", "p95_ms", "p99_ms"):
+        old = baseline["overall"].get(key) or 0.0
+        new = results["overall"].get(key) or 0.0
+        change = f"{(new - old) / old * 100:+.1f}%" if old else "n/a"
+        print(f"  {key:>15}: {old:10.2f} -> {new:10.2f} ({change})")
+    old_kb = baseline.get("allocations", {}).get("peak_kb_mean")
+    if old_kb is not None:
+        print(f"  {'peak_kb_mean':>15}: {old_kb:10.1f} -> {results['allocations']['peak_kb_mean']:10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the instruction builder entrypoint with a stub model")
+    parser.add_argument("--payloads", nargs="*", default=["test_payloads.json"], help="JSON or JSONL payload files")
+    parser.add_argument("--requests", type=int, default=200, help="Total invocations")
+    parser.add_argument("--concurrency", type=int, default=16, help="Invocations in flight")
+    parser.add_argument("--warmup", type=int, default=10, help="Untimed invocations before the run")
+    parser.add_argument("--latency-ms", type=float, default=800.0, help="Stub time to first token")
+    parser.add_argument("--tokens-per-second", type=float, default=80.0, help="Stub output rate (0 = instant)")
+    parser.add_argument("--output-tokens", type=int, default=400, help="Stub instruction length")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Fraction of stub calls that raise")
+    parser.add_argument("--small-latency-ms", type=float, default=300.0, help="Stub time to first token, small tier")
+    parser.add_argument("--small-tokens-per-second", type=float, default=200.0, help="Stub output rate, small tier")
+    parser.add_argument(
+        "--tier", choices=["auto", "small", "large"], default="auto",
+        help="Route by complexity (auto) or pin every model call to one tier to compare tiers",
+    )
+    parser.add_argument("--tail-rate", type=float, default=0.0, help="Fraction of stub calls that are slow")
+    parser.add_argument("--tail-factor", type=float, default=5.0, help="Time to first token multiplier for slow calls")
+    parser.add_argument("--deadline-ms", type=float, help="deadline_ms added to every payload")
+    parser.add_argument("--no-hedging", action="store_true", help="Disable hedged model calls")
+    parser.add_argument("--max-in-flight", type=int, help="INSTRUCTION_MAX_IN_FLIGHT for the entrypoint")
+    parser.add_argument("--max-queue", type=int, help="INSTRUCTION_MAX_QUEUE (requests waiting before rejection)")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--allocation-samples", type=int, default=20, help="Sequential requests traced (0 = skip)")
+    parser.add_argument("--no-cache", action="store_true", help="Disable the instruction cache so every call hits the model")
+    parser.add_argument("--output", default=results_path("benchmark_agent_results.json"), help="Results JSON file")
+    parser.add_argument("--baseline", help="Earlier results JSON to compare against")
+    args = parser.parse_args()
+
+    if args.no_cache:
+        os.environ["INSTRUCTION_CACHE_ENABLED"] = "false"
+    os.environ.setdefault("INSTRUCTION_CORPUS_PATH", "")
+    # Stored responses would turn every repeated payload into a store hit.
+    os.environ.setdefault("INSTRUCTION_STORE_PATH", "")
+    os.environ["INSTRUCTION_MODEL_ROUTING_ENABLED"] = "true"
+    if args.no_hedging:
+        os.environ["INSTRUCTION_HEDGING_ENABLED"] = "false"
+    if args.max_in_flight is not None:
+        os.environ["INSTRUCTION_MAX_IN_FLIGHT"] = str(args.max_in_flight)
+    if args.max_queue is not None:
+        os.environ["INSTRUCTION_MAX_QUEUE"] = str(args.max_queue)
+    if args.tier != "auto":
+        os.environ["INSTRUCTION_MODEL_TIER"] = args.tier
+
+    # Imported after the environment is prepared: configuration is read at import time.
+    import agent_agentcore
+    import instruction_builder_agent
+
+    # Failures are counted in the results; per-request tracebacks would drown the report.
+    logging.getLogger().setLevel(logging.CRITICAL)
+    large = {
+        "latency_ms": args.latency_ms,
+        "tokens_per_second": args.tokens_per_second,
+        "output_tokens": args.output_tokens,
+        "failure_rate": args.failure_rate,
+        "tail_rate": args.tail_rate,
+        "tail_factor": args.tail_factor,
+    }
+    stub_config = {
+        "large": large,
+        "small": {**large, "latency_ms": args.small_latency_ms, "tokens_per_second": args.small_tokens_per_second},
+    }
+    stubs = []
+
+    def stub_factory(tier):
+        stub = StubModel(**stub_config[tier], seed=args.seed + len(stubs))
+        stubs.append(stub)
+        return stub
+
+    instruction_builder_agent.set_model_factory(stub_factory)
+
+    cases = load_payloads(args.payloads)
+    if not cases:
+        print("Error: No payloads found")
+        sys.exit(1)
+    if args.deadline_ms:
+        cases = [(name, {**payload, "deadline_ms": args.deadline_ms}) for name, payload in cases]
+
+    print("=" * 70)
+    print("Instruction Builder Entrypoint Benchmark (stub model)")
+    print("=" * 70)
+    print(f"Cases: {len(cases)}  Requests: {args.requests}  Concurrency: {args.concurrency}")
+    print(
+        f"Stub: large {args.latency_ms:.0f}ms TTFT, {args.tokens_per_second:g} tok/s; small {args.small_latency_ms:.0f}ms, "
+        f"{args.small_tokens_per_second:g} tok/s; failure rate {args.failure_rate:g}; tail {args.tail_rate:g} "
+        f"x{args.tail_factor:g}; tier {args.tier}"
+    )
+    print("-" * 70)
+
+    async def run():
+        if args.warmup:
+            await run_load(agent_agentcore.invoke, cases, args.warmup, args.concurrency)
+        records, elapsed = await run_load(agent_agentcore.invoke, cases, args.requests, args.concurrency)
+        allocations = (
+            await measure_allocations(agent_agentcore.invoke, cases, args.allocation_samples)
+            if args.allocation_samples
+            else {}
+        )
+        metrics = await agent_agentcore.invoke({"type": "metrics"})
+        return records, elapsed, allocations, metrics.get("metrics", {})
+
+    records, elapsed, allocations, pipeline_metrics = asyncio.run(run())
+
+    by_type = {}
+    by_tier = {}
+    for record in records:
+        by_type.setdefault(str(record["type"]), []).append(record)
+        by_tier.setdefault(record["model_tier"], []).append(record)
+    results = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "git_revision": git_revision(),
+        "config": {**vars(args), "stub": stub_config},
+        "overall": summarize(records, elapsed),
+        "by_type": {name: summarize(items) for name, items in sorted(by_type.items())},
+        "by_model_tier": {name: summarize(items) for name, items in sorted(by_tier.items())},
+        "allocations": allocations,
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "model_calls": sum(stub.calls for stub in stubs),
+        "pipeline_metrics": pipeline_metrics,
+    }
+
+    overall = results["overall"]
+    print(f"{'type':<30} {'n':>6} {'err':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, s in results["by_type"].items():
+        print(f"{name:<30} {s['requests']:>6} {s['errors']:>5} {s['p50_ms']:>9.1f} {s['p95_ms']:>9.1f} {s['p99_ms']:>9.1f}")
+    for name, s in results["by_model_tier"].items():
+        label = f"tier: {name}"
+        print(f"{label:<30} {s['requests']:>6} {s['errors']:>5} {s['p50_ms']:>9.1f} {s['p95_ms']:>9.1f} {s['p99_ms']:>9.1f}")
+    print("-" * 70)
+    print(
+        f"Throughput {overall['throughput_rps']:.1f} req/s  p50 {overall['p50_ms']:.1f}ms  "
+        f"p95 {overall['p95_ms']:.1f}ms  p99 {overall['p99_ms']:.1f}ms  errors {overall['errors']}"
+    )
+    if allocations:
+        print(
+            f"Allocations per request: peak {allocations['peak_kb_mean']:.1f} KB mean "
+            f"({allocations['peak_kb_max']:.1f} KB max), retained {allocations['retained_kb_mean']:.1f} KB"
+        )
+    print(f"Peak RSS: {results['peak_rss_kb'] / 1024:.1f} MB  Model calls: {results['model_calls']}")
+    hedging = pipeline_metrics.get("hedging") or {}
+    if hedging:
+        print(
+            f"Hedging: {hedging['hedged']}/{hedging['calls']} calls hedged (rate {hedging['hedge_rate']:.2%}), "
+            f"win rate {hedging['win_rate']:.2%}, deadline exceeded {hedging['deadline_exceeded']}, "
+            f"degraded responses {overall['degraded']}"
+        )
+    admission = pipeline_metrics.get("requests") or {}
+    if admission:
+        by_priority = ", ".join(
+            f"priority {priority}: {s['rejected'] + s['shed']} rejected, "
+            f"{s['wait_time_ms'] / s['waited'] if s['waited'] else 0:.1f}ms mean wait"
+            for priority, s in admission["by_priority"].items()
+        )
+        print(
+            f"Admission: peak queue {admission['peak_queue_depth']}/{admission['max_queue']}, "
+            f"rejected {admission['rejected']}, shed {admission['shed']} ({by_priority or 'no waits'})"
+        )
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"✓ Results written to {args.output}")
+    if args.baseline:
+        print_comparison(results, args.baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""Cold-start benchmark: import time, warm-up and first-request latency of the AgentCore app (stub model)."""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+_CONTEXT = {
+    "procedure_id": 1,
+    "procedure_type": "knee replacement",
+    "procedure_status": "completed",
+    "days_post_op": 6,
+    "patient_id": 1,
+    "patient_name": "Jane Doe",
+    "doctor_name": "Dr. Smith",
+}
+# Same gitignored directory as benchmark_agent.RESULTS_DIR (that module is not imported at the top, see main).
+_RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks", "results")
+_CHILD_ENV = {
+    "INSTRUCTION_CORPUS_PATH": "",
+    "INSTRUCTION_STORE_PATH": "",
+    "INSTRUCTION_CACHE_ENABLED": "false",
+    "INSTRUCTION_WARMUP_CONNECT": "false",
+}
+
+
+def measure_once(warm: bool) -> dict:
+    """
+    Measure one cold start in this (fresh) process.
+
+    With warm=True the app's warm_up() runs before the first request, as in `python agent_agentcore.py`;
+    otherwise the first request pays for the lazy pipeline import and agent construction itself.
+    """
+    import asyncio
+
+    started = time.perf_counter()
+    import agent_agentcore
+
+    result = {"import_ms": (time.perf_counter() - started) * 1000}
+
+    def use_stub_model():
+        # benchmark_agent loads strands, so it is only imported inside the timed steps.
+        from benchmark_agent import StubModel
+
+        pipeline = agent_agentcore.pipeline()
+        if pipeline._model_factory is None:
+            pipeline.set_model_factory(lambda tier: StubModel(latency_ms=0, tokens_per_second=0))
+
+    def first_request():
+        use_stub_model()
+        return asyncio.run(agent_agentcore.invoke({"type": "instruction_generation", "context": _CONTEXT}))
+
+    if warm:
+        started = time.perf_counter()
+        use_stub_model()
+        report = agent_agentcore.warm_up()
+        result["warm_up_ms"] = (time.perf_counter() - started) * 1000
+        result["warm_up"] = report
+    started = time.perf_counter()
+    response = first_request()
+    result["first_request_ms"] = (time.perf_counter() - started) * 1000
+    started = time.perf_counter()
+    first_request()
+    result["second_request_ms"] = (time.perf_counter() - started) * 1000
+    result["error"] = response.get("error")
+    return result
+
+
+def run_child(warm: bool) -> dict:
+    """Run measure_once in a new interpreter so nothing is imported or cached yet."""
+    command = [sys.executable, os.path.abspath(__file__), "--child", "warm" if warm else "cold"]
+    started = time.perf_counter()
+    completed = subprocess.run(
+        command,
+        capture_output=True,
+        text=True,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env={**os.environ, **_CHILD_ENV},
+        check=True,
+    )
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result["process_ms"] = (time.perf_counter() - started) * 1000
+    return result
+
+
+def median_of(runs: list, field: str) -> float:
+    return round(statistics.median(run[field] for run in runs), 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark AgentCore cold start and fail if it exceeds its budget")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh processes per mode (medians are reported)")
+    parser.add_argument("--import-budget-ms", type=float, default=650.0, help="Budget for importing agent_agentcore")
+    parser.add_argument("--warm-up-budget-ms", type=float, default=900.0, help="Budget for warm_up() (stub model)")
+    parser.add_argument(
+        "--first-request-budget-ms", type=float, default=100.0, help="Budget for the first request after warm-up"
+    )
+    parser.add_argument(
+        "--output", default=os.path.join(_RESULTS_DIR, "benchmark_cold_start_results.json"), help="Results JSON file"
+    )
+    parser.add_argument("--child", choices=("cold", "warm"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        # Only the JSON line goes to stdout; app logs go to stderr.
+        print(json.dumps(measure_once(args.child == "warm"), default=str))
+        return
+
+    # Imported here, not at module level: it loads strands, which the child must import cold.
+    from benchmark_agent import git_revision
+
+    print("=" * 70)
+    print("Instruction Builder Cold Start Benchmark (stub model)")
+    print("=" * 70)
+    runs = {mode: [run_child(mode == "warm") for _ in range(args.runs)] for mode in ("cold", "warm")}
+    errors = [run["error"] for mode_runs in runs.values() for run in mode_runs if run["error"]]
+    summary = {
+        mode: {
+            field: median_of(mode_runs, field)
+            for field in ("process_ms", "import_ms", "warm_up_ms", "first_request_ms", "second_request_ms")
+            if field in mode_runs[0]
+        }
+        for mode, mode_runs in runs.items()
+    }
+    budgets = {
+        "import_ms": (summary["warm"]["import_ms"], args.import_budget_ms),
+        "warm_up_ms": (summary["warm"]["warm_up_ms"], args.warm_up_budget_ms),
+        "first_request_ms": (summary["warm"]["first_request_ms"], args.first_request_budget_ms),
+    }
+    regressions = [name for name, (value, budget) in budgets.items() if value > budget]
+
+    print(f"Runs per mode: {args.runs} (medians)")
+    print(f"{'mode':<8} {'process':>10} {'import':>10} {'warm-up':>10} {'1st req':>10} {'2nd req':>10}")
+    for mode, s in summary.items():
+        warm_up = f"{s['warm_up_ms']:>10.1f}" if "warm_up_ms" in s else f"{'-':>10}"
+        print(
+            f"{mode:<8} {s['process_ms']:>10.1f} {s['import_ms']:>10.1f} {warm_up} "
+            f"{s['first_request_ms']:>10.1f} {s['second_request_ms']:>10.1f}"
+        )
+    print("-" * 70)
+    for name, (value, budget) in budgets.items():
+        print(f"{'✗' if name in regressions else '✓'} {name}: {value:.1f}ms (budget {budget:.0f}ms)")
+
+    results = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "git_revision": git_revision(),
+        "config": vars(args),
+        "summary": summary,
+        "budgets": {name: {"value_ms": value, "budget_ms": budget} for name, (value, budget) in budgets.items()},
+        "regressions": regressions,
+        "errors": errors,
+        "runs": runs,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2, default=str)
+    print(f"✓ Results written to {args.output}")
+    if errors:
+        print(f"Error: {len(errors)} first requests failed: {errors[0]}")
+    if regressions or errors:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
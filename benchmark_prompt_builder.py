@@ -0,0 +1,84 @@
+"""Micro-benchmark of build_instruction_input cost and prompt size as procedure history grows."""
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from instruction_builder_agent import build_instruction_input, estimate_tokens
+
+HISTORY_TYPES = ["dialysis", "physical therapy", "wound check", "blood draw", "x-ray", "knee replacement"]
+
+
+def make_context(history_size: int, seed: int = 7) -> dict:
+    """Generation context with a synthetic procedure history of the given size."""
+    rng = random.Random(seed)
+    start = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    history = [
+        {
+            "id": i,
+            "type": rng.choice(HISTORY_TYPES),
+            "perform_at": (start + timedelta(hours=rng.randint(0, 6 * 365 * 24))).isoformat(),
+            "status": "completed",
+        }
+        for i in range(history_size)
+    ]
+    return {
+        "procedure_id": 1,
+        "procedure_type": "knee replacement",
+        "procedure_status": "completed",
+        "days_post_op": 6,
+        "patient_name": "Jane Doe",
+        "doctor_name": "Dr. Smith",
+        "procedure_history": history,
+    }
+
+
+def bench(history_size: int, repeat: int, token_budget: int = None) -> dict:
+    """Time build_instruction_input for one history size; token_budget=0 measures the uncompacted baseline."""
+    import instruction_builder_agent
+
+    context = make_context(history_size)
+    previous = instruction_builder_agent.HISTORY_TOKEN_BUDGET
+    if token_budget is not None:
+        instruction_builder_agent.HISTORY_TOKEN_BUDGET = token_budget
+    try:
+        report = {}
+        prompt = build_instruction_input(context, report=report)
+        started = time.perf_counter()
+        for _ in range(repeat):
+            build_instruction_input(context)
+        elapsed = (time.perf_counter() - started) / repeat
+    finally:
+        instruction_builder_agent.HISTORY_TOKEN_BUDGET = previous
+    return {
+        "history": history_size,
+        "build_ms": elapsed * 1000,
+        "prompt_chars": len(prompt),
+        "prompt_tokens": estimate_tokens(prompt),
+        "dropped_tokens": report.get("dropped_tokens", 0),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark build_instruction_input against procedure history size")
+    parser.add_argument("--sizes", nargs="*", type=int, default=[10, 100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("build_instruction_input micro-benchmark")
+    print("=" * 70)
+    print(f"{'history':>8} {'mode':>10} {'build ms':>10} {'chars':>9} {'tokens':>8} {'dropped':>8}")
+    print("-" * 70)
+    for size in args.sizes:
+        for mode, budget in (("full", 0), ("compacted", None)):
+            r = bench(size, args.repeat, token_budget=budget)
+            print(
+                f"{r['history']:>8} {mode:>10} {r['build_ms']:>10.3f} {r['prompt_chars']:>9} "
+                f"{r['prompt_tokens']:>8} {r['dropped_tokens']:>8}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""Request deadlines and hedged model calls for tail latency."""
+
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+
+HEDGING_ENABLED = os.getenv("INSTRUCTION_HEDGING_ENABLED", "true").lower() in ("1", "true", "yes")
+HEDGE_PERCENTILE = float(os.getenv("INSTRUCTION_HEDGE_PERCENTILE", "95"))
+HEDGE_MIN_SAMPLES = int(os.getenv("INSTRUCTION_HEDGE_MIN_SAMPLES", "20"))
+HEDGE_WINDOW = int(os.getenv("INSTRUCTION_HEDGE_WINDOW", "200"))
+# Time kept back from a deadline to build and send the response.
+DEADLINE_MARGIN_SECONDS = float(os.getenv("INSTRUCTION_DEADLINE_MARGIN_MS", "250")) / 1000
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a model call cannot finish before the request deadline."""
+
+
+def deadline_after_ms(budget_ms) -> float:
+    """
+    Convert a payload's deadline_ms budget into an absolute time.monotonic() deadline.
+
+    Returns:
+        float | None: Deadline, or None if no (valid) budget was given.
+    """
+    try:
+        budget = float(budget_ms)
+    except (TypeError, ValueError):
+        return None
+    return time.monotonic() + budget / 1000 if budget > 0 else None
+
+
+def time_left(deadline: float):
+    """Seconds left before the deadline minus the response margin, or None without a deadline."""
+    if deadline is None:
+        return None
+    return deadline - DEADLINE_MARGIN_SECONDS - time.monotonic()
+
+
+class Hedger:
+    """
+    Run model calls with a deadline, starting one duplicate (hedge) when a call runs longer than
+    a percentile of recent latencies for the same pool; the first success wins and the other call
+    is cancelled. Like InflightLimiter it keeps no per-loop state.
+    """
+
+    def __init__(self, enabled: bool, percentile: float, min_samples: int, window: int):
+        """
+        Args:
+            enabled: Start hedges (deadlines are enforced either way).
+            percentile: Latency percentile after which a hedge starts.
+            min_samples: Latencies needed for a pool before hedging it.
+            window: Recent latencies kept per pool.
+        """
+        self.enabled = enabled
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.window = window
+        self._lock = threading.Lock()
+        self._latencies = {}
+        self._calls = 0
+        self._hedged = 0
+        self._hedge_wins = 0
+        self._deadline_exceeded = 0
+        self._hedges_skipped = 0
+
+    def hedge_delay(self, key: str):
+        """Seconds after which a call for `key` is hedged, or None while hedging is off or unprimed."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            samples = list(self._latencies.get(key, ()))
+        return self._threshold(samples)
+
+    def _threshold(self, samples) -> float:
+        if len(samples) < self.min_samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * self.percentile / 100))]
+
+    def _record(self, key: str, seconds: float) -> None:
+        with self._lock:
+            window = self._latencies.get(key)
+            if window is None:
+                window = self._latencies[key] = deque(maxlen=self.window)
+            window.append(seconds)
+
+    async def run(self, key: str, call, deadline: float = None, can_hedge=None):
+        """
+        Await `call()`, hedging it once if it is slow.
+
+        Args:
+            key: Latency bucket (agent pool name).
+            call: Zero-argument coroutine function performing one model call.
+            deadline: time.monotonic() deadline, or None.
+            can_hedge: Zero-argument callable checked when the hedge is due; if it returns False
+                (e.g. the agent pool is saturated) the call is not hedged, since a hedge would only queue.
+
+        Returns:
+            The result of whichever call succeeded first.
+
+        Raises:
+            DeadlineExceeded: If no call succeeded before the deadline.
+        """
+        with self._lock:
+            self._calls += 1
+        if deadline is not None and time_left(deadline) <= 0:
+            self._deadline_hit()
+        hedge_after = self.hedge_delay(key)
+        started = time.monotonic()
+        primary = asyncio.ensure_future(call())
+        starts = {primary: started}
+        pending = {primary}
+        hedge = None
+        error = None
+        try:
+            while pending:
+                wait = time_left(deadline)
+                if hedge is None and hedge_after is not None:
+                    until_hedge = hedge_after - (time.monotonic() - started)
+                    wait = until_hedge if wait is None else min(wait, until_hedge)
+                done, pending = await asyncio.wait(
+                    pending, timeout=None if wait is None else max(0.0, wait), return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        self._record(key, time.monotonic() - starts[task])
+                        if task is hedge:
+                            with self._lock:
+                                self._hedge_wins += 1
+                        return task.result()
+                    error = error or task.exception()
+                if deadline is not None and time_left(deadline) <= 0:
+                    self._deadline_hit()
+                if hedge is None and hedge_after is not None and pending and time.monotonic() - started >= hedge_after:
+                    if can_hedge is not None and not can_hedge():
+                        hedge_after = None
+                        with self._lock:
+                            self._hedges_skipped += 1
+                    else:
+                        hedge = asyncio.ensure_future(call())
+                        starts[hedge] = time.monotonic()
+                        pending.add(hedge)
+                        with self._lock:
+                            self._hedged += 1
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def _deadline_hit(self):
+        with self._lock:
+            self._deadline_exceeded += 1
+        raise DeadlineExceeded("Deadline reached before the model responded")
+
+    def stats(self) -> dict:
+        """Snapshot of hedging counters; hedge_rate is per call, win_rate per hedge."""
+        with self._lock:
+            thresholds = {key: self._threshold(window) for key, window in self._latencies.items()}
+            return {
+                "enabled": self.enabled,
+                "percentile": self.percentile,
+                "calls": self._calls,
+                "hedged": self._hedged,
+                "hedge_wins": self._hedge_wins,
+                "hedges_skipped": self._hedges_skipped,
+                "hedge_rate": round(self._hedged / self._calls, 4) if self._calls else 0.0,
+                "win_rate": round(self._hedge_wins / self._hedged, 4) if self._hedged else 0.0,
+                "deadline_exceeded": self._deadline_exceeded,
+                "hedge_after_ms": {key: round(t * 1000, 1) for key, t in thresholds.items() if t is not None},
+            }
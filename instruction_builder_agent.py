@@ -1,10 +1,149 @@
 """Core instruction builder agent for generating and adjusting post-surgery instructions."""
 
+import asyncio
+import hashlib
+import heapq
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import nullcontext
+
+from botocore.config import Config as BotocoreConfig
+from botocore.exceptions import BotoCoreError, ClientError
+
+from opentelemetry import trace
 from pydantic import BaseModel, Field
 
 from strands import Agent
+from strands.models import BedrockModel
+
+from adjustment_sessions import (
+    AdjustmentSession,
+    AdjustmentSessionStore,
+    copy_conversation,
+    followup_prompt,
+    mark_cache_point,
+)
+from agent_pool import AgentPool, reset_agent
+from hedging import HEDGE_MIN_SAMPLES, HEDGE_PERCENTILE, HEDGE_WINDOW, HEDGING_ENABLED, DeadlineExceeded, Hedger
+from instruction_cache import InstructionCache
+from instruction_corpus import InstructionCorpus
+from instruction_rules import apply_rule_adjustment
+from instruction_telemetry import invocation_usage, record_token_usage, set_attributes, stage, traced_prompt_builder
+from model_router import TIER_LARGE, adjustment_tier, generation_tier, model_id, routing_config
+from instruction_sections import (
+    AmbiguousSectionError,
+    SectionAnchorError,
+    SectionEdit,
+    apply_section_edits,
+    find_section,
+    parse_sections,
+    section_body,
+    section_titles,
+)
+from output_repair import OutputRepairHook, RepairingModel, repair_stats
+from prompts_instructions import (
+    INSTRUCTION_GENERATION_PROMPT,
+    INSTRUCTION_ADJUSTMENT_PROMPT,
+    INSTRUCTION_PATCH_PROMPT,
+    INSTRUCTION_REFRESH_PROMPT,
+    INSTRUCTION_SECTION_PROMPT,
+    INSTRUCTION_SECTIONS,
+)
+
+AGENT_POOL_SIZE = int(os.getenv("INSTRUCTION_AGENT_POOL_SIZE", "32"))
+AGENT_POOL_TIMEOUT_SECONDS = float(os.getenv("INSTRUCTION_AGENT_POOL_TIMEOUT_SECONDS", "30"))
+
+_POOL_NAMES = {
+    INSTRUCTION_GENERATION_PROMPT: "instruction_generation",
+    INSTRUCTION_ADJUSTMENT_PROMPT: "instruction_adjustment",
+    INSTRUCTION_PATCH_PROMPT: "instruction_patch",
+    INSTRUCTION_SECTION_PROMPT: "instruction_section",
+    INSTRUCTION_REFRESH_PROMPT: "instruction_refresh",
+}
+_agent_pools: dict = {}
+_agent_pools_lock = threading.Lock()
+_model_factory = None
+# One Bedrock model (and boto3 client with its connection pool) per tier, shared by all agents.
+_bedrock_models: dict = {}
+
+_pipeline_counters = Counter()
+_pipeline_counters_lock = threading.Lock()
+
+BATCH_MAX_CONCURRENCY = int(os.getenv("INSTRUCTION_BATCH_MAX_CONCURRENCY", "8"))
+BATCH_MAX_ITEMS = int(os.getenv("INSTRUCTION_BATCH_MAX_ITEMS", "500"))
+
+INSTRUCTION_CACHE_ENABLED = os.getenv("INSTRUCTION_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+instruction_cache = InstructionCache(
+    max_entries=int(os.getenv("INSTRUCTION_CACHE_MAX_ENTRIES", "512")),
+    ttl_seconds=float(os.getenv("INSTRUCTION_CACHE_TTL_SECONDS", "3600")),
+)
+
+ADJUSTMENT_SESSIONS_ENABLED = os.getenv("INSTRUCTION_ADJUSTMENT_SESSIONS_ENABLED", "true").lower() in ("1", "true", "yes")
+adjustment_sessions = AdjustmentSessionStore(
+    max_sessions=int(os.getenv("INSTRUCTION_ADJUSTMENT_SESSIONS_MAX", "256")),
+    idle_seconds=float(os.getenv("INSTRUCTION_ADJUSTMENT_SESSION_IDLE_SECONDS", "900")),
+    max_session_chars=int(os.getenv("INSTRUCTION_ADJUSTMENT_SESSION_MAX_CHARS", "200000")),
+)
+
+hedger = Hedger(
+    enabled=HEDGING_ENABLED,
+    percentile=HEDGE_PERCENTILE,
+    min_samples=HEDGE_MIN_SAMPLES,
+    window=HEDGE_WINDOW,
+)
+
+OUTPUT_REPAIR_ENABLED = os.getenv("INSTRUCTION_OUTPUT_REPAIR_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# Sections rewritten by instruction_refresh when the recovery phase changes; the rest is kept verbatim.
+REFRESH_SECTIONS = tuple(
+    title.strip() for title in os.getenv("INSTRUCTION_REFRESH_SECTIONS", "Activity,Follow-Up").split(",") if title.strip()
+)
 
-from prompts_instructions import INSTRUCTION_GENERATION_PROMPT, INSTRUCTION_ADJUSTMENT_PROMPT
+WARMUP_AGENTS_PER_POOL = int(os.getenv("INSTRUCTION_WARMUP_AGENTS", "2"))
+WARMUP_CONNECT = os.getenv("INSTRUCTION_WARMUP_CONNECT", "true").lower() in ("1", "true", "yes")
+# Deliberately invalid model id: the warm-up request is rejected before any inference runs.
+_WARMUP_MODEL_ID = "instruction-builder-warmup"
+
+FAST_PATH_ENABLED = os.getenv("INSTRUCTION_FAST_PATH_ENABLED", "true").lower() in ("1", "true", "yes")
+FAST_PATH_MIN_CONFIDENCE = float(os.getenv("INSTRUCTION_FAST_PATH_MIN_CONFIDENCE", "0.85"))
+
+PATIENT_NAME_PLACEHOLDER = "[PATIENT_NAME]"
+DOCTOR_NAME_PLACEHOLDER = "[DOCTOR_NAME]"
+PERSONALIZATION_FIELDS = ("procedure_id", "patient_id", "patient_name", "doctor_name", "perform_at")
+
+HISTORY_TOKEN_BUDGET = int(os.getenv("INSTRUCTION_HISTORY_TOKEN_BUDGET", "500"))
+HISTORY_VERBATIM_ENTRIES = int(os.getenv("INSTRUCTION_HISTORY_VERBATIM_ENTRIES", "5"))
+CHARS_PER_TOKEN = 4
+
+INSTRUCTION_CORPUS_PATH = os.getenv(
+    "INSTRUCTION_CORPUS_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "instruction_corpus.json")
+)
+
+# (name, first day, last day) - last day None means open-ended.
+RECOVERY_PHASES = (
+    ("immediate", 0, 2),
+    ("early", 3, 7),
+    ("intermediate", 8, 21),
+    ("late", 22, 42),
+    ("extended", 43, None),
+)
+
+PROMPTS_FINGERPRINT = hashlib.sha256(
+    (
+        INSTRUCTION_GENERATION_PROMPT
+        + INSTRUCTION_ADJUSTMENT_PROMPT
+        + INSTRUCTION_PATCH_PROMPT
+        + INSTRUCTION_SECTION_PROMPT
+        + INSTRUCTION_REFRESH_PROMPT
+        + repr(INSTRUCTION_SECTIONS)
+    ).encode("utf-8")
+).hexdigest()[:16]
+
+instruction_corpus = InstructionCorpus.load(INSTRUCTION_CORPUS_PATH, PROMPTS_FINGERPRINT)
 
 
 class InstructionResponse(BaseModel):
@@ -18,31 +157,587 @@ class InstructionResponse(BaseModel):
     )
 
 
-def create_instruction_agent(system_prompt: str):
+class InstructionPatchResponse(BaseModel):
+    """Structured output schema for patch-mode adjustments."""
+
+    edits: list[SectionEdit] = Field(
+        description="Section-level edits to apply to the current instructions, in order."
+    )
+    reasoning: str = Field(
+        description="Brief explanation of what was changed and how the feedback was applied."
+    )
+
+
+def create_instruction_agent(system_prompt: str, output_model: type = InstructionResponse, tier: str = TIER_LARGE):
     """
     Create and configure the instruction agent with structured output.
 
     Args:
-        system_prompt: Either INSTRUCTION_GENERATION_PROMPT or INSTRUCTION_ADJUSTMENT_PROMPT.
+        system_prompt: INSTRUCTION_GENERATION_PROMPT, INSTRUCTION_ADJUSTMENT_PROMPT or INSTRUCTION_PATCH_PROMPT.
+        output_model: Pydantic model for the structured output.
+        tier: Model tier ("small" or "large", see model_router).
 
     Returns:
         Agent: Configured Strands agent for instruction generation or adjustment.
     """
+    model = _model_factory(tier) if _model_factory else bedrock_model(tier)
+    hooks = []
+    if OUTPUT_REPAIR_ENABLED:
+        # Malformed output is repaired locally before Strands would re-prompt (see output_repair).
+        model = RepairingModel(model, output_model)
+        hooks.append(OutputRepairHook())
     agent = Agent(
+        model=model,
         system_prompt=system_prompt,
         callback_handler=None,
-        structured_output_model=InstructionResponse,
+        structured_output_model=output_model,
+        hooks=hooks,
     )
     return agent
 
 
-def build_instruction_input(context: dict) -> str:
+def bedrock_model(tier: str) -> BedrockModel:
+    """
+    Shared Bedrock model for a tier (model_id(tier), or the Strands default model).
+
+    Agents only read its configuration, so pooled agents share one boto3 client and its
+    connection pool instead of each opening their own.
+    """
+    model = _bedrock_models.get(tier)
+    if model is None:
+        with _agent_pools_lock:
+            model = _bedrock_models.get(tier)
+            if model is None:
+                client_config = BotocoreConfig(max_pool_connections=max(10, AGENT_POOL_SIZE))
+                model_kwargs = {"model_id": model_id(tier)} if model_id(tier) else {}
+                model = BedrockModel(boto_client_config=client_config, **model_kwargs)
+                _bedrock_models[tier] = model
+    return model
+
+
+def set_model_factory(factory) -> None:
+    """
+    Build agents with models from `factory` instead of the default Bedrock model.
+
+    Drops the existing agent pools and adjustment sessions so every agent created afterwards uses the new model.
+    Used by benchmark_agent.py to run the pipeline against a local stub.
+
+    Args:
+        factory: Callable taking the model tier and returning a Strands Model, or None to restore the default.
+    """
+    global _model_factory
+    with _agent_pools_lock:
+        _model_factory = factory
+        _agent_pools.clear()
+    adjustment_sessions.clear()
+
+
+def get_agent_pool(
+    system_prompt: str, output_model: type = InstructionResponse, tier: str = TIER_LARGE
+) -> AgentPool:
+    """
+    Return the shared agent pool for a system prompt and model tier, creating it on first use.
+
+    Args:
+        system_prompt: System prompt the pooled agents are configured with.
+        output_model: Pydantic model for the structured output.
+        tier: Model tier of the pooled agents.
+
+    Returns:
+        AgentPool: Pool of agents configured with that prompt.
+    """
+    key = (system_prompt, output_model, tier)
+    pool = _agent_pools.get(key)
+    if pool is None:
+        with _agent_pools_lock:
+            pool = _agent_pools.get(key)
+            if pool is None:
+                name = f"{_POOL_NAMES.get(system_prompt, f'prompt-{len(_agent_pools)}')}/{tier}"
+
+                def build_agent():
+                    with stage("agent_construction", pool=name):
+                        return create_instruction_agent(system_prompt, output_model, tier)
+
+                pool = AgentPool(factory=build_agent, size=AGENT_POOL_SIZE, name=name)
+                _agent_pools[key] = pool
+    return pool
+
+
+def count(name: str, amount: int = 1) -> None:
+    """Increment a named pipeline counter (reported under "pipeline" in get_pipeline_metrics)."""
+    with _pipeline_counters_lock:
+        _pipeline_counters[name] += amount
+
+
+def get_pipeline_metrics() -> dict:
+    """
+    Collect counters from the instruction pipeline.
+
+    Returns:
+        dict: {"agent_pools": {pool_name: stats}}
+    """
+    return {
+        "agent_pools": {pool.name: pool.stats() for pool in list(_agent_pools.values())},
+        "instruction_cache": instruction_cache.stats(),
+        "instruction_corpus": instruction_corpus.stats(),
+        "pipeline": dict(_pipeline_counters),
+        "adjustment_sessions": adjustment_sessions.stats(),
+        "adjustment_fast_path": _fast_path_stats(),
+        "model_routing": routing_config(),
+        "hedging": hedger.stats(),
+        "output_repair": repair_stats(),
+    }
+
+
+def _fast_path_stats() -> dict:
+    with _pipeline_counters_lock:
+        fast = _pipeline_counters["adjustment_fast_path"]
+        model = _pipeline_counters["adjustment_model_path"]
+    return {
+        "enabled": FAST_PATH_ENABLED,
+        "min_confidence": FAST_PATH_MIN_CONFIDENCE,
+        "fast_path": fast,
+        "model_path": model,
+        "fast_path_rate": round(fast / (fast + model), 4) if fast + model else 0.0,
+    }
+
+
+def invalidate_instruction_cache() -> int:
+    """
+    Drop all cached instructions, e.g. after the prompts in prompts_instructions.py change.
+
+    Returns:
+        int: Number of cache entries removed.
+    """
+    return instruction_cache.invalidate()
+
+
+def warm_up_pipeline(agents_per_pool: int = None, connect: bool = None) -> dict:
+    """
+    Do the work a first request would otherwise pay for: compile the output schemas, build pooled
+    agents for generation and adjustment, and open the connection to the model endpoint.
+
+    Args:
+        agents_per_pool: Agents built per pool (INSTRUCTION_WARMUP_AGENTS by default).
+        connect: Open the model connection (INSTRUCTION_WARMUP_CONNECT by default).
+
+    Returns:
+        dict: {"schemas_ms", "agents_built", "agents_ms", "connection": {tier: outcome}, "connect_ms"}
+    """
+    agents_per_pool = WARMUP_AGENTS_PER_POOL if agents_per_pool is None else agents_per_pool
+    connect = WARMUP_CONNECT if connect is None else connect
+    report = {}
+
+    started = time.perf_counter()
+    for output_model in (InstructionResponse, InstructionPatchResponse):
+        output_model.model_json_schema()
+    InstructionResponse.model_validate({"instructions": "", "reasoning": ""})
+    report["schemas_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+    started = time.perf_counter()
+    # Both tiers an adjustment can route to (only one unless model routing is enabled).
+    adjustment_tiers = {adjustment_tier("", "", {"procedure_type": "warm-up"}), adjustment_tier("", "", {})}
+    pools = [get_agent_pool(INSTRUCTION_GENERATION_PROMPT, tier=generation_tier({}))]
+    pools += [get_agent_pool(INSTRUCTION_ADJUSTMENT_PROMPT, tier=tier) for tier in sorted(adjustment_tiers)]
+    report["agents_built"] = sum(pool.prewarm(agents_per_pool) for pool in pools) if agents_per_pool > 0 else 0
+    report["agents_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+    started = time.perf_counter()
+    tiers = sorted(adjustment_tiers | {generation_tier({})})
+    report["connection"] = {tier: open_model_connection(tier) if connect else "skipped" for tier in tiers}
+    report["connect_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return report
+
+
+def open_model_connection(tier: str) -> str:
+    """
+    Open the HTTPS connection of a tier's shared Bedrock client ahead of the first request.
+
+    Sends a Converse request for a model id that does not exist: Bedrock rejects it without
+    running inference, but the TLS connection and credentials are set up and stay in the pool.
+
+    Returns:
+        str: "connected", "skipped" (a model factory is set) or "failed: <reason>".
+    """
+    if _model_factory:
+        return "skipped"
+    client = bedrock_model(tier).client
+    try:
+        client.converse(modelId=_WARMUP_MODEL_ID, messages=[{"role": "user", "content": [{"text": "ping"}]}])
+    except ClientError:
+        return "connected"
+    except BotoCoreError as e:
+        logging.warning(f"Could not open the {tier} model connection during warm-up: {e}")
+        return f"failed: {e}"
+    return "connected"
+
+
+async def run_instruction_agent_async(
+    system_prompt: str,
+    agent_input: str,
+    output_model: type = InstructionResponse,
+    tier: str = TIER_LARGE,
+    deadline: float = None,
+):
+    """
+    Run a pooled agent on a prompt and return its structured output.
+
+    The model call is awaited on the caller's event loop, so no thread is held while it runs.
+    A call slower than the pool's recent latency percentile is hedged with a second agent (see
+    hedging.Hedger); the first to finish wins and the other is cancelled and discarded.
+
+    Args:
+        system_prompt: System prompt selecting the agent pool.
+        agent_input: Formatted user prompt.
+        output_model: Pydantic model for the structured output.
+        tier: Model tier to run on.
+        deadline: time.monotonic() deadline for the call, or None.
+
+    Returns:
+        InstructionResponse (or output_model instance): Validated structured output.
+
+    Raises:
+        DeadlineExceeded: If the model did not respond before the deadline.
+    """
+    count(f"model_tier_{tier}")
+    pool = get_agent_pool(system_prompt, output_model, tier)
+
+    async def call():
+        async with pool.acheckout(timeout=AGENT_POOL_TIMEOUT_SECONDS) as agent:
+            return await invoke_agent_async(agent, agent_input, pool.name)
+
+    return await hedger.run(pool.name, call, deadline, can_hedge=pool.has_capacity)
+
+
+async def invoke_agent_async(agent, agent_input, pool_name: str):
+    """
+    Run one model call on an already checked-out agent and return its structured output.
+
+    Args:
+        agent: Strands agent (pooled or session-held).
+        agent_input: Formatted user prompt ([] to continue from a user turn already in the conversation).
+        pool_name: Pool or session kind, for tracing.
+
+    Returns:
+        Validated structured output.
+    """
+    with stage("model_call", pool=pool_name, prompt_chars=len(agent_input)) as span:
+        result = await agent.invoke_async(agent_input)
+        record_token_usage(span, invocation_usage(result.metrics))
+    return parse_structured_output(result)
+
+
+def parse_structured_output(result):
+    """
+    Extract the validated structured output from an agent result.
+
+    Raises:
+        ValueError: If the agent finished without producing structured output.
+    """
+    with stage("parse_structured_output") as span:
+        structured = result.structured_output
+        if structured is None:
+            raise ValueError(f"Agent finished without structured output (stop_reason={result.stop_reason})")
+        set_attributes(span, output_model=type(structured).__name__)
+    return structured
+
+
+def recovery_phase(days_post_op):
+    """
+    Map days post-op to a named recovery phase.
+
+    Args:
+        days_post_op: Days since surgery (int or numeric string).
+
+    Returns:
+        str | None: Phase name from RECOVERY_PHASES, or None if days_post_op is missing or not a
+                    non-negative integer.
+    """
+    try:
+        days = int(days_post_op)
+    except (TypeError, ValueError):
+        return None
+    for name, first, last in RECOVERY_PHASES:
+        if days >= first and (last is None or days <= last):
+            return name
+    return None
+
+
+def phases_crossed(old_days_post_op, new_days_post_op) -> list:
+    """
+    Recovery phases entered when days post-op moves from old to new.
+
+    Returns:
+        list: Phase names after the old phase up to and including the new one (in the direction of
+              travel), or [] if both days fall in the same phase.
+
+    Raises:
+        ValueError: If either value is not a non-negative integer number of days.
+    """
+    names = [name for name, _, _ in RECOVERY_PHASES]
+    old_phase, new_phase = recovery_phase(old_days_post_op), recovery_phase(new_days_post_op)
+    if old_phase is None or new_phase is None:
+        raise ValueError(f"Invalid days_post_op: {old_days_post_op!r} -> {new_days_post_op!r}")
+    old_index, new_index = names.index(old_phase), names.index(new_phase)
+    step = 1 if new_index >= old_index else -1
+    return names[old_index + step:new_index + step:step]
+
+
+def _describe_recovery_phase(phase: str) -> str:
+    for name, first, last in RECOVERY_PHASES:
+        if name == phase:
+            days = f"days {first}+" if last is None else f"days {first}-{last}"
+            return f"{name} ({days} post-op)"
+    return phase
+
+
+def split_instruction_context(context: dict) -> tuple:
+    """
+    Split generation context into a patient-agnostic clinical part and a personalization layer.
+
+    The clinical part only carries what shapes the medical content (normalized procedure type and
+    status, recovery phase, prior procedure types) plus placeholders for the names, so it can be
+    rendered with build_instruction_input and used as a cache key shared across patients.
+
+    Args:
+        context: Procedure/patient context from Rails.
+
+    Returns:
+        tuple: (clinical, personalization) dicts.
+    """
+    clinical = {}
+    if context.get("procedure_type"):
+        clinical["procedure_type"] = " ".join(str(context["procedure_type"]).lower().split())
+    if context.get("procedure_status"):
+        clinical["procedure_status"] = str(context["procedure_status"]).strip().lower()
+    if context.get("days_post_op") is not None:
+        phase = recovery_phase(context["days_post_op"])
+        if phase:
+            clinical["recovery_phase"] = phase
+        else:
+            clinical["days_post_op"] = context["days_post_op"]
+    if context.get("patient_name"):
+        clinical["patient_name"] = PATIENT_NAME_PLACEHOLDER
+    if context.get("doctor_name"):
+        clinical["doctor_name"] = DOCTOR_NAME_PLACEHOLDER
+    history = context.get("procedure_history")
+    if isinstance(history, list):
+        types = sorted(
+            {" ".join(str(h.get("type", h.get("procedure_type", "?"))).lower().split()) for h in history}
+        )
+        if types:
+            clinical["procedure_history"] = [{"type": t} for t in types]
+    elif history:
+        clinical["procedure_history"] = history
+    personalization = {k: context[k] for k in PERSONALIZATION_FIELDS if context.get(k) is not None}
+    return clinical, personalization
+
+
+def instruction_cache_key(clinical: dict) -> str:
+    """Stable cache key for a clinical context under the current prompts."""
+    raw = json.dumps(clinical, sort_keys=True, default=str)
+    return f"{PROMPTS_FINGERPRINT}:{hashlib.sha256(raw.encode('utf-8')).hexdigest()}"
+
+
+def lookup_base_instructions(cache_key: str, clinical: dict):
+    """
+    Find placeholder-based instructions for a clinical context without calling the model.
+
+    Checks the in-process cache first, then the precomputed corpus (which only answers contexts
+    without procedure history).
+
+    Returns:
+        dict | None: {"instructions": str, "reasoning": str} with name placeholders, or None on a miss.
+    """
+    cached = instruction_cache.get(cache_key)
+    source = "cache"
+    if cached is None:
+        cached = instruction_corpus.lookup(clinical)
+        source = "corpus" if cached is not None else "miss"
+    set_attributes(trace.get_current_span(), cache_result=source)
+    return cached
+
+
+def name_replacements(personalization: dict) -> dict:
+    """Map each name placeholder to its personalized value (with a neutral fallback)."""
+    return {
+        PATIENT_NAME_PLACEHOLDER: str(personalization.get("patient_name") or "you"),
+        DOCTOR_NAME_PLACEHOLDER: str(personalization.get("doctor_name") or "your doctor"),
+    }
+
+
+def personalize_instructions(response: dict, personalization: dict) -> dict:
+    """
+    Substitute name placeholders in a cached or freshly generated response.
+
+    Args:
+        response: {"instructions": str, "reasoning": str} generated against placeholders.
+        personalization: Personalization layer from split_instruction_context.
+
+    Returns:
+        dict: New response dict with real names filled in.
+    """
+    replacements = name_replacements(personalization)
+    personalized = dict(response)
+    for field in ("instructions", "reasoning"):
+        text = personalized.get(field) or ""
+        for placeholder, value in replacements.items():
+            text = text.replace(placeholder, value)
+        personalized[field] = text
+    return personalized
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for prompt budgeting (about four characters per token)."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _history_type(entry: dict) -> str:
+    return str(entry.get("type", entry.get("procedure_type", "?")))
+
+
+def _format_history_entry(entry: dict) -> str:
+    if "id" in entry or "perform_at" in entry:
+        return f"  - {_history_type(entry)} (id={entry.get('id', '?')}, {entry.get('perform_at', '')})"
+    return f"  - {_history_type(entry)}"
+
+
+def _history_entry_chars(entry: dict, history_type: str) -> int:
+    """Length of _format_history_entry(entry) plus its newline, without building the line."""
+    chars = 5 + len(history_type)
+    if "id" in entry or "perform_at" in entry:
+        chars += 8 + len(str(entry.get("id", "?"))) + len(str(entry.get("perform_at", "")))
+    return chars
+
+
+def compact_procedure_history(history: list, token_budget: int = None, verbatim_entries: int = None) -> tuple:
+    """
+    Render procedure history within a token budget.
+
+    If the full listing fits it is returned unchanged. Otherwise the most recent entries are kept
+    verbatim, the rest are collapsed per procedure type into a count with a date range, and the
+    least recent groups are omitted if even the summary does not fit. Over budget, only the kept
+    lines are formatted: the full listing is measured, and the rest is grouped and counted.
+
+    Args:
+        history: List of history entries ({"id", "type", "perform_at", ...}).
+        token_budget: Token budget for the listing (defaults to HISTORY_TOKEN_BUDGET; <= 0 disables compaction).
+        verbatim_entries: Recent entries kept verbatim (defaults to HISTORY_VERBATIM_ENTRIES).
+
+    Returns:
+        tuple: (lines, report) where report has entries, verbatim, collapsed, omitted,
+               dropped_chars and dropped_tokens.
+    """
+    token_budget = HISTORY_TOKEN_BUDGET if token_budget is None else token_budget
+    verbatim_entries = HISTORY_VERBATIM_ENTRIES if verbatim_entries is None else verbatim_entries
+    entries = [h if isinstance(h, dict) else {"type": h} for h in history]
+    report = {
+        "entries": len(entries),
+        "verbatim": len(entries),
+        "collapsed": 0,
+        "omitted": 0,
+        "dropped_chars": 0,
+        "dropped_tokens": 0,
+    }
+    budget_chars = token_budget * CHARS_PER_TOKEN
+    if token_budget <= 0:
+        return [_format_history_entry(h) for h in entries], report
+    types = [_history_type(h) for h in entries]
+    full_chars = sum(map(_history_entry_chars, entries, types))
+    if full_chars <= budget_chars:
+        return [_format_history_entry(h) for h in entries], report
+
+    dates = [str(h.get("perform_at") or "") for h in entries]
+    lines = []
+    used = 0
+    kept = set()
+    # Same entries, in the same order, as the first verbatim_entries of a stable newest-first sort.
+    for i in heapq.nlargest(max(0, verbatim_entries), range(len(entries)), key=dates.__getitem__):
+        line = _format_history_entry(entries[i])
+        if used + len(line) + 1 > budget_chars:
+            break
+        lines.append(line)
+        used += len(line) + 1
+        kept.add(i)
+
+    buckets = {}
+    for i, raw_type in enumerate(types):
+        if i not in kept:
+            buckets.setdefault(raw_type, []).append(i)
+    # Each group is [count, earliest date, latest date, undated count, newest perform_at, its index];
+    # undated entries never stand in for either end of the range. Groups are listed newest first
+    # (ties by position in the history), so the least recent ones are omitted first.
+    by_type = {}
+    for raw_type, indexes in buckets.items():
+        whens = [dates[i] for i in indexes]
+        newest = max(whens)
+        dated = [when[:10] for when in whens if when]
+        by_type[raw_type] = [
+            len(indexes),
+            min(dated, default=""),
+            max(dated, default=""),
+            len(indexes) - len(dated),
+            newest,
+            indexes[whens.index(newest)],
+        ]
+    groups = {}
+    for raw_type, (n, first, last, undated, newest, index) in by_type.items():
+        key = " ".join(raw_type.lower().split())
+        group = groups.get(key)
+        if group is None:
+            groups[key] = [n, first, last, undated, newest, index]
+            continue
+        group[0] += n
+        group[3] += undated
+        if first and (not group[1] or first < group[1]):
+            group[1] = first
+        if last > group[2]:
+            group[2] = last
+        if (newest, -index) > (group[4], -group[5]):
+            group[4], group[5] = newest, index
+    omitted = 0
+    collapsed = 0
+    reserve = 48  # room for the "omitted" line
+    for procedure_type, (n, first, last, undated, _, _) in sorted(
+        groups.items(), key=lambda item: (item[1][4], -item[1][5]), reverse=True
+    ):
+        dates_shown = [f"{first} to {last}" if first != last else first] if first else []
+        if undated:
+            dates_shown.append("undated" if undated == n else f"{undated} undated")
+        dates_shown = f" ({', '.join(dates_shown)})" if dates_shown else ""
+        line = f"  - {procedure_type} x{n}{dates_shown}"
+        if used + len(line) + 1 > budget_chars - reserve:
+            omitted += n
+            continue
+        lines.append(line)
+        used += len(line) + 1
+        collapsed += n
+    if omitted:
+        line = f"  - ... {omitted} older entries omitted"
+        lines.append(line)
+        used += len(line) + 1
+
+    report.update(
+        verbatim=len(kept),
+        collapsed=collapsed,
+        omitted=omitted,
+        dropped_chars=max(0, full_chars - used),
+        dropped_tokens=max(0, full_chars - used) // CHARS_PER_TOKEN,
+    )
+    return lines, report
+
+
+@traced_prompt_builder("build_instruction_input")
+def build_instruction_input(context: dict, report: dict = None) -> str:
     """
     Format context into a prompt for instruction generation.
 
+    Long procedure histories are compacted to HISTORY_TOKEN_BUDGET (see compact_procedure_history).
+
     Args:
         context: Dict with procedure_id, procedure_type, procedure_status, perform_at,
                  days_post_op, patient_id, patient_name, doctor_name, procedure_history.
+        report: Optional dict that receives the history compaction report.
 
     Returns:
         str: Formatted prompt for the agent.
@@ -56,6 +751,8 @@ def build_instruction_input(context: dict) -> str:
         parts.append(f"PERFORMED AT: {context['perform_at']}")
     if context.get("days_post_op") is not None:
         parts.append(f"DAYS POST-OP: {context['days_post_op']}")
+    if context.get("recovery_phase"):
+        parts.append(f"RECOVERY PHASE: {_describe_recovery_phase(context['recovery_phase'])}")
     if context.get("patient_name"):
         parts.append(f"PATIENT: {context['patient_name']}")
     if context.get("doctor_name"):
@@ -63,16 +760,56 @@ def build_instruction_input(context: dict) -> str:
     if context.get("procedure_history"):
         history = context["procedure_history"]
         if isinstance(history, list):
-            lines = [
-                f"  - {h.get('type', h.get('procedure_type', '?'))} (id={h.get('id', '?')}, {h.get('perform_at', '')})"
-                for h in history
-            ]
-            parts.append("PROCEDURE HISTORY (this patient):\n" + "\n".join(lines))
+            lines, history_report = compact_procedure_history(history)
+            if report is not None:
+                report.update(history_report)
+            if history_report["dropped_chars"]:
+                count("history_compactions")
+                count("history_chars_dropped", history_report["dropped_chars"])
+                logging.debug(
+                    f"Compacted procedure history: {history_report['entries']} entries, "
+                    f"dropped {history_report['dropped_chars']} chars (~{history_report['dropped_tokens']} tokens)"
+                )
+                parts.append(
+                    f"PROCEDURE HISTORY (this patient, {history_report['entries']} entries, most recent first):\n"
+                    + "\n".join(lines)
+                )
+            else:
+                parts.append("PROCEDURE HISTORY (this patient):\n" + "\n".join(lines))
         else:
             parts.append(f"PROCEDURE HISTORY: {history}")
     return "\n\n".join(parts) if parts else "No additional context provided."
 
 
+@traced_prompt_builder("build_generation_input")
+def build_generation_input(clinical: dict) -> str:
+    """
+    Format a clinical context for generation on a cache miss.
+
+    A context with procedure history is not served from the corpus; its corpus entry, if any, is
+    passed along as a draft to adapt to this patient's history.
+
+    Args:
+        clinical: Clinical part of the context from split_instruction_context.
+
+    Returns:
+        str: Formatted prompt for the agent.
+    """
+    prompt = build_instruction_input(clinical)
+    draft = instruction_corpus.lookup_draft(clinical) if clinical.get("procedure_history") else None
+    if draft is None:
+        return prompt
+    return "\n\n".join(
+        [
+            prompt,
+            "DRAFT INSTRUCTIONS (standard for this procedure and recovery phase, written without this "
+            "patient's history; adapt them to the procedure history above and keep the placeholders):",
+            draft["instructions"],
+        ]
+    )
+
+
+@traced_prompt_builder("build_adjustment_input")
 def build_adjustment_input(message: str, current_instructions: str, context: dict) -> str:
     """
     Format adjustment request into a prompt.
@@ -98,27 +835,205 @@ def build_adjustment_input(message: str, current_instructions: str, context: dic
     return "\n".join(parts)
 
 
-def process_instruction_generation(context: dict) -> dict:
+async def process_instruction_generation_async(context: dict, deadline: float = None) -> dict:
     """
     Generate initial post-surgery instructions from context.
 
+    When the instruction cache is enabled the model sees only the clinical part of the context
+    (with name placeholders); the result is cached per clinical key and personalized locally.
+    On a cache miss the precomputed corpus is consulted before calling the model; with procedure
+    history the model is always called, starting from the corpus entry as a draft.
+
+    If the model misses the deadline, the best precomputed answer is returned instead (see
+    degraded_instructions).
+
     Args:
         context: Procedure/patient context from Rails.
+        deadline: time.monotonic() deadline for the model call, or None.
 
     Returns:
-        dict: {"instructions": str, "reasoning": str}
+        dict: {"instructions": str, "reasoning": str}, plus "model_tier" when the model was called
+              or "degraded" when a fallback was served.
+
+    Raises:
+        DeadlineExceeded: If the deadline passed and there was nothing to fall back on.
     """
-    agent = create_instruction_agent(INSTRUCTION_GENERATION_PROMPT)
-    agent_input = build_instruction_input(context or {})
-    result = agent(agent_input)
-    structured = result.structured_output
-    return {
+    context = context or {}
+    tier = generation_tier(context)
+    if not INSTRUCTION_CACHE_ENABLED:
+        agent_input = build_instruction_input(context)
+        try:
+            structured = await run_instruction_agent_async(
+                INSTRUCTION_GENERATION_PROMPT, agent_input, tier=tier, deadline=deadline
+            )
+        except DeadlineExceeded:
+            fallback = degraded_generation(context)
+            if fallback is None:
+                raise
+            return fallback
+        return {
+            "instructions": structured.instructions,
+            "reasoning": structured.reasoning,
+            "model_tier": tier,
+        }
+
+    clinical, personalization = split_instruction_context(context)
+    cache_key = instruction_cache_key(clinical)
+    cached = lookup_base_instructions(cache_key, clinical)
+    if cached is not None:
+        return personalize_instructions(cached, personalization)
+    try:
+        structured = await run_instruction_agent_async(
+            INSTRUCTION_GENERATION_PROMPT, build_generation_input(clinical), tier=tier, deadline=deadline
+        )
+    except DeadlineExceeded:
+        fallback = degraded_generation(context)
+        if fallback is None:
+            raise
+        return fallback
+    generated = {
         "instructions": structured.instructions,
         "reasoning": structured.reasoning,
     }
+    instruction_cache.put(cache_key, generated)
+    return {**personalize_instructions(generated, personalization), "model_tier": tier}
 
 
-def process_instruction_adjustment(message: str, current_instructions: str, context: dict) -> dict:
+def degraded_generation(context: dict):
+    """
+    Personalized degraded answer for a generation that missed its deadline, in the model call
+    or before it (e.g. while queued for an in-flight slot).
+
+    Returns:
+        dict | None: Response with "degraded": True (see degraded_instructions), or None.
+    """
+    clinical, personalization = split_instruction_context(context or {})
+    cache_key = instruction_cache_key(clinical) if INSTRUCTION_CACHE_ENABLED else None
+    fallback = degraded_instructions(cache_key, clinical)
+    if fallback is None:
+        return None
+    return personalize_instructions(fallback, personalization)
+
+
+def degraded_instructions(cache_key: str, clinical: dict):
+    """
+    Best available answer when the model missed the deadline.
+
+    Another request may have filled the cache while this one waited; otherwise the corpus entry
+    for the nearest recovery phase of the same procedure is used.
+
+    Args:
+        cache_key: Instruction cache key, or None when the cache is disabled.
+        clinical: Clinical part of the context from split_instruction_context.
+
+    Returns:
+        dict | None: Placeholder-based response with "degraded": True and "degraded_source", or None.
+    """
+    count("deadline_degraded")
+    fallback = instruction_cache.get(cache_key) if cache_key else None
+    source = "cache"
+    if fallback is None:
+        fallback = instruction_corpus.lookup_nearest(clinical, tuple(name for name, _, _ in RECOVERY_PHASES))
+        source = "corpus_nearest_phase"
+    if fallback is None:
+        count("deadline_unserved")
+        return None
+    set_attributes(trace.get_current_span(), degraded_source=source)
+    return {**fallback, "degraded": True, "degraded_source": source}
+
+
+async def _generate_section(title: str, focus: str, section_context: dict, tier: str = TIER_LARGE) -> dict:
+    """Generate (or fetch from cache) the body of one instruction section."""
+    cache_key = None
+    if INSTRUCTION_CACHE_ENABLED:
+        cache_key = "section:" + instruction_cache_key({**section_context, "section": title})
+        cached = instruction_cache.get(cache_key)
+        if cached is not None:
+            return cached
+    agent_input = build_instruction_input(section_context) + f"\n\nSECTION TO WRITE: {title}\nCOVER: {focus}"
+    structured = await run_instruction_agent_async(INSTRUCTION_SECTION_PROMPT, agent_input, tier=tier)
+    generated = {
+        "instructions": structured.instructions,
+        "reasoning": structured.reasoning,
+    }
+    if cache_key:
+        instruction_cache.put(cache_key, generated)
+    return generated
+
+
+async def process_instruction_generation_sectioned_async(context: dict) -> dict:
+    """
+    Generate instructions as one concurrent model call per section in INSTRUCTION_SECTIONS.
+
+    Sections only see the procedure type/status and recovery phase, so each section is cached on
+    its own and shared across patients. Sections are assembled in fixed order under colon headings;
+    if any section fails the whole request fails.
+
+    Args:
+        context: Procedure/patient context from Rails.
+
+    Returns:
+        dict: {"instructions": str, "reasoning": str}
+    """
+    clinical, personalization = split_instruction_context(context or {})
+    section_context = {
+        k: clinical[k] for k in ("procedure_type", "procedure_status", "recovery_phase", "days_post_op") if k in clinical
+    }
+    tier = generation_tier(clinical)
+    tasks = [
+        asyncio.ensure_future(_generate_section(title, focus, section_context, tier))
+        for title, focus in INSTRUCTION_SECTIONS
+    ]
+    try:
+        sections = await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+    titles = [title for title, _ in INSTRUCTION_SECTIONS]
+    response = {
+        "instructions": "\n\n".join(
+            f"{title}:\n{section['instructions'].strip()}" for title, section in zip(titles, sections)
+        ),
+        "reasoning": "\n".join(
+            f"{title}: {section['reasoning'].strip()}" for title, section in zip(titles, sections)
+        ),
+    }
+    return {**personalize_instructions(response, personalization), "model_tier": tier}
+
+
+def fast_path_adjustment(message: str, current_instructions: str):
+    """
+    Apply a mechanical adjustment ("change X to Y", "remove the line about X", "add a note saying X")
+    locally when a rule recognizes it with at least FAST_PATH_MIN_CONFIDENCE.
+
+    Args:
+        message: Feedback text.
+        current_instructions: Current instruction text.
+
+    Returns:
+        dict | None: {"instructions", "reasoning", "fast_path": rule name}, or None if the model should handle it.
+    """
+    if not FAST_PATH_ENABLED:
+        count("adjustment_model_path")
+        return None
+    with stage("rule_adjustment") as span:
+        edit = apply_rule_adjustment(message, current_instructions)
+        if edit is not None:
+            set_attributes(span, rule=edit.rule, confidence=edit.confidence)
+    if edit is None or edit.confidence < FAST_PATH_MIN_CONFIDENCE:
+        count("adjustment_model_path")
+        if edit is not None:
+            count("adjustment_fast_path_low_confidence")
+        return None
+    count("adjustment_fast_path")
+    count(f"adjustment_fast_path_{edit.rule}")
+    return {"instructions": edit.instructions, "reasoning": edit.reasoning, "fast_path": edit.rule}
+
+
+async def process_instruction_adjustment_async(
+    message: str, current_instructions: str, context: dict, deadline: float = None
+) -> dict:
     """
     Adjust existing instructions based on doctor/nurse feedback.
 
@@ -126,19 +1041,428 @@ def process_instruction_adjustment(message: str, current_instructions: str, cont
         message: Feedback text.
         current_instructions: Current instruction text.
         context: Procedure/patient context.
+        deadline: time.monotonic() deadline for the model call, or None.
 
     Returns:
-        dict: {"instructions": str, "reasoning": str}
+        dict: {"instructions": str, "reasoning": str, "model_tier": str}
+
+    Raises:
+        DeadlineExceeded: If the model did not respond before the deadline.
     """
-    agent = create_instruction_agent(INSTRUCTION_ADJUSTMENT_PROMPT)
+    tier = adjustment_tier(message, current_instructions, context)
     agent_input = build_adjustment_input(
         message=message,
         current_instructions=current_instructions or "",
         context=context or {},
     )
-    result = agent(agent_input)
-    structured = result.structured_output
+    structured = await run_instruction_agent_async(
+        INSTRUCTION_ADJUSTMENT_PROMPT, agent_input, tier=tier, deadline=deadline
+    )
     return {
         "instructions": structured.instructions,
         "reasoning": structured.reasoning,
+        "model_tier": tier,
     }
+
+
+async def run_conversation_round_async(messages: list, agent_input, tier: str, deadline: float = None) -> tuple:
+    """
+    Run one round of a held conversation on a pooled adjustment agent.
+
+    Each call (including a hedge) works on its own copy of the conversation, so the held one only
+    changes when a round succeeds. The agent goes back to its pool afterwards.
+
+    Args:
+        messages: Conversation so far ([] to start one).
+        agent_input: Prompt text, or a callable taking the copied messages and returning the prompt.
+        tier: Model tier of the conversation.
+        deadline: time.monotonic() deadline for the call, or None.
+
+    Returns:
+        tuple: (structured output, conversation including this round)
+
+    Raises:
+        DeadlineExceeded: If the model did not respond before the deadline.
+    """
+    count(f"model_tier_{tier}")
+    pool = get_agent_pool(INSTRUCTION_ADJUSTMENT_PROMPT, tier=tier)
+    session_pool = f"adjustment_session/{tier}"
+
+    async def call():
+        conversation = copy_conversation(messages)
+        prompt = agent_input(conversation) if callable(agent_input) else agent_input
+        async with pool.acheckout(timeout=AGENT_POOL_TIMEOUT_SECONDS) as agent:
+            agent.messages = conversation
+            structured = await invoke_agent_async(agent, prompt, session_pool)
+            # The pool clears agent.messages in place on release; keep the list's contents.
+            return structured, list(agent.messages)
+
+    return await hedger.run(session_pool, call, deadline, can_hedge=pool.has_capacity)
+
+
+async def process_instruction_adjustment_session_async(
+    session_id: str, message: str, current_instructions: str, context: dict, deadline: float = None
+) -> dict:
+    """
+    Adjust instructions within a conversation held for the runtime session.
+
+    A first round is a regular pooled adjustment; only its output is remembered. When a later
+    round adjusts exactly that output (same context), the conversation is kept from then on, and
+    once it is held only the new feedback is sent, the earlier rounds being served from the prompt
+    cache. Otherwise the session starts over. Every round runs on a pooled agent, is hedged and
+    honors the deadline; if another round for the same session is still running, this round is
+    handled statelessly.
+
+    Args:
+        session_id: AgentCore runtimeSessionId.
+        message: Feedback text.
+        current_instructions: Current instruction text.
+        context: Procedure/patient context.
+        deadline: time.monotonic() deadline for the model call, or None.
+
+    Returns:
+        dict: {"instructions": str, "reasoning": str, "model_tier": str}
+
+    Raises:
+        DeadlineExceeded: If the model did not respond before the deadline.
+    """
+    session, state = adjustment_sessions.checkout(session_id)
+    if state == "busy":
+        count("adjustment_session_busy")
+        return await process_instruction_adjustment_async(message, current_instructions, context, deadline)
+    context = context or {}
+    context_key = instruction_cache_key(context)
+    if session is None or not session.matches(current_instructions, context_key):
+        count("adjustment_session_new" if session is None else "adjustment_session_resend")
+        try:
+            result = await process_instruction_adjustment_async(message, current_instructions, context, deadline)
+        except BaseException:
+            if session is not None:
+                adjustment_sessions.discard(session)
+            raise
+        if session is None:
+            session = AdjustmentSession(session_id=session_id, context_key=context_key)
+        session.context_key = context_key
+        session.tier = result["model_tier"]
+        session.messages = []
+        session.instructions = result["instructions"]
+        session.rounds = 1
+        adjustment_sessions.checkin(session)
+        return result
+
+    if session.messages:
+        count("adjustment_session_incremental")
+        text = build_session_followup_input(message)
+
+        def agent_input(conversation):
+            mark_cache_point(conversation)
+            return followup_prompt(conversation, text)
+
+    else:
+        # First follow-up: the conversation is held from here on.
+        count("adjustment_session_started")
+        session.tier = adjustment_tier(message, current_instructions, context)
+        agent_input = build_adjustment_input(message, current_instructions or "", context)
+    try:
+        structured, session.messages = await run_conversation_round_async(
+            session.messages, agent_input, session.tier, deadline
+        )
+    except BaseException:
+        adjustment_sessions.discard(session)
+        raise
+    session.instructions = structured.instructions
+    session.rounds += 1
+    adjustment_sessions.checkin(session)
+    return {
+        "instructions": structured.instructions,
+        "reasoning": structured.reasoning,
+        "model_tier": session.tier,
+    }
+
+
+async def process_instruction_generation_batch_async(
+    contexts: list, max_concurrency: int = None, item_slot=None
+) -> dict:
+    """
+    Generate instructions for many contexts with bounded concurrency.
+
+    A failing item, or an entry that is not a context object, is reported in its slot and does
+    not fail the batch.
+
+    Args:
+        contexts: List of procedure/patient contexts (same shape as instruction_generation).
+        max_concurrency: Parallel generations (defaults to BATCH_MAX_CONCURRENCY, clamped to
+            1..BATCH_MAX_CONCURRENCY).
+        item_slot: Zero-argument callable returning an async context manager held around each
+            item's generation (e.g. an in-flight slot of the entrypoint's limiter), or None.
+
+    Raises:
+        ValueError: If max_concurrency is not an integer.
+
+    Returns:
+        dict: {"results": [...], "succeeded": int, "failed": int} with results in input order; each
+              result is {"instructions": str, "reasoning": str} or the error shape with "error".
+    """
+    concurrency = BATCH_MAX_CONCURRENCY if max_concurrency is None else int(max_concurrency)
+    semaphore = asyncio.Semaphore(max(1, min(concurrency, BATCH_MAX_CONCURRENCY)))
+
+    async def generate(index, context):
+        if not isinstance(context, dict):
+            return {
+                "error": f"Batch item {index} must be a context object, got {type(context).__name__}",
+                "instructions": "",
+                "reasoning": "",
+            }
+        async with semaphore:
+            try:
+                async with item_slot() if item_slot else nullcontext():
+                    return await process_instruction_generation_async(context)
+            except Exception as e:
+                logging.error(f"Batch item {index} failed: {e}", exc_info=True)
+                return {
+                    "error": str(e),
+                    "instructions": "",
+                    "reasoning": "",
+                }
+
+    results = await asyncio.gather(*(generate(i, c) for i, c in enumerate(contexts)))
+    failed = sum(1 for r in results if "error" in r)
+    return {
+        "results": list(results),
+        "succeeded": len(results) - failed,
+        "failed": failed,
+    }
+
+
+@traced_prompt_builder("build_session_followup_input")
+def build_session_followup_input(message: str) -> str:
+    """
+    Format a later adjustment round for a session that already holds the instructions and context.
+
+    Args:
+        message: Doctor/nurse feedback.
+
+    Returns:
+        str: Prompt carrying only the new feedback.
+    """
+    return "\n".join(
+        [
+            "FEEDBACK FROM DOCTOR/NURSE:",
+            message,
+            "",
+            "Apply this feedback to the instructions from your previous answer and return the full updated text.",
+        ]
+    )
+
+
+@traced_prompt_builder("build_patch_input")
+def build_patch_input(message: str, current_instructions: str, context: dict, titles: list) -> str:
+    """
+    Format a patch-mode adjustment request into a prompt.
+
+    Args:
+        message: Doctor/nurse feedback.
+        current_instructions: Existing instruction text.
+        context: Same context dict as generation.
+        titles: Section headings found in current_instructions.
+
+    Returns:
+        str: Formatted prompt for the agent.
+    """
+    headings = "\n".join(f"- {t}" for t in titles)
+    return build_adjustment_input(message, current_instructions, context) + f"\n\nSECTION HEADINGS:\n{headings}"
+
+
+async def process_instruction_patch_async(message: str, current_instructions: str, context: dict) -> dict:
+    """
+    Adjust instructions through section-level edits applied locally.
+
+    The model only emits the edits; they are applied deterministically to current_instructions.
+    Falls back to a full adjustment when the text has no sections or an edit anchor matches no
+    section or several.
+
+    Args:
+        message: Feedback text.
+        current_instructions: Current instruction text.
+        context: Procedure/patient context.
+
+    Returns:
+        dict: {"instructions": str, "reasoning": str, "edits": [...]} on success; the full-adjustment
+              result plus "patch_fallback" (reason) otherwise.
+    """
+    titles = section_titles(current_instructions or "")
+    if not titles:
+        reason = "current instructions have no section headings"
+    else:
+        tier = adjustment_tier(message, current_instructions, context)
+        agent_input = build_patch_input(message, current_instructions, context or {}, titles)
+        patch = await run_instruction_agent_async(
+            INSTRUCTION_PATCH_PROMPT, agent_input, InstructionPatchResponse, tier=tier
+        )
+        try:
+            instructions = apply_section_edits(current_instructions, patch.edits)
+        except SectionAnchorError as e:
+            reason = str(e)
+        else:
+            count("patch_applied")
+            return {
+                "instructions": instructions,
+                "reasoning": patch.reasoning,
+                "edits": [edit.model_dump() for edit in patch.edits],
+                "model_tier": tier,
+            }
+    logging.warning(f"Patch adjustment falling back to full regeneration: {reason}")
+    count("patch_fallback")
+    result = await process_instruction_adjustment_async(message, current_instructions, context)
+    return {**result, "patch_fallback": reason}
+
+
+@traced_prompt_builder("build_refresh_section_input")
+def build_refresh_section_input(title: str, focus: str, current_body: str, context: dict, old_phase: str) -> str:
+    """
+    Format a request to update one section for a new recovery phase.
+
+    Args:
+        title: Section heading.
+        focus: What the section covers (INSTRUCTION_SECTIONS).
+        current_body: The section's current text, clinician edits included.
+        context: Context for the new days post-op.
+        old_phase: Recovery phase the current text was written for.
+
+    Returns:
+        str: Formatted prompt for the agent.
+    """
+    return "\n".join(
+        [
+            build_instruction_input(context),
+            "",
+            f"SECTION TO WRITE: {title}",
+            f"COVER: {focus}",
+            f"PREVIOUS RECOVERY PHASE: {_describe_recovery_phase(old_phase)}",
+            "",
+            "CURRENT SECTION TEXT:",
+            current_body.strip() or "(empty)",
+        ]
+    )
+
+
+async def _refresh_section(title: str, focus: str, current_body: str, context: dict, old_phase: str, tier: str):
+    """Update one section for the new recovery phase; never served from the shared section cache."""
+    agent_input = build_refresh_section_input(title, focus, current_body, context, old_phase)
+    structured = await run_instruction_agent_async(INSTRUCTION_REFRESH_PROMPT, agent_input, tier=tier)
+    return {
+        "instructions": section_body(structured.instructions),
+        "reasoning": structured.reasoning,
+    }
+
+
+async def process_instruction_refresh_async(
+    current_instructions: str, old_days_post_op, new_days_post_op, context: dict
+) -> dict:
+    """
+    Bring instructions up to date as days post-op advances.
+
+    If no recovery-phase boundary was crossed the instructions are returned unchanged without a
+    model call. Otherwise each of the REFRESH_SECTIONS found in the document is sent to the model
+    with its current text and updated for the new phase, keeping clinician-specific content; the
+    result (greeting and headings stripped) is swapped in and every other section is kept
+    byte-for-byte. Without any of those sections, or when one matches several headings, the
+    whole document is regenerated instead.
+
+    Args:
+        current_instructions: Current instruction text.
+        old_days_post_op: Days post-op the instructions were written for.
+        new_days_post_op: Days post-op now.
+        context: Procedure/patient context (its days_post_op is replaced by new_days_post_op).
+
+    Returns:
+        dict: {"instructions", "reasoning", "refreshed_sections": [...], "phases_crossed": [...]},
+              plus "unchanged": True when nothing needed refreshing or "refresh_fallback" (reason)
+              after a full regeneration.
+    """
+    crossed = phases_crossed(old_days_post_op, new_days_post_op)
+    if not crossed:
+        count("refresh_unchanged")
+        return {
+            "instructions": current_instructions,
+            "reasoning": f"Still in the {recovery_phase(new_days_post_op)} recovery phase; no changes needed.",
+            "refreshed_sections": [],
+            "phases_crossed": [],
+            "unchanged": True,
+        }
+    context = {**(context or {}), "days_post_op": new_days_post_op}
+    sections = parse_sections(current_instructions or "")
+    focus_by_title = dict(INSTRUCTION_SECTIONS)
+    targets = []
+    reason = ""
+    for title in REFRESH_SECTIONS:
+        try:
+            index = find_section(sections, title)
+        except AmbiguousSectionError as e:
+            reason = str(e)
+            break
+        except SectionAnchorError:
+            continue
+        targets.append((sections[index].title, focus_by_title.get(title, title), sections[index].body))
+    if reason or not targets:
+        reason = reason or f"none of {', '.join(REFRESH_SECTIONS)} found in the current instructions"
+        logging.warning(f"Refresh falling back to full regeneration: {reason}")
+        count("refresh_fallback")
+        result = await process_instruction_generation_async(context)
+        return {**result, "refreshed_sections": [], "phases_crossed": crossed, "refresh_fallback": reason}
+
+    clinical, personalization = split_instruction_context(context)
+    old_phase = recovery_phase(old_days_post_op)
+    tier = generation_tier(clinical)
+    tasks = [
+        asyncio.ensure_future(_refresh_section(title, focus, body, clinical, old_phase, tier))
+        for title, focus, body in targets
+    ]
+    try:
+        generated = await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+    refreshed = [personalize_instructions(section, personalization) for section in generated]
+    edits = [
+        SectionEdit(operation="replace", anchor=title, content=section["instructions"].strip())
+        for (title, _, _), section in zip(targets, refreshed)
+    ]
+    count("refresh_sections", len(edits))
+    return {
+        "instructions": apply_section_edits(current_instructions, edits),
+        "reasoning": "\n".join(
+            f"{title}: {section['reasoning'].strip()}" for (title, _, _), section in zip(targets, refreshed)
+        ),
+        "refreshed_sections": [title for title, _, _ in targets],
+        "phases_crossed": crossed,
+        "model_tier": tier,
+    }
+
+
+def process_instruction_generation(context: dict) -> dict:
+    """Synchronous wrapper around process_instruction_generation_async (not for use inside an event loop)."""
+    return asyncio.run(process_instruction_generation_async(context))
+
+
+def process_instruction_adjustment(message: str, current_instructions: str, context: dict) -> dict:
+    """
+    Synchronous adjustment (not for use inside an event loop): the local fast path when a rule
+    applies, otherwise process_instruction_adjustment_async.
+    """
+    fast = fast_path_adjustment(message, current_instructions)
+    if fast is not None:
+        return fast
+    return asyncio.run(
+        process_instruction_adjustment_async(
+            message=message,
+            current_instructions=current_instructions,
+            context=context,
+        )
+    )
+
+
+def process_instruction_generation_batch(contexts: list, max_concurrency: int = None) -> dict:
+    """Synchronous wrapper around process_instruction_generation_batch_async (not for use inside an event loop)."""
+    return asyncio.run(process_instruction_generation_batch_async(contexts, max_concurrency=max_concurrency))
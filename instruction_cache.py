@@ -0,0 +1,90 @@
+"""In-process LRU cache with per-entry TTL for generated instructions."""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class InstructionCache:
+    """
+    Thread-safe LRU cache whose entries also expire after a fixed TTL.
+
+    Values are stored as-is; callers are expected to store immutable data or
+    copy on read.
+    """
+
+    def __init__(self, max_entries: int = 512, ttl_seconds: float = 3600.0):
+        """
+        Args:
+            max_entries: Maximum number of entries before the least recently used is evicted.
+            ttl_seconds: Seconds an entry stays valid after it was stored (<= 0 disables expiry).
+        """
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_seconds = float(ttl_seconds)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+
+    def get(self, key: str):
+        """
+        Look up a key, refreshing its LRU position.
+
+        Returns:
+            The cached value, or None on a miss or an expired entry.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= now:
+                del self._entries[key]
+                self._expirations += 1
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def put(self, key: str, value) -> None:
+        """Store a value, evicting the least recently used entries when full."""
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds > 0 else None
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate(self) -> int:
+        """
+        Drop every entry.
+
+        Returns:
+            int: Number of entries removed.
+        """
+        with self._lock:
+            removed = len(self._entries)
+            self._entries.clear()
+            self._invalidations += 1
+        return removed
+
+    def stats(self) -> dict:
+        """Snapshot of cache counters."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "invalidations": self._invalidations,
+            }
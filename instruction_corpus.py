@@ -0,0 +1,168 @@
+"""Precomputed base instructions baked into the container by prewarm_corpus.py."""
+
+import json
+import logging
+import os
+import threading
+
+CORPUS_FORMAT_VERSION = 1
+
+
+def corpus_key(procedure_type: str, recovery_phase: str, procedure_status: str = "") -> str:
+    """Key of a corpus entry; inputs are expected to be normalized by split_instruction_context."""
+    return f"{procedure_type}|{recovery_phase}|{procedure_status}"
+
+
+class InstructionCorpus:
+    """
+    Read-only index of placeholder-based instructions per procedure type, recovery phase and status.
+
+    A corpus generated under different prompts (fingerprint mismatch) or an older format is
+    reported as stale and never served.
+    """
+
+    def __init__(self, entries: dict = None, prompts_fingerprint: str = "", path: str = "", stale_reason: str = ""):
+        """
+        Args:
+            entries: Mapping of corpus_key to {"instructions": str, "reasoning": str, ...}.
+            prompts_fingerprint: Fingerprint of the prompts the corpus was generated with.
+            path: File the corpus was loaded from (for logs and metrics).
+            stale_reason: Why the corpus is not being served, if it is not.
+        """
+        self.entries = entries or {}
+        self.prompts_fingerprint = prompts_fingerprint
+        self.path = path
+        self.stale_reason = stale_reason
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._history_bypasses = 0
+        self._drafts = 0
+        self._nearest_hits = 0
+
+    @classmethod
+    def load(cls, path: str, expected_fingerprint: str) -> "InstructionCorpus":
+        """
+        Load a corpus file, checking it was generated with the current prompts.
+
+        Args:
+            path: JSON corpus written by prewarm_corpus.py.
+            expected_fingerprint: PROMPTS_FINGERPRINT of the running code.
+
+        Returns:
+            InstructionCorpus: Loaded corpus, or an empty one if the file is missing, unreadable or stale.
+        """
+        if not path or not os.path.exists(path):
+            return cls(path=path, stale_reason="no corpus file")
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable instruction corpus {path}: {e}")
+            return cls(path=path, stale_reason=f"unreadable: {e}")
+        fingerprint = data.get("prompts_fingerprint", "")
+        if data.get("format_version") != CORPUS_FORMAT_VERSION:
+            reason = f"format_version {data.get('format_version')} != {CORPUS_FORMAT_VERSION}"
+        elif fingerprint != expected_fingerprint:
+            reason = f"prompts fingerprint {fingerprint} != {expected_fingerprint}"
+        else:
+            entries = data.get("entries") or {}
+            logging.info(f"Loaded instruction corpus {path} ({len(entries)} entries, prompts {fingerprint})")
+            return cls(entries=entries, prompts_fingerprint=fingerprint, path=path)
+        logging.warning(f"Ignoring stale instruction corpus {path}: {reason}; re-run prewarm_corpus.py")
+        return cls(prompts_fingerprint=fingerprint, path=path, stale_reason=reason)
+
+    def _entry(self, clinical: dict):
+        if not self.entries or not clinical.get("procedure_type") or not clinical.get("recovery_phase"):
+            return None
+        status = clinical.get("procedure_status") or "completed"
+        return self.entries.get(corpus_key(clinical["procedure_type"], clinical["recovery_phase"], status))
+
+    def lookup(self, clinical: dict):
+        """
+        Find the precomputed entry that answers a clinical context as is.
+
+        Matches on procedure type, recovery phase and status (an entry generated for "completed"
+        also serves requests without a status). Entries are generated without procedure history,
+        so a context with history never matches (see lookup_draft).
+
+        Args:
+            clinical: Clinical part of the context from split_instruction_context.
+
+        Returns:
+            dict | None: {"instructions": str, "reasoning": str} generated against name placeholders.
+        """
+        if clinical.get("procedure_history"):
+            with self._lock:
+                self._history_bypasses += 1
+            return None
+        entry = self._entry(clinical)
+        with self._lock:
+            if entry is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+        if entry is None:
+            return None
+        return {"instructions": entry["instructions"], "reasoning": entry["reasoning"]}
+
+    def lookup_draft(self, clinical: dict):
+        """
+        Find the entry for a context's procedure type, phase and status regardless of its history,
+        as a starting point for the model rather than an answer.
+
+        Returns:
+            dict | None: {"instructions": str, "reasoning": str} generated against name placeholders.
+        """
+        entry = self._entry(clinical)
+        if entry is None:
+            return None
+        with self._lock:
+            self._drafts += 1
+        return {"instructions": entry["instructions"], "reasoning": entry["reasoning"]}
+
+    def lookup_nearest(self, clinical: dict, phases: tuple):
+        """
+        Find the closest precomputed entry for a procedure when there is no exact match.
+
+        Used as a degraded answer when the model cannot respond in time: the entry for the same
+        procedure type and status in the nearest recovery phase, preferring earlier (more
+        conservative) phases over later ones.
+
+        Args:
+            clinical: Clinical part of the context from split_instruction_context.
+            phases: Recovery phase names in chronological order.
+
+        Returns:
+            dict | None: {"instructions", "reasoning", "recovery_phase"} with name placeholders.
+        """
+        procedure_type = clinical.get("procedure_type")
+        if not self.entries or not procedure_type:
+            return None
+        status = clinical.get("procedure_status") or "completed"
+        phase = clinical.get("recovery_phase")
+        target = phases.index(phase) if phase in phases else 0
+        # Same phase first, then earlier phases, then later ones.
+        order = sorted(range(len(phases)), key=lambda i: (abs(i - target), i > target))
+        for i in order:
+            entry = self.entries.get(corpus_key(procedure_type, phases[i], status))
+            if entry is not None:
+                with self._lock:
+                    self._nearest_hits += 1
+                return {"instructions": entry["instructions"], "reasoning": entry["reasoning"], "recovery_phase": phases[i]}
+        return None
+
+    def stats(self) -> dict:
+        """Snapshot of corpus counters."""
+        with self._lock:
+            return {
+                "path": self.path,
+                "entries": len(self.entries),
+                "prompts_fingerprint": self.prompts_fingerprint,
+                "stale_reason": self.stale_reason,
+                "hits": self._hits,
+                "misses": self._misses,
+                "history_bypasses": self._history_bypasses,
+                "drafts": self._drafts,
+                "nearest_hits": self._nearest_hits,
+            }
@@ -0,0 +1,227 @@
+"""Rule-based local edits for mechanical adjustment messages (add a note, remove a line, change X to Y)."""
+
+import re
+from dataclasses import dataclass
+
+from instruction_sections import SectionAnchorError, find_section, heading_title, parse_sections, render_sections
+
+_POLITE = r"(?:(?:please|can you|could you|kindly)\s+)?"
+_QUOTES = "\"'“”‘’"
+_REPLACE = re.compile(rf"^{_POLITE}(?:change|replace|update|switch)\s+(?P<old>.+?)\s+(?:to|with|into)\s+(?P<new>.+)$", re.I)
+_REMOVE = re.compile(
+    rf"^{_POLITE}(?:remove|delete|drop|take out)\s+(?:the\s+|any\s+|all\s+)?"
+    r"(?:lines?|bullets?|sentences?|notes?|instructions?|mentions?|parts?)\s+"
+    r"(?:about|on|regarding|mentioning|that mentions?|referring to)\s+(?P<topic>.+)$",
+    re.I,
+)
+_ADD = re.compile(
+    rf"^{_POLITE}add\s+(?:(?:a|an)\s+)?(?:note|line|bullet|reminder|instruction|sentence)\s+"
+    r"(?P<kind>saying|that says|stating|about|on|regarding|that)\s*:?\s+(?P<text>.+)$",
+    re.I,
+)
+_ADD_QUOTED = re.compile(rf"^{_POLITE}add\s*:?\s*[\"“](?P<text>[^\"”]+)[\"”]$", re.I)
+_SECTION_SUFFIX = re.compile(r"\s+(?:to|under|in)\s+(?:the\s+)?(?P<section>[\w &/'-]{2,40}?)\s+section$", re.I)
+_BULLET_PREFIX = re.compile(r"^(?P<indent>\s*)(?P<marker>[-*•]|(?P<number>\d+)[.)])\s")
+_ALL_OCCURRENCES = re.compile(r"\b(?:all|every|everywhere|each)\b", re.I)
+_SCOPE_SUFFIX = re.compile(r"\s+(?:everywhere|throughout|(?:in|at) (?:all|every) (?:places?|occurrences?)|each time)$", re.I)
+_MULTIPLE_SENTENCES = re.compile(r"[.!?;]\s+\S|\n")
+_CONNECTIVES = re.compile(r"\s(?:and|also|then|but)\s|[,;]", re.I)
+_SENTENCE = re.compile(r"[^.!?]+[.!?]*\s*")
+
+MAX_LITERAL_CHARS = 120
+# Below the fast path's default threshold: doses, durations and counts are left to the model.
+NUMERIC_EDIT_CONFIDENCE = 0.5
+_DIGIT = re.compile(r"\d")
+
+
+@dataclass
+class RuleAdjustment:
+    """A locally applied adjustment and how sure the rule is that it did what was asked."""
+
+    rule: str
+    instructions: str
+    reasoning: str
+    confidence: float
+
+
+def _unquote(text: str) -> tuple:
+    """Strip surrounding quotes; returns (text, was_quoted)."""
+    text = text.strip()
+    if len(text) >= 2 and text[0] in _QUOTES and text[-1] in _QUOTES:
+        return text[1:-1].strip(), True
+    return text, False
+
+
+def _sentence(text: str) -> str:
+    text = text.strip().rstrip(".")
+    return text[:1].upper() + text[1:] + "."
+
+
+def apply_rule_adjustment(message: str, current_instructions: str):
+    """
+    Apply a mechanical adjustment locally if the message matches a known pattern.
+
+    Recognized: "change/replace X to/with Y", "remove the line about X" and
+    "add a note saying/about X" (optionally "... to the <heading> section").
+
+    Args:
+        message: Doctor/nurse feedback.
+        current_instructions: Current instruction text.
+
+    Returns:
+        RuleAdjustment | None: The edit with a confidence in [0, 1], or None if no rule applies.
+    """
+    text = current_instructions or ""
+    request = (message or "").strip().rstrip(".!").strip()
+    if not text.strip() or not request or len(request) > 300:
+        return None
+    quoted_add = _ADD_QUOTED.match(request)
+    if quoted_add:
+        return _add_line(text, quoted_add.group("text"), "", confidence=0.95)
+    if _MULTIPLE_SENTENCES.search(request):
+        return None
+    match = _REPLACE.match(request)
+    if match:
+        return _replace_text(text, request, match.group("old"), match.group("new"))
+    match = _REMOVE.match(request)
+    if match:
+        return _remove_lines(text, request, match.group("topic"))
+    section = ""
+    suffix = _SECTION_SUFFIX.search(request)
+    if suffix:
+        section = suffix.group("section")
+        request = request[: suffix.start()]
+    match = _ADD.match(request)
+    if match:
+        note, quoted = _unquote(match.group("text"))
+        literal = quoted or match.group("kind").lower() in ("saying", "that says", "stating")
+        # "about X" / "that they should X" name a topic rather than the wording to add.
+        return _add_line(text, note, section, confidence=0.9 if literal else 0.6)
+    return None
+
+
+def _replace_text(text: str, request: str, old: str, new: str):
+    old, old_quoted = _unquote(old)
+    new, new_quoted = _unquote(_SCOPE_SUFFIX.sub("", new))
+    if not old or not new or len(old) > MAX_LITERAL_CHARS or len(new) > MAX_LITERAL_CHARS:
+        return None
+    # Whole words and numbers only: "5" must not match inside "25" or "2.5", "stairs" not inside "upstairs".
+    literal = rf"(?<!\w)(?<!\d\.){re.escape(old)}(?!\w)(?!\.\d)"
+    pattern = re.compile(literal)
+    occurrences = len(pattern.findall(text))
+    exact_case = occurrences > 0
+    if not exact_case:
+        pattern = re.compile(literal, re.I)
+        occurrences = len(pattern.findall(text))
+        if occurrences == 0:
+            return None
+    replace_all = bool(_ALL_OCCURRENCES.search(request))
+    if occurrences == 1:
+        confidence = 0.95 if exact_case else 0.85
+    else:
+        confidence = 0.9 if replace_all else 0.5
+    if _DIGIT.search(old) or _DIGIT.search(new):
+        confidence = min(confidence, NUMERIC_EDIT_CONFIDENCE)
+    if not new_quoted and _CONNECTIVES.search(new):
+        # "change A to B and add C": the tail is probably a second request.
+        confidence = min(confidence, 0.4)
+    if not old_quoted and re.match(r"(?:the|a|an)\s", old, re.I):
+        # "change the follow-up to ..." describes the text instead of quoting it.
+        confidence = min(confidence, 0.5)
+    count = occurrences if replace_all or occurrences == 1 else 1
+    updated = pattern.sub(lambda _: new, text, count=count)
+    plural = "s" if count > 1 else ""
+    return RuleAdjustment(
+        rule="replace_text",
+        instructions=updated,
+        reasoning=f'Replaced "{old}" with "{new}" ({count} occurrence{plural}) as requested.',
+        confidence=confidence,
+    )
+
+
+def _remove_lines(text: str, request: str, topic: str):
+    topic, _ = _unquote(topic)
+    if not topic or len(topic) > MAX_LITERAL_CHARS:
+        return None
+    needle = topic.lower()
+    lines = text.splitlines(keepends=True)
+    matches = [i for i, line in enumerate(lines) if needle in line.lower() and not heading_title(line)]
+    if not matches:
+        return None
+    remove_all = bool(_ALL_OCCURRENCES.search(request))
+    confidence = 0.9 if len(matches) == 1 else (0.85 if remove_all else 0.5)
+    targets = matches if remove_all or len(matches) == 1 else matches[:1]
+    removed = 0
+    for i in reversed(targets):
+        line = lines[i]
+        sentences = _SENTENCE.findall(line.strip())
+        if _BULLET_PREFIX.match(line) or len(sentences) <= 1:
+            del lines[i]
+            removed += 1
+            continue
+        hits = [s for s in sentences if needle in s.lower()]
+        if len(hits) != 1:
+            confidence = min(confidence, 0.5)
+        kept = "".join(s for s in sentences if s not in hits[:1]).strip()
+        indent = line[: len(line) - len(line.lstrip())]
+        lines[i] = f"{indent}{kept}\n" if line.endswith("\n") else f"{indent}{kept}"
+        confidence = min(confidence, 0.8)
+        removed += 1
+    updated = "".join(lines)
+    if _empty_sections(updated) > _empty_sections(text):
+        # A section lost its last line; whether the heading should go too is a judgement call.
+        confidence = min(confidence, 0.7)
+    plural = "s" if removed > 1 else ""
+    return RuleAdjustment(
+        rule="remove_line",
+        instructions=updated,
+        reasoning=f'Removed {removed} line{plural} mentioning "{topic}" as requested.',
+        confidence=confidence,
+    )
+
+
+def _empty_sections(text: str) -> int:
+    return sum(1 for section in parse_sections(text) if section.heading and not section.body.strip())
+
+
+def _bullet_for(body: str) -> str:
+    """Bullet prefix matching the last list item in a block of text, or "" if it has none."""
+    for line in reversed(body.splitlines()):
+        match = _BULLET_PREFIX.match(line)
+        if match:
+            if match.group("number"):
+                return f"{match.group('indent')}{int(match.group('number')) + 1}{match.group('marker')[-1]} "
+            return f"{match.group('indent')}{match.group('marker')} "
+    return ""
+
+
+def _add_line(text: str, note: str, section_anchor: str, confidence: float):
+    note = note.strip()
+    if not note or len(note) > MAX_LITERAL_CHARS * 2:
+        return None
+    sections = parse_sections(text)
+    if section_anchor:
+        try:
+            index = find_section(sections, section_anchor)
+        except SectionAnchorError:
+            return None
+        where = f' to the "{sections[index].title}" section'
+    else:
+        index = len(sections) - 1
+        where = ""
+    target = sections[index]
+    stripped = target.body.rstrip("\n")
+    trailing = target.body[len(stripped):]
+    line = _bullet_for(stripped or text) + _sentence(note)
+    if stripped:
+        target.body = f"{stripped}\n{line}{trailing}"
+    else:
+        if target.heading and not target.heading.endswith("\n"):
+            target.heading += "\n"
+        target.body = f"{line}\n{trailing}"
+    return RuleAdjustment(
+        rule="add_note",
+        instructions=render_sections(sections),
+        reasoning=f'Added "{_sentence(note)}"{where} as requested.',
+        confidence=confidence,
+    )
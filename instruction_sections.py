@@ -0,0 +1,243 @@
+"""Parsing and deterministic editing of instruction text by section heading."""
+
+import re
+from dataclasses import dataclass
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+from prompts_instructions import INSTRUCTION_SECTIONS
+
+_MARKDOWN_HEADING = re.compile(r"^\s*#{1,6}\s+(?P<title>[^\n]+?)\s*#*\s*$")
+_COLON_HEADING = re.compile(r"^\s*(?:\*\*)?(?P<title>[A-Za-z0-9][^:\n]{0,60}?)(?:\*\*)?:(?:\*\*)?\s*$")
+_CAPS_HEADING = re.compile(r"^\s*(?P<title>[A-Z][A-Z0-9 &/,'()-]{2,60})\s*$")
+_BULLET = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s")
+# One-word callouts inside a section ("IMPORTANT:", "NOTE:"), not headings of their own.
+_CALLOUT = re.compile(r"^(?:important|note|notes|tip|tips|reminder|remember|caution|warning|attention)$", re.IGNORECASE)
+_GREETING = re.compile(r"^\s*(?:dear|hello|hi|good (?:morning|afternoon|evening))\b[^\n]{0,60}[,!:]\s*$", re.IGNORECASE)
+
+
+class SectionAnchorError(ValueError):
+    """Raised when an edit's anchor does not resolve to exactly one section."""
+
+
+class AmbiguousSectionError(SectionAnchorError):
+    """Raised when an anchor matches more than one section."""
+
+
+class SectionEdit(BaseModel):
+    """One section-level edit to existing instructions."""
+
+    operation: Literal["insert", "replace", "delete"] = Field(
+        description="insert a new section, replace the body of an existing section, or delete a section."
+    )
+    anchor: str = Field(
+        description=(
+            "Heading of an existing section, copied from SECTION HEADINGS. For replace/delete it is the section "
+            "to change; for insert the new section goes after it (empty string inserts at the end)."
+        )
+    )
+    heading: str = Field(default="", description="Heading of the new section (insert only).")
+    content: str = Field(
+        default="",
+        description="New section body without the heading line (insert/replace); empty for delete.",
+    )
+
+
+@dataclass
+class Section:
+    """A heading line and the text under it; the preamble before the first heading has an empty heading."""
+
+    title: str
+    heading: str
+    body: str
+
+
+def heading_title(line: str) -> str:
+    """
+    Return the section title if a line is a heading, else an empty string.
+
+    Recognized headings: markdown (`## Wound Care`), a short line ending in a colon
+    (`Wound Care:` or `**Wound Care:**`) and short ALL-CAPS lines (`WOUND CARE`). Colon and
+    ALL-CAPS lines only count when they start the line and are not a one-word callout such as
+    `IMPORTANT:`, which belongs to the section around it.
+    """
+    if not line.strip() or _BULLET.match(line):
+        return ""
+    line = line.rstrip("\r\n")
+    match = _MARKDOWN_HEADING.match(line)
+    if match:
+        return match.group("title").strip().strip("*").strip()
+    if line[:1].isspace():
+        return ""
+    for pattern in (_COLON_HEADING, _CAPS_HEADING):
+        match = pattern.match(line)
+        if match:
+            title = match.group("title").strip().strip("*").strip()
+            return "" if _CALLOUT.match(title) else title
+    return ""
+
+
+def section_body(text: str) -> str:
+    """
+    Clean generated text so it can stand as one section's body.
+
+    Drops a leading greeting ("Hello [PATIENT_NAME],") and every heading line, which would
+    otherwise open sections of their own when the document is parsed again.
+    """
+    lines = [line for line in (text or "").splitlines() if not heading_title(line)]
+    while lines and not lines[0].strip():
+        lines.pop(0)
+    if lines and _GREETING.match(lines[0]):
+        lines.pop(0)
+    return "\n".join(lines).strip("\n")
+
+
+def parse_sections(text: str) -> list:
+    """
+    Split instruction text into sections; rendering the result reproduces the text exactly.
+
+    Args:
+        text: Instruction text.
+
+    Returns:
+        list[Section]: Preamble (possibly empty) followed by one Section per heading.
+    """
+    sections = [Section(title="", heading="", body="")]
+    for line in (text or "").splitlines(keepends=True):
+        title = heading_title(line)
+        if title:
+            sections.append(Section(title=title, heading=line, body=""))
+        else:
+            sections[-1].body += line
+    return sections
+
+
+def render_sections(sections: list) -> str:
+    """Join sections back into instruction text."""
+    return "".join(s.heading + s.body for s in sections)
+
+
+def section_titles(text: str) -> list:
+    """Titles of all headed sections in document order."""
+    return [s.title for s in parse_sections(text) if s.heading]
+
+
+def normalize_title(title: str) -> str:
+    """Normalize a heading for anchor matching (case, markup, punctuation and spacing)."""
+    title = re.sub(r"[#*:_]", " ", title or "").lower()
+    return " ".join(title.split())
+
+
+def vocabulary_title(title: str) -> str:
+    """
+    The INSTRUCTION_SECTIONS heading a title refers to ("Wound Care and Bathing" -> "Wound Care").
+
+    Returns:
+        str: The one vocabulary heading contained in (or containing) the title, else "".
+    """
+    wanted = normalize_title(title)
+    if not wanted:
+        return ""
+    matches = [
+        heading for heading, _ in INSTRUCTION_SECTIONS
+        if normalize_title(heading) in wanted or wanted in normalize_title(heading)
+    ]
+    return matches[0] if len(matches) == 1 else ""
+
+
+def find_section(sections: list, anchor: str) -> int:
+    """
+    Resolve an anchor to a section index.
+
+    An exact normalized match wins. Otherwise headings are matched partially only through the
+    INSTRUCTION_SECTIONS vocabulary: the anchor and exactly one heading must refer to the same
+    vocabulary section (anchor "Wound Care" finds "Wound Care and Bathing", anchor "Pain" does
+    not find "Pain Management").
+
+    Raises:
+        AmbiguousSectionError: If the anchor matches more than one section.
+        SectionAnchorError: If the anchor matches no section.
+    """
+    wanted = normalize_title(anchor)
+    if not wanted:
+        raise SectionAnchorError("Empty section anchor")
+    headed = [(i, s.title) for i, s in enumerate(sections) if s.heading]
+    exact = [i for i, title in headed if normalize_title(title) == wanted]
+    if len(exact) == 1:
+        return exact[0]
+    if len(exact) > 1:
+        raise AmbiguousSectionError(f"Section anchor {anchor!r} matched {len(exact)} sections")
+    term = vocabulary_title(anchor)
+    partial = [i for i, title in headed if term and vocabulary_title(title) == term]
+    if len(partial) > 1:
+        raise AmbiguousSectionError(f"Section anchor {anchor!r} matched {len(partial)} sections")
+    if not partial:
+        raise SectionAnchorError(f"Section anchor {anchor!r} matched no section")
+    return partial[0]
+
+
+def _heading_line(sections: list, title: str) -> str:
+    """Format a new heading in the style the document already uses."""
+    for section in sections:
+        if section.heading:
+            stripped = section.heading.strip()
+            if stripped.startswith("#"):
+                return f"{stripped.split(' ', 1)[0]} {title}\n"
+            if stripped.endswith(":") or stripped.endswith(":**"):
+                return f"**{title}:**\n" if stripped.startswith("**") else f"{title}:\n"
+            if stripped.isupper():
+                return f"{title.upper()}\n"
+    return f"{title}:\n"
+
+
+def _body(content: str, separator: str) -> str:
+    return content.strip("\n") + "\n" + separator
+
+
+def _trailing_blank_lines(body: str) -> str:
+    stripped = body.rstrip("\n")
+    return "\n" * max(0, len(body) - len(stripped) - 1)
+
+
+def apply_section_edits(text: str, edits: list) -> str:
+    """
+    Apply section edits in order.
+
+    Args:
+        text: Current instruction text.
+        edits: SectionEdit objects.
+
+    Returns:
+        str: Updated instruction text; sections not named by an edit are kept byte-for-byte.
+
+    Raises:
+        SectionAnchorError: If any anchor does not resolve (no edit is applied in that case).
+    """
+    sections = parse_sections(text)
+    for edit in edits:
+        if edit.operation == "insert":
+            if not edit.heading.strip():
+                raise SectionAnchorError("Insert edit is missing a heading")
+            position = len(sections) if not edit.anchor.strip() else find_section(sections, edit.anchor) + 1
+            previous = sections[position - 1]
+            if previous.body and not previous.body.endswith("\n\n"):
+                previous.body += "\n" if previous.body.endswith("\n") else "\n\n"
+            separator = "\n" if position < len(sections) else ""
+            sections.insert(
+                position,
+                Section(
+                    title=edit.heading.strip(),
+                    heading=_heading_line(sections, edit.heading.strip()),
+                    body=_body(edit.content, separator),
+                ),
+            )
+        elif edit.operation == "replace":
+            index = find_section(sections, edit.anchor)
+            section = sections[index]
+            section.body = _body(edit.content, _trailing_blank_lines(section.body))
+        elif edit.operation == "delete":
+            del sections[find_section(sections, edit.anchor)]
+        else:
+            raise SectionAnchorError(f"Unknown edit operation: {edit.operation}")
+    return render_sections(sections)
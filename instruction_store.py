@@ -0,0 +1,257 @@
+"""Persistent, versioned record of generated and adjusted instructions per procedure (SQLite)."""
+
+import json
+import logging
+import queue
+import sqlite3
+import threading
+from datetime import datetime, timezone
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS instruction_versions (
+    procedure_id TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    request_hash TEXT NOT NULL,
+    instructions TEXT NOT NULL,
+    reasoning TEXT NOT NULL,
+    message TEXT,
+    details TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    PRIMARY KEY (procedure_id, version)
+);
+CREATE INDEX IF NOT EXISTS instruction_versions_request
+    ON instruction_versions (procedure_id, request_hash, version);
+CREATE TABLE IF NOT EXISTS instruction_store_meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+_COLUMNS = ("procedure_id", "version", "kind", "request_hash", "instructions", "reasoning", "message", "details", "created_at")
+# Response fields kept in the record; the rest (errors, transport flags) is not history.
+_DETAIL_FIELDS = ("model_tier", "fast_path", "edits", "patch_fallback")
+_STOP = object()
+
+
+class InstructionStore:
+    """
+    Append-only version history of instruction responses, keyed by procedure id.
+
+    Every recorded response becomes the procedure's next version, together with a hash of the
+    request that produced it, so a repeated request (same payload under the same prompts) can
+    be answered from the store. Callers mix `generation` into that hash; invalidate() bumps it,
+    so versions recorded before a prompt or model change stay in the history but are no longer
+    served. Writes are queued to a background thread and never wait on
+    disk; reads use their own connection. If the write queue is full, records are dropped and
+    counted rather than blocking the caller.
+    """
+
+    def __init__(self, path: str, queue_size: int = 1000, batch_size: int = 64):
+        """
+        Args:
+            path: SQLite database file ("" disables the store).
+            queue_size: Records waiting to be written before new ones are dropped.
+            batch_size: Records written per transaction.
+        """
+        self.path = path
+        self.batch_size = max(1, int(batch_size))
+        self.enabled = False
+        self.generation = 0
+        self._lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=max(1, int(queue_size)))
+        self._hits = 0
+        self._misses = 0
+        self._written = 0
+        self._dropped = 0
+        self._write_errors = 0
+        self._reader = None
+        self._writer = None
+        if not path:
+            return
+        try:
+            self._reader = self._connect()
+            self._reader.executescript(_SCHEMA)
+            row = self._reader.execute("SELECT value FROM instruction_store_meta WHERE key = 'generation'").fetchone()
+        except sqlite3.Error as e:
+            logging.warning(f"Instruction store disabled, cannot open {path}: {e}")
+            return
+        self.generation = row["value"] if row else 0
+        self.enabled = True
+        self._writer = threading.Thread(target=self._write_loop, name="instruction-store-writer", daemon=True)
+        self._writer.start()
+        logging.info(f"Instruction store at {path}")
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=5, check_same_thread=False, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.row_factory = sqlite3.Row
+        return connection
+
+    def latest(self, procedure_id, request_hash: str):
+        """
+        Most recent response recorded for the same request on a procedure.
+
+        Returns:
+            dict | None: {"instructions", "reasoning", **details, "stored_version": int}, or None.
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            row = self._reader.execute(
+                "SELECT version, instructions, reasoning, details FROM instruction_versions "
+                "WHERE procedure_id = ? AND request_hash = ? ORDER BY version DESC LIMIT 1",
+                (str(procedure_id), request_hash),
+            ).fetchone()
+            if row is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+        return {
+            "instructions": row["instructions"],
+            "reasoning": row["reasoning"],
+            **json.loads(row["details"]),
+            "stored_version": row["version"],
+        }
+
+    def history(self, procedure_id, limit: int = 20) -> list:
+        """
+        Recorded versions of a procedure's instructions, newest first.
+
+        Records still waiting in the write queue are not included yet.
+
+        Args:
+            procedure_id: Procedure id from the request context.
+            limit: Maximum versions returned.
+
+        Returns:
+            list: One dict per version with all stored columns.
+        """
+        if not self.enabled:
+            return []
+        with self._lock:
+            rows = self._reader.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM instruction_versions "
+                "WHERE procedure_id = ? ORDER BY version DESC LIMIT ?",
+                (str(procedure_id), max(1, int(limit))),
+            ).fetchall()
+        return [{**dict(row), "details": json.loads(row["details"])} for row in rows]
+
+    def record(self, procedure_id, request_hash: str, kind: str, response: dict, message: str = None) -> bool:
+        """
+        Queue a response as the procedure's next version without waiting for the write.
+
+        Args:
+            procedure_id: Procedure id from the request context.
+            request_hash: Hash of the request (see request_hash in agent_agentcore).
+            kind: "generation" or "adjustment".
+            response: Pipeline response with "instructions" and "reasoning".
+            message: Adjustment feedback, if any.
+
+        Returns:
+            bool: False if the store is disabled or the write queue is full.
+        """
+        if not self.enabled:
+            return False
+        details = {field: response[field] for field in _DETAIL_FIELDS if field in response}
+        entry = (
+            str(procedure_id),
+            kind,
+            request_hash,
+            response.get("instructions") or "",
+            response.get("reasoning") or "",
+            message,
+            json.dumps(details, default=str),
+            datetime.now(timezone.utc).isoformat(),
+        )
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            with self._lock:
+                self._dropped += 1
+            return False
+        return True
+
+    def invalidate(self) -> int:
+        """
+        Stop serving every recorded version (after a prompt or model change); history is kept.
+
+        Returns:
+            int: The new store generation (0 if the store is disabled).
+        """
+        if not self.enabled:
+            return 0
+        with self._lock:
+            generation = self.generation + 1
+            self._reader.execute(
+                "INSERT INTO instruction_store_meta (key, value) VALUES ('generation', ?) "
+                "ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+                (generation,),
+            )
+            self.generation = generation
+        logging.info(f"Instruction store invalidated (generation {generation})")
+        return generation
+
+    def _write_loop(self) -> None:
+        connection = self._connect()
+        while True:
+            entry = self._queue.get()
+            if entry is _STOP:
+                break
+            batch = [entry]
+            while len(batch) < self.batch_size:
+                try:
+                    entry = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if entry is _STOP:
+                    self._queue.put(_STOP)
+                    break
+                batch.append(entry)
+            self._write_batch(connection, batch)
+        connection.close()
+
+    def _write_batch(self, connection: sqlite3.Connection, batch: list) -> None:
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            for procedure_id, *fields in batch:
+                (version,) = connection.execute(
+                    "SELECT COALESCE(MAX(version), 0) + 1 FROM instruction_versions WHERE procedure_id = ?",
+                    (procedure_id,),
+                ).fetchone()
+                connection.execute(
+                    f"INSERT INTO instruction_versions ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})",
+                    (procedure_id, version, *fields),
+                )
+            connection.execute("COMMIT")
+        except sqlite3.Error as e:
+            if connection.in_transaction:
+                connection.execute("ROLLBACK")
+            logging.error(f"Failed to write {len(batch)} instruction store records: {e}")
+            with self._lock:
+                self._write_errors += len(batch)
+            return
+        with self._lock:
+            self._written += len(batch)
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Write out queued records and stop the writer thread."""
+        if self._writer is None or not self._writer.is_alive():
+            return
+        self._queue.put(_STOP)
+        self._writer.join(timeout)
+
+    def stats(self) -> dict:
+        """Snapshot of store counters."""
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "path": self.path,
+                "generation": self.generation,
+                "hits": self._hits,
+                "misses": self._misses,
+                "written": self._written,
+                "pending": self._queue.qsize(),
+                "dropped": self._dropped,
+                "write_errors": self._write_errors,
+            }
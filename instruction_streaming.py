@@ -0,0 +1,228 @@
+"""Streaming variants of instruction generation and adjustment."""
+
+import re
+
+from instruction_builder_agent import (
+    AGENT_POOL_TIMEOUT_SECONDS,
+    INSTRUCTION_CACHE_ENABLED,
+    build_adjustment_input,
+    build_instruction_input,
+    count,
+    fast_path_adjustment,
+    get_agent_pool,
+    instruction_cache,
+    instruction_cache_key,
+    lookup_base_instructions,
+    name_replacements,
+    personalize_instructions,
+    split_instruction_context,
+)
+from instruction_telemetry import invocation_usage, record_token_usage, stage
+from model_router import TIER_LARGE, adjustment_tier, generation_tier
+from prompts_instructions import INSTRUCTION_GENERATION_PROMPT, INSTRUCTION_ADJUSTMENT_PROMPT
+
+_JSON_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+_INSTRUCTIONS_KEY = re.compile(r'"instructions"\s*:\s*"')
+
+
+class InstructionTextExtractor:
+    """
+    Incrementally decode the `instructions` string out of streamed structured-output JSON.
+
+    The structured-output tool input arrives as raw JSON fragments; `feed` returns only the
+    newly decoded characters of the `instructions` value, holding back incomplete escapes.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._pos = None
+        self.done = False
+
+    def feed(self, fragment: str) -> str:
+        """
+        Add a JSON fragment.
+
+        Args:
+            fragment: Next piece of the tool input JSON.
+
+        Returns:
+            str: Newly decoded instruction text (may be empty).
+        """
+        self._buffer += fragment
+        if self.done:
+            return ""
+        if self._pos is None:
+            match = _INSTRUCTIONS_KEY.search(self._buffer)
+            if not match:
+                return ""
+            self._pos = match.end()
+        buf = self._buffer
+        i = self._pos
+        out = []
+        while i < len(buf):
+            char = buf[i]
+            if char == '"':
+                self.done = True
+                i += 1
+                break
+            if char != "\\":
+                out.append(char)
+                i += 1
+                continue
+            if i + 1 >= len(buf):
+                break
+            escape = buf[i + 1]
+            if escape != "u":
+                out.append(_JSON_ESCAPES.get(escape, escape))
+                i += 2
+                continue
+            if i + 6 > len(buf):
+                break
+            code = int(buf[i + 2:i + 6], 16)
+            if 0xD800 <= code <= 0xDBFF:
+                if i + 12 > len(buf):
+                    break
+                low = int(buf[i + 8:i + 12], 16)
+                code = 0x10000 + ((code - 0xD800) << 10) + (low - 0xDC00)
+                i += 6
+            out.append(chr(code))
+            i += 6
+        self._pos = i
+        return "".join(out)
+
+
+class PlaceholderSubstituter:
+    """Replace name placeholders in streamed text, holding back a possibly split placeholder."""
+
+    def __init__(self, replacements: dict):
+        self._replacements = replacements
+        self._longest = max((len(p) for p in replacements), default=0)
+        self._pending = ""
+
+    def feed(self, text: str) -> str:
+        """Return text that is safe to emit; a trailing partial placeholder is kept for the next call."""
+        text = self._pending + text
+        for placeholder, value in self._replacements.items():
+            text = text.replace(placeholder, value)
+        cut = text.rfind("[")
+        if cut != -1 and len(text) - cut < self._longest and "]" not in text[cut:]:
+            self._pending = text[cut:]
+            return text[:cut]
+        self._pending = ""
+        return text
+
+    def flush(self) -> str:
+        """Return anything still held back."""
+        pending, self._pending = self._pending, ""
+        return pending
+
+
+def _chunk(text: str) -> dict:
+    return {"type": "chunk", "text": text}
+
+
+def _result(response: dict) -> dict:
+    return {"type": "result", **response}
+
+
+async def _stream_agent(system_prompt: str, agent_input: str, replacements: dict = None, tier: str = TIER_LARGE):
+    """
+    Run a pooled agent in streaming mode.
+
+    Yields chunk events with instruction text as the model emits it, then one result event
+    carrying the validated (unpersonalized) structured output and the model tier.
+    """
+    extractor = InstructionTextExtractor()
+    substituter = PlaceholderSubstituter(replacements) if replacements else None
+    structured = None
+    count(f"model_tier_{tier}")
+    pool = get_agent_pool(system_prompt, tier=tier)
+    async with pool.acheckout(timeout=AGENT_POOL_TIMEOUT_SECONDS) as agent:
+        with stage("model_call", attach=False, pool=pool.name, prompt_chars=len(agent_input), stream=True) as span:
+            async for event in agent.stream_async(agent_input):
+                if event.get("type") == "tool_use_stream":
+                    fragment = (event.get("delta") or {}).get("toolUse", {}).get("input", "")
+                    text = extractor.feed(fragment) if fragment else ""
+                    if text and substituter:
+                        text = substituter.feed(text)
+                    if text:
+                        yield _chunk(text)
+                elif "result" in event:
+                    result = event["result"]
+                    record_token_usage(span, invocation_usage(result.metrics))
+                    structured = result.structured_output
+    if substituter:
+        tail = substituter.flush()
+        if tail:
+            yield _chunk(tail)
+    if structured is None:
+        raise ValueError("Agent finished without a structured InstructionResponse")
+    yield _result({"instructions": structured.instructions, "reasoning": structured.reasoning, "model_tier": tier})
+
+
+async def stream_instruction_generation(context: dict):
+    """
+    Streaming counterpart of process_instruction_generation.
+
+    Args:
+        context: Procedure/patient context from Rails.
+
+    Yields:
+        dict: {"type": "chunk", "text": str} events, then
+              {"type": "result", "instructions": str, "reasoning": str}.
+    """
+    context = context or {}
+    tier = generation_tier(context)
+    if not INSTRUCTION_CACHE_ENABLED:
+        async for event in _stream_agent(INSTRUCTION_GENERATION_PROMPT, build_instruction_input(context), tier=tier):
+            yield event
+        return
+
+    clinical, personalization = split_instruction_context(context)
+    cache_key = instruction_cache_key(clinical)
+    cached = lookup_base_instructions(cache_key, clinical)
+    if cached is not None:
+        response = personalize_instructions(cached, personalization)
+        yield _chunk(response["instructions"])
+        yield _result(response)
+        return
+
+    async for event in _stream_agent(
+        INSTRUCTION_GENERATION_PROMPT,
+        build_instruction_input(clinical),
+        replacements=name_replacements(personalization),
+        tier=tier,
+    ):
+        if event["type"] == "result":
+            generated = {"instructions": event["instructions"], "reasoning": event["reasoning"]}
+            instruction_cache.put(cache_key, generated)
+            event = _result({**personalize_instructions(generated, personalization), "model_tier": tier})
+        yield event
+
+
+async def stream_instruction_adjustment(message: str, current_instructions: str, context: dict):
+    """
+    Streaming counterpart of process_instruction_adjustment.
+
+    Args:
+        message: Feedback text.
+        current_instructions: Current instruction text.
+        context: Procedure/patient context.
+
+    Yields:
+        dict: {"type": "chunk", "text": str} events, then
+              {"type": "result", "instructions": str, "reasoning": str}.
+    """
+    fast = fast_path_adjustment(message, current_instructions)
+    if fast is not None:
+        yield _chunk(fast["instructions"])
+        yield _result(fast)
+        return
+    agent_input = build_adjustment_input(
+        message=message,
+        current_instructions=current_instructions or "",
+        context=context or {},
+    )
+    tier = adjustment_tier(message, current_instructions, context)
+    async for event in _stream_agent(INSTRUCTION_ADJUSTMENT_PROMPT, agent_input, tier=tier):
+        yield event
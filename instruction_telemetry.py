@@ -0,0 +1,176 @@
+"""OpenTelemetry spans and latency histograms for the instruction pipeline.
+
+In the AgentCore container `opentelemetry-instrument` (aws-opentelemetry-distro) installs the
+tracer/meter providers and sampling is controlled by the standard OTEL_TRACES_SAMPLER /
+OTEL_TRACES_SAMPLER_ARG variables. For local runs set INSTRUCTION_OTEL_EXPORTER=console or
+otlp and call configure_local_telemetry() to install providers here instead.
+"""
+
+import functools
+import logging
+import os
+import time
+from contextlib import contextmanager
+
+from opentelemetry import metrics, trace
+
+TELEMETRY_EXPORTER = os.getenv("INSTRUCTION_OTEL_EXPORTER", "").lower()
+TRACE_SAMPLE_RATIO = os.getenv("INSTRUCTION_TRACE_SAMPLE_RATIO")
+METRIC_EXPORT_INTERVAL_MS = int(os.getenv("INSTRUCTION_METRIC_EXPORT_INTERVAL_MS", "60000"))
+
+ATTR_PREFIX = "instruction_builder."
+
+tracer = trace.get_tracer("instruction_builder")
+_meter = metrics.get_meter("instruction_builder")
+stage_duration = _meter.create_histogram(
+    "instruction_builder.stage.duration",
+    unit="ms",
+    description="Latency of one pipeline stage (validation, prompt build, agent construction, model call, parsing).",
+)
+request_duration = _meter.create_histogram(
+    "instruction_builder.request.duration",
+    unit="ms",
+    description="End-to-end latency of an entrypoint invocation.",
+)
+token_usage = _meter.create_counter(
+    "instruction_builder.tokens",
+    unit="{token}",
+    description="Model tokens consumed, by direction.",
+)
+
+
+def _attributes(attributes: dict) -> dict:
+    return {f"{ATTR_PREFIX}{k}": v for k, v in attributes.items() if v is not None}
+
+
+@contextmanager
+def stage(name: str, attach: bool = True, **attributes):
+    """
+    Trace and time a pipeline stage.
+
+    Args:
+        name: Stage name (span is named instruction_builder.<name>).
+        attach: Make the span current. Pass False inside async generators, whose body can resume
+                in a different context between yields.
+        **attributes: Span attributes (prefixed with instruction_builder.).
+
+    Yields:
+        Span: The stage span; add attributes only when span.is_recording() to keep unsampled requests cheap.
+    """
+    started = time.perf_counter()
+    outcome = "ok"
+    span_name = f"{ATTR_PREFIX}{name}"
+    span_cm = (
+        tracer.start_as_current_span(span_name, attributes=_attributes(attributes))
+        if attach
+        else _detached_span(span_name, _attributes(attributes))
+    )
+    try:
+        with span_cm as span:
+            yield span
+    except BaseException:
+        outcome = "error"
+        raise
+    finally:
+        stage_duration.record((time.perf_counter() - started) * 1000, {"stage": name, "outcome": outcome})
+
+
+@contextmanager
+def _detached_span(name: str, attributes: dict):
+    span = tracer.start_span(name, attributes=attributes)
+    try:
+        yield span
+    except BaseException as e:
+        if span.is_recording():
+            span.record_exception(e)
+            span.set_status(trace.Status(trace.StatusCode.ERROR, str(e)))
+        raise
+    finally:
+        span.end()
+
+
+def traced_prompt_builder(name: str):
+    """Decorator running a prompt builder inside a stage span that records the prompt size."""
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name) as span:
+                prompt = func(*args, **kwargs)
+                set_attributes(span, prompt_chars=len(prompt))
+                return prompt
+
+        return wrapper
+
+    return decorator
+
+
+def set_attributes(span, **attributes) -> None:
+    """Set prefixed attributes on a span if it is being recorded."""
+    if span.is_recording():
+        span.set_attributes(_attributes(attributes))
+
+
+def invocation_usage(metrics) -> dict:
+    """
+    Token usage of the latest invocation from a Strands EventLoopMetrics.
+
+    accumulated_usage is a running total over every invocation of the agent (held sessions keep
+    one agent across rounds), so it is only used when no per-invocation usage is recorded.
+    """
+    latest = metrics.latest_agent_invocation
+    return latest.usage if latest is not None else metrics.accumulated_usage
+
+
+def record_token_usage(span, usage: dict) -> None:
+    """Attach the token usage of one model invocation (see invocation_usage) to a span and the token counter."""
+    input_tokens = usage.get("inputTokens", 0)
+    output_tokens = usage.get("outputTokens", 0)
+    token_usage.add(input_tokens, {"direction": "input"})
+    token_usage.add(output_tokens, {"direction": "output"})
+    if span.is_recording():
+        span.set_attributes({"gen_ai.usage.input_tokens": input_tokens, "gen_ai.usage.output_tokens": output_tokens})
+
+
+def record_request(payload_type, started: float, outcome: str) -> None:
+    """Record end-to-end latency for an invocation started at time.perf_counter() value `started`."""
+    request_duration.record(
+        (time.perf_counter() - started) * 1000,
+        {"payload_type": str(payload_type), "outcome": outcome},
+    )
+
+
+def configure_local_telemetry() -> bool:
+    """
+    Install SDK tracer/meter providers when INSTRUCTION_OTEL_EXPORTER is console or otlp.
+
+    Leaves providers alone otherwise (e.g. under opentelemetry-instrument).
+
+    Returns:
+        bool: True if providers were installed.
+    """
+    if TELEMETRY_EXPORTER not in ("console", "otlp"):
+        return False
+    from opentelemetry.sdk.metrics import MeterProvider
+    from opentelemetry.sdk.metrics.export import PeriodicExportingMetricReader
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+
+    if TELEMETRY_EXPORTER == "console":
+        from opentelemetry.sdk.metrics.export import ConsoleMetricExporter as MetricExporter
+        from opentelemetry.sdk.trace.export import ConsoleSpanExporter as SpanExporter
+    else:
+        from opentelemetry.exporter.otlp.proto.http.metric_exporter import OTLPMetricExporter as MetricExporter
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter as SpanExporter
+
+    resource = Resource.create({"service.name": os.getenv("OTEL_SERVICE_NAME", "post-surgy-instruction-builder-agent")})
+    sampler = ParentBased(TraceIdRatioBased(float(TRACE_SAMPLE_RATIO))) if TRACE_SAMPLE_RATIO else None
+    tracer_provider = TracerProvider(resource=resource, sampler=sampler)
+    tracer_provider.add_span_processor(BatchSpanProcessor(SpanExporter()))
+    trace.set_tracer_provider(tracer_provider)
+    reader = PeriodicExportingMetricReader(MetricExporter(), export_interval_millis=METRIC_EXPORT_INTERVAL_MS)
+    metrics.set_meter_provider(MeterProvider(resource=resource, metric_readers=[reader]))
+    logging.info(f"OpenTelemetry {TELEMETRY_EXPORTER} exporter configured (sample ratio {TRACE_SAMPLE_RATIO or 'default'})")
+    return True
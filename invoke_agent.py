@@ -2,10 +2,37 @@
 
 import argparse
 import json
+import os
 import sys
+import threading
+import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 import boto3
+from botocore.config import Config
+
+# Same gitignored directory as benchmark_agent.RESULTS_DIR (not imported: it pulls in strands).
+_RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks", "results")
+
+
+def create_client(region: str = "us-east-1", max_pool_connections: int = 10):
+    """
+    Create a bedrock-agentcore client; boto3 clients are thread-safe, so one can be shared by all threads.
+
+    Args:
+        region: AWS region.
+        max_pool_connections: HTTP connections kept open for concurrent calls.
+
+    Returns:
+        botocore client for bedrock-agentcore.
+    """
+    config = Config(
+        max_pool_connections=max_pool_connections,
+        retries={"max_attempts": 3, "mode": "adaptive"},
+        read_timeout=300,
+    )
+    return boto3.client("bedrock-agentcore", region_name=region, config=config)
 
 
 def invoke_agent(
@@ -13,12 +40,13 @@ def invoke_agent(
     payload: dict,
     session_id: str = None,
     region: str = "us-east-1",
+    client=None,
 ):
     """Invoke the instruction builder agent with the given payload."""
     if session_id is None:
         session_id = f"inst-{uuid.uuid4().hex}"
     try:
-        client = boto3.client("bedrock-agentcore", region_name=region)
+        client = client or create_client(region)
         payload_str = json.dumps(payload)
         print("=" * 70)
         print("Invoking Instruction Builder Agent")
@@ -50,6 +78,227 @@ def invoke_agent(
         sys.exit(1)
 
 
+def invoke_agent_stream(
+    agent_runtime_arn: str,
+    payload: dict,
+    session_id: str = None,
+    region: str = "us-east-1",
+    client=None,
+):
+    """Invoke the agent in streaming mode and print instruction text as it arrives."""
+    if session_id is None:
+        session_id = f"inst-{uuid.uuid4().hex}"
+    payload = {**payload, "stream": True}
+    try:
+        client = client or create_client(region)
+        print("=" * 70)
+        print("Invoking Instruction Builder Agent (streaming)")
+        print("=" * 70)
+        print(f"\nPayload type: {payload.get('type', '?')}")
+        print(f"Session ID: {session_id}")
+        print("-" * 70)
+        started = time.perf_counter()
+        first_chunk_at = None
+        response = client.invoke_agent_runtime(
+            agentRuntimeArn=agent_runtime_arn,
+            runtimeSessionId=session_id,
+            payload=json.dumps(payload),
+            qualifier="DEFAULT",
+        )
+        if "text/event-stream" not in response.get("contentType", ""):
+            response_data = json.loads(response["response"].read())
+            print(json.dumps(response_data, indent=2))
+            return response_data
+        final = None
+        print("\nInstructions:")
+        for line in response["response"].iter_lines():
+            line = line.decode("utf-8") if isinstance(line, bytes) else line
+            if not line.startswith("data: "):
+                continue
+            event = json.loads(line[len("data: "):])
+            if not isinstance(event, dict):
+                continue
+            if event.get("type") == "chunk":
+                if first_chunk_at is None:
+                    first_chunk_at = time.perf_counter()
+                print(event["text"], end="", flush=True)
+            elif event.get("type") in ("result", "error") or "error" in event:
+                final = event
+        print("\n" + "=" * 70)
+        if final is None:
+            print("❌ Stream ended without a result event")
+            sys.exit(1)
+        if final.get("error"):
+            print(f"❌ Agent error: {final['error']}")
+        elif final.get("reasoning"):
+            print("Reasoning:", final["reasoning"])
+        if first_chunk_at is not None:
+            print(f"Time to first chunk: {(first_chunk_at - started) * 1000:.0f}ms")
+        print(f"Total time: {(time.perf_counter() - started) * 1000:.0f}ms")
+        print("=" * 70)
+        return final
+    except Exception as e:
+        print(f"\n❌ Error invoking agent: {e}")
+        sys.exit(1)
+
+
+class RateLimiter:
+    """Space calls evenly across threads so at most `rate` start per second (0 = unlimited)."""
+
+    def __init__(self, rate: float):
+        self._interval = 1.0 / rate if rate and rate > 0 else 0.0
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        if not self._interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self._interval
+        if start > now:
+            time.sleep(start - now)
+
+
+def load_payloads(path: str) -> list:
+    """
+    Read payloads from a JSON file (one payload, or a test_payloads.json-style list) or a JSONL file.
+
+    Items that are not JSON objects (or whose "payload" is not one), and JSONL lines that are not
+    valid JSON, are kept with an error so they are reported in their place instead of aborting
+    the run.
+
+    Returns:
+        list: (description, payload, error) tuples; payload is None when error is set.
+    """
+    with open(path) as f:
+        if path.endswith(".jsonl"):
+            entries = []
+            for number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    entries.append((json.loads(line), None))
+                except json.JSONDecodeError as e:
+                    entries.append((None, f"line {number} is not valid JSON: {e}"))
+        else:
+            data = json.load(f)
+            entries = [(item, None) for item in (data if isinstance(data, list) else [data])]
+    payloads = []
+    for i, (item, error) in enumerate(entries):
+        description = f"#{i}"
+        if error is None and not isinstance(item, dict):
+            error = f"item is a JSON {type(item).__name__}, not an object"
+        if error is None:
+            description = item.get("description") or description
+            payload = item.get("payload", item)
+            if not isinstance(payload, dict):
+                error = f"payload is a JSON {type(payload).__name__}, not an object"
+        payloads.append((description, None, error) if error else (description, payload, None))
+    return payloads
+
+
+def read_response(response) -> dict:
+    """Decode an invoke_agent_runtime response; for event streams, return the final result/error event."""
+    if "text/event-stream" not in response.get("contentType", ""):
+        return json.loads(response["response"].read())
+    final = {"error": "Stream ended without a result event"}
+    for line in response["response"].iter_lines():
+        line = line.decode("utf-8") if isinstance(line, bytes) else line
+        if line.startswith("data: "):
+            event = json.loads(line[len("data: "):])
+            if isinstance(event, dict) and event.get("type") in ("result", "error"):
+                final = event
+    return final
+
+
+def _percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))] if ordered else 0.0
+
+
+def invoke_bulk(
+    agent_runtime_arn: str,
+    payloads: list,
+    output_path: str,
+    parallelism: int = 8,
+    rate: float = 0,
+    region: str = "us-east-1",
+) -> list:
+    """
+    Invoke the agent once per payload from a thread pool sharing one connection-pooled client.
+
+    Results are appended to output_path as JSONL in completion order, one line per payload:
+    {"index", "description", "session_id", "latency_ms", "ok", "response" | "error"}. Payloads that
+    failed to load are recorded as errors without an invocation.
+
+    Args:
+        agent_runtime_arn: Agent Runtime ARN.
+        payloads: (description, payload, error) tuples from load_payloads.
+        output_path: JSONL file to write results to.
+        parallelism: Concurrent invocations (and pooled HTTP connections).
+        rate: Max invocations started per second (0 = unlimited).
+        region: AWS region.
+
+    Returns:
+        list: Result records in input order.
+    """
+    client = create_client(region, max_pool_connections=parallelism)
+    limiter = RateLimiter(rate)
+    results = [None] * len(payloads)
+
+    def invoke_one(index: int, description: str, payload: dict, error: str) -> dict:
+        if error:
+            record = {"index": index, "description": description, "session_id": None, "latency_ms": 0.0}
+            return {**record, "ok": False, "error": f"Invalid payload: {error}"}
+        limiter.wait()
+        session_id = f"inst-{uuid.uuid4().hex}"
+        started = time.perf_counter()
+        record = {"index": index, "description": description, "session_id": session_id}
+        try:
+            response = client.invoke_agent_runtime(
+                agentRuntimeArn=agent_runtime_arn,
+                runtimeSessionId=session_id,
+                payload=json.dumps(payload),
+                qualifier="DEFAULT",
+            )
+            data = read_response(response)
+            record["ok"] = not (isinstance(data, dict) and data.get("error"))
+            record["response"] = data
+        except Exception as e:
+            record["ok"] = False
+            record["error"] = str(e)
+        record["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        return record
+
+    print("=" * 70)
+    print(f"Bulk invoke: {len(payloads)} payloads, parallelism {parallelism}, rate {rate or 'unlimited'}/s")
+    print("=" * 70)
+    started = time.perf_counter()
+    with open(output_path, "w") as out, ThreadPoolExecutor(max_workers=parallelism) as pool:
+        futures = [pool.submit(invoke_one, i, *item) for i, item in enumerate(payloads)]
+        for done, future in enumerate(as_completed(futures), 1):
+            record = future.result()
+            results[record["index"]] = record
+            out.write(json.dumps(record) + "\n")
+            out.flush()
+            status = "✓" if record["ok"] else "❌"
+            print(f"{status} [{done}/{len(payloads)}] {record['description']} ({record['latency_ms']:.0f}ms)")
+    elapsed = time.perf_counter() - started
+
+    latencies = [r["latency_ms"] for r in results if r["session_id"]]
+    failed = sum(1 for r in results if not r["ok"])
+    print("-" * 70)
+    print(f"Completed {len(results)} in {elapsed:.1f}s ({len(results) / elapsed:.1f} req/s); {failed} failed")
+    print(
+        f"Latency ms: p50 {_percentile(latencies, 50):.0f}  p95 {_percentile(latencies, 95):.0f}  "
+        f"p99 {_percentile(latencies, 99):.0f}  max {max(latencies, default=0):.0f}"
+    )
+    print(f"✓ Results written to {output_path}")
+    return results
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Invoke the Post-Surgery Instruction Builder Agent on AWS Bedrock AgentCore"
@@ -59,8 +308,35 @@ def main():
     parser.add_argument("--payload", help="JSON payload file path (or inline JSON string)")
     parser.add_argument("--region", default="us-east-1", help="AWS region")
     parser.add_argument("--session-id", help="Session ID (auto-generated if not provided)")
+    parser.add_argument("--stream", action="store_true", help="Stream instruction text as it is generated")
+    parser.add_argument("--bulk", action="store_true", help="Invoke every payload in --payload (JSON list or JSONL)")
+    parser.add_argument("--parallelism", type=int, default=8, help="Bulk mode: concurrent invocations")
+    parser.add_argument("--rate", type=float, default=0, help="Bulk mode: max invocations per second (0 = unlimited)")
+    parser.add_argument(
+        "--output", default=os.path.join(_RESULTS_DIR, "bulk_results.jsonl"), help="Bulk mode: JSONL results file"
+    )
     args = parser.parse_args()
 
+    if args.bulk:
+        if not args.payload:
+            print("Error: --bulk requires --payload <file>")
+            sys.exit(1)
+        try:
+            payloads = load_payloads(args.payload)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Error: cannot read payloads from {args.payload}: {e}")
+            sys.exit(1)
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        results = invoke_bulk(
+            agent_runtime_arn=args.arn,
+            payloads=payloads,
+            output_path=args.output,
+            parallelism=max(1, args.parallelism),
+            rate=args.rate,
+            region=args.region,
+        )
+        sys.exit(1 if any(not r["ok"] for r in results) else 0)
+
     if args.payload:
         try:
             with open(args.payload) as f:
@@ -97,7 +373,8 @@ def main():
         print("Error: Provide --payload <file|json> or --type instruction_generation|instruction_adjustment")
         sys.exit(1)
 
-    invoke_agent(
+    invoke = invoke_agent_stream if args.stream else invoke_agent
+    invoke(
         agent_runtime_arn=args.arn,
         payload=payload,
         session_id=args.session_id,
@@ -0,0 +1,82 @@
+"""Model-tier routing: small adjustments go to a fast model, everything else to the large model."""
+
+import os
+
+TIER_SMALL = "small"
+TIER_LARGE = "large"
+
+# Bedrock model ids per tier; an empty id means the Strands default model.
+MODEL_IDS = {
+    TIER_SMALL: os.getenv("INSTRUCTION_MODEL_ID_SMALL", ""),
+    TIER_LARGE: os.getenv("INSTRUCTION_MODEL_ID_LARGE", ""),
+}
+MODEL_ROUTING_ENABLED = os.getenv(
+    "INSTRUCTION_MODEL_ROUTING_ENABLED", "true" if MODEL_IDS[TIER_SMALL] else "false"
+).lower() in ("1", "true", "yes")
+# Pin every request to one tier (e.g. to compare tiers in benchmark_agent.py).
+FORCED_TIER = os.getenv("INSTRUCTION_MODEL_TIER", "").lower()
+GENERATION_TIER = os.getenv("INSTRUCTION_GENERATION_TIER", TIER_LARGE).lower()
+SMALL_TIER_MAX_MESSAGE_CHARS = int(os.getenv("INSTRUCTION_SMALL_TIER_MAX_MESSAGE_CHARS", "240"))
+SMALL_TIER_MAX_INSTRUCTION_CHARS = int(os.getenv("INSTRUCTION_SMALL_TIER_MAX_INSTRUCTION_CHARS", "4000"))
+
+
+def model_id(tier: str) -> str:
+    """Bedrock model id configured for a tier ("" for the Strands default)."""
+    return MODEL_IDS.get(tier, "")
+
+
+def generation_tier(context: dict) -> str:
+    """
+    Tier for a first-time generation (INSTRUCTION_GENERATION_TIER, large by default).
+
+    Args:
+        context: Procedure/patient context.
+
+    Returns:
+        str: "small" or "large".
+    """
+    if FORCED_TIER in MODEL_IDS:
+        return FORCED_TIER
+    if not MODEL_ROUTING_ENABLED or GENERATION_TIER not in MODEL_IDS:
+        return TIER_LARGE
+    return GENERATION_TIER
+
+
+def adjustment_tier(message: str, current_instructions: str, context: dict) -> str:
+    """
+    Tier for an adjustment, estimated from the size of the request.
+
+    Short feedback on instructions of moderate length for a known procedure type goes to the
+    small model; long feedback, long instructions or a missing procedure type need the large one.
+
+    Args:
+        message: Feedback text.
+        current_instructions: Current instruction text.
+        context: Procedure/patient context.
+
+    Returns:
+        str: "small" or "large".
+    """
+    if FORCED_TIER in MODEL_IDS:
+        return FORCED_TIER
+    if not MODEL_ROUTING_ENABLED:
+        return TIER_LARGE
+    if not (context or {}).get("procedure_type"):
+        return TIER_LARGE
+    if len(message or "") > SMALL_TIER_MAX_MESSAGE_CHARS:
+        return TIER_LARGE
+    if len(current_instructions or "") > SMALL_TIER_MAX_INSTRUCTION_CHARS:
+        return TIER_LARGE
+    return TIER_SMALL
+
+
+def routing_config() -> dict:
+    """Tier configuration for the metrics payload."""
+    return {
+        "enabled": MODEL_ROUTING_ENABLED,
+        "forced_tier": FORCED_TIER or None,
+        "generation_tier": GENERATION_TIER,
+        "model_ids": {tier: model or "default" for tier, model in MODEL_IDS.items()},
+        "small_tier_max_message_chars": SMALL_TIER_MAX_MESSAGE_CHARS,
+        "small_tier_max_instruction_chars": SMALL_TIER_MAX_INSTRUCTION_CHARS,
+    }
@@ -0,0 +1,314 @@
+"""Local repair of malformed structured output, so a near-miss does not cost a model retry."""
+
+import json
+import re
+import sys
+import threading
+from collections import Counter
+
+from pydantic import ValidationError
+from strands.hooks import BeforeToolCallEvent, HookProvider, HookRegistry
+from strands.models import Model
+
+_FENCE = re.compile(r"```(?:json|JSON)?[ \t]*\n?(.*?)```", re.S)
+_TRAILING_COMMA = re.compile(r",(\s*[}\]])")
+# A text answer shorter than this is a remark ("Done."), not instructions.
+MIN_TEXT_BLOB_CHARS = 80
+
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+def _count(*names: str) -> None:
+    with _stats_lock:
+        for name in names:
+            _stats[name] += 1
+
+
+def repair_stats() -> dict:
+    """
+    Repair counters; every repair is a model round trip saved, every failure fell back to a retry.
+
+    Returns:
+        dict: {"repaired", "failed", "by_source": {...}, "by_fix": {...}}
+    """
+    with _stats_lock:
+        stats = dict(_stats)
+    return {
+        "repaired": stats.get("repaired", 0),
+        "failed": stats.get("failed", 0),
+        "by_source": {k[len("source_"):]: v for k, v in stats.items() if k.startswith("source_")},
+        "by_fix": {k[len("fix_"):]: v for k, v in stats.items() if k.startswith("fix_")},
+    }
+
+
+def _text_fields(output_model: type) -> list:
+    return [name for name, f in output_model.model_fields.items() if f.annotation is str]
+
+
+def _parse_json(raw: str, fixes: list):
+    """Parse the JSON object in raw model text, applying syntax fixes as needed; None if there is none."""
+    text = raw.strip()
+    fence = _FENCE.search(text)
+    if fence:
+        text = fence.group(1).strip()
+        fixes.append("fenced")
+    start, end = text.find("{"), text.rfind("}")
+    if start == -1 or end < start:
+        return None
+    if start > 0 or end < len(text) - 1:
+        text = text[start:end + 1]
+        fixes.append("extracted")
+    try:
+        return json.loads(text)
+    except ValueError:
+        pass
+    uncommaed = _TRAILING_COMMA.sub(r"\1", text)
+    if uncommaed != text:
+        fixes.append("trailing_comma")
+        text = uncommaed
+        try:
+            return json.loads(text)
+        except ValueError:
+            pass
+    try:
+        # strict=False accepts raw newlines and tabs inside strings.
+        data = json.loads(text, strict=False)
+    except ValueError:
+        return None
+    fixes.append("control_chars")
+    return data
+
+
+def fit_fields(data, output_model: type, fixes: list):
+    """
+    Coerce parsed JSON into output_model's shape.
+
+    Unwraps {"<ModelName>": {...}}-style envelopes, maps a lone unknown string field onto the
+    first string field and fills missing secondary string fields (reasoning) with "".
+
+    Returns:
+        dict | None: Data that validates against output_model, or None.
+    """
+    if not isinstance(data, dict):
+        return None
+    if len(data) == 1:
+        (key, inner), = data.items()
+        if isinstance(inner, dict) and key not in output_model.model_fields:
+            data = inner
+            fixes.append("unwrapped")
+    try:
+        output_model.model_validate(data)
+        return data
+    except ValidationError:
+        pass
+    text_fields = _text_fields(output_model)
+    fitted = {k: v for k, v in data.items() if k in output_model.model_fields}
+    extra = [v for k, v in data.items() if k not in output_model.model_fields and isinstance(v, str)]
+    if text_fields and text_fields[0] not in fitted and len(extra) == 1:
+        fitted[text_fields[0]] = extra[0]
+        fixes.append("renamed_field")
+    # The first field is the output itself; only secondary text fields (reasoning) may be blank.
+    primary = next(iter(output_model.model_fields))
+    missing = [name for name in text_fields if name not in fitted and name != primary]
+    if missing and primary in fitted:
+        fitted.update({name: "" for name in missing})
+        fixes.append("missing_field")
+    try:
+        output_model.model_validate(fitted)
+    except ValidationError:
+        return None
+    return fitted
+
+
+def repair_structured_output(raw: str, output_model: type):
+    """
+    Turn malformed model output into valid input for output_model.
+
+    Handles JSON wrapped in a markdown fence or prose, trailing commas, unescaped newlines inside
+    strings and field-shape mistakes (see fit_fields). A plain-text answer with no JSON at all
+    becomes the first string field (instructions) with the others empty, if the model has only
+    string fields.
+
+    Args:
+        raw: Text the model produced (a text answer or raw tool input).
+        output_model: Pydantic model the output must validate against.
+
+    Returns:
+        tuple | None: (data dict, list of fixes applied), or None if the output cannot be repaired.
+    """
+    fixes = []
+    data = _parse_json(raw or "", fixes)
+    if data is not None:
+        fitted = fit_fields(data, output_model, fixes)
+        return (fitted, fixes) if fitted is not None else None
+    text = (raw or "").strip()
+    text_fields = _text_fields(output_model)
+    if (
+        "{" in text
+        or len(text) < MIN_TEXT_BLOB_CHARS
+        or not text_fields
+        or len(text_fields) != len(output_model.model_fields)
+    ):
+        return None
+    fitted = {name: "" for name in text_fields}
+    fitted[text_fields[0]] = text
+    return fitted, ["text_blob"]
+
+
+class RepairingModel(Model):
+    """
+    Model wrapper that repairs structured output as it streams.
+
+    A text-only answer where the structured output tool was offered is repaired into a
+    synthetic tool call, so Strands validates it instead of re-prompting the model. Tool input
+    that is not valid JSON is repaired when its block ends and swapped in by OutputRepairHook
+    before the structured output tool validates it. Events are passed through unchanged, so
+    streaming of partial tool input keeps working.
+    """
+
+    def __init__(self, model: Model, output_model: type):
+        """
+        Args:
+            model: Model to wrap.
+            output_model: Structured output model whose tool is repaired.
+        """
+        self.model = model
+        self.output_model = output_model
+        self.repaired_inputs = {}
+
+    def __getattr__(self, name):
+        return getattr(self.model, name)
+
+    @property
+    def stateful(self) -> bool:
+        return self.model.stateful
+
+    def update_config(self, **model_config):
+        self.model.update_config(**model_config)
+
+    def get_config(self):
+        return self.model.get_config()
+
+    def structured_output(self, output_model, prompt, system_prompt=None, **kwargs):
+        return self.model.structured_output(output_model, prompt, system_prompt=system_prompt, **kwargs)
+
+    async def count_tokens(self, *args, **kwargs):
+        return await self.model.count_tokens(*args, **kwargs)
+
+    async def stream(self, messages, tool_specs=None, system_prompt=None, **kwargs):
+        self.repaired_inputs.clear()
+        tool_name = self.output_model.__name__
+        offered = any(spec.get("name") == tool_name for spec in tool_specs or ())
+        text = []
+        tool_use = None
+        tool_input = []
+        used_tool = False
+        async for event in self.model.stream(messages, tool_specs, system_prompt, **kwargs):
+            if "contentBlockStart" in event:
+                tool_use = event["contentBlockStart"].get("start", {}).get("toolUse")
+                tool_input = []
+                used_tool = used_tool or tool_use is not None
+            elif "contentBlockDelta" in event:
+                delta = event["contentBlockDelta"].get("delta", {})
+                if "text" in delta:
+                    text.append(delta["text"])
+                elif tool_use is not None and "toolUse" in delta:
+                    tool_input.append(delta["toolUse"].get("input", ""))
+            elif "contentBlockStop" in event and tool_use is not None:
+                if tool_use.get("name") == tool_name:
+                    self._repair_tool_input(tool_use.get("toolUseId", ""), "".join(tool_input))
+                tool_use = None
+            elif "messageStop" in event and offered and not used_tool:
+                if event["messageStop"].get("stopReason") == "end_turn":
+                    repaired = self._repair("text_response", "".join(text))
+                    if repaired is not None:
+                        for synthetic in self._tool_use_events(tool_name, repaired):
+                            yield synthetic
+                        event = {"messageStop": {**event["messageStop"], "stopReason": "tool_use"}}
+            yield event
+
+    def _repair(self, source: str, raw: str):
+        repaired = repair_structured_output(raw, self.output_model)
+        if repaired is None:
+            _count("failed")
+            return None
+        data, fixes = repaired
+        _count("repaired", f"source_{source}", *(f"fix_{fix}" for fix in fixes))
+        return data
+
+    def _repair_tool_input(self, tool_use_id: str, raw: str) -> None:
+        if not raw.strip():
+            return
+        try:
+            json.loads(raw)
+            return
+        except ValueError:
+            pass
+        data = self._repair("tool_input", raw)
+        if data is not None:
+            self.repaired_inputs[tool_use_id] = data
+
+    @staticmethod
+    def _tool_use_events(tool_name: str, data: dict):
+        tool_use_id = f"repaired-{id(data):x}"
+        yield {"contentBlockStart": {"start": {"toolUse": {"toolUseId": tool_use_id, "name": tool_name}}}}
+        yield {"contentBlockDelta": {"delta": {"toolUse": {"input": json.dumps(data)}}}}
+        yield {"contentBlockStop": {}}
+
+
+class OutputRepairHook(HookProvider):
+    """Swaps repaired input into structured output tool calls before they are validated."""
+
+    def register_hooks(self, registry: HookRegistry, **kwargs) -> None:
+        registry.add_callback(BeforeToolCallEvent, self.before_tool_call)
+
+    def before_tool_call(self, event: BeforeToolCallEvent) -> None:
+        model = event.agent.model
+        if not isinstance(model, RepairingModel) or event.tool_use.get("name") != model.output_model.__name__:
+            return
+        # Mutated in place so the conversation history records the repaired call as well.
+        tool_use = event.tool_use
+        data = model.repaired_inputs.pop(tool_use.get("toolUseId", ""), None)
+        if data is not None:
+            tool_use["input"] = data
+            return
+        try:
+            model.output_model.model_validate(tool_use.get("input"))
+            return
+        except ValidationError:
+            pass
+        fixes = []
+        data = fit_fields(tool_use.get("input"), model.output_model, fixes)
+        if data is None:
+            _count("failed")
+            return
+        _count("repaired", "source_tool_fields", *(f"fix_{fix}" for fix in fixes))
+        tool_use["input"] = data
+
+
+def _check_fixtures(path: str, models: dict) -> int:
+    """Run the malformed-output fixtures; returns the number of failures."""
+    with open(path) as f:
+        fixtures = json.load(f)
+    failures = 0
+    for fixture in fixtures:
+        result = repair_structured_output(fixture["raw"], models[fixture["output_model"]])
+        data = result[0] if result else None
+        ok = data == fixture["expected"]
+        if ok and result and fixture.get("fixes") is not None:
+            ok = result[1] == fixture["fixes"]
+        failures += not ok
+        print(f"{'✓' if ok else '✗'} {fixture['description']}")
+        if not ok:
+            print(f"    expected {fixture['expected']!r} {fixture.get('fixes')}\n    got      {result!r}")
+    print(f"{len(fixtures) - failures}/{len(fixtures)} fixtures passed")
+    return failures
+
+
+if __name__ == "__main__":
+    from instruction_builder_agent import InstructionPatchResponse, InstructionResponse
+
+    fixtures_path = sys.argv[1] if len(sys.argv) > 1 else "output_repair_fixtures.json"
+    output_models = {m.__name__: m for m in (InstructionResponse, InstructionPatchResponse)}
+    sys.exit(1 if _check_fixtures(fixtures_path, output_models) else 0)
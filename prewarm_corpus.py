@@ -0,0 +1,154 @@
+"""Offline job that precomputes base instructions for every procedure type and recovery phase."""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+from instruction_builder_agent import (
+    DOCTOR_NAME_PLACEHOLDER,
+    INSTRUCTION_CORPUS_PATH,
+    PATIENT_NAME_PLACEHOLDER,
+    PROMPTS_FINGERPRINT,
+    RECOVERY_PHASES,
+    build_instruction_input,
+    recovery_phase,
+    run_instruction_agent_async,
+    split_instruction_context,
+)
+from instruction_corpus import CORPUS_FORMAT_VERSION, corpus_key
+from prompts_instructions import INSTRUCTION_GENERATION_PROMPT
+
+
+def corpus_clinical_context(procedure_type: str, phase: str, status: str) -> dict:
+    """Clinical context (as produced by split_instruction_context) for one corpus combination."""
+    clinical, _ = split_instruction_context(
+        {
+            "procedure_type": procedure_type,
+            "procedure_status": status,
+            "patient_name": PATIENT_NAME_PLACEHOLDER,
+            "doctor_name": DOCTOR_NAME_PLACEHOLDER,
+        }
+    )
+    clinical["recovery_phase"] = phase
+    return clinical
+
+
+async def generate_corpus(procedure_types: list, phases: list, status: str, concurrency: int) -> tuple:
+    """
+    Generate one entry per (procedure type, phase) combination concurrently.
+
+    Returns:
+        tuple: (entries dict keyed by corpus_key, list of (key, error) failures)
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    entries = {}
+    failures = []
+
+    async def generate(procedure_type, phase):
+        clinical = corpus_clinical_context(procedure_type, phase, status)
+        key = corpus_key(clinical["procedure_type"], phase, clinical.get("procedure_status", ""))
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                structured = await run_instruction_agent_async(
+                    INSTRUCTION_GENERATION_PROMPT, build_instruction_input(clinical)
+                )
+            except Exception as e:
+                print(f"❌ {key}: {e}")
+                failures.append((key, str(e)))
+                return
+        entries[key] = {
+            "procedure_type": clinical["procedure_type"],
+            "recovery_phase": phase,
+            "procedure_status": clinical.get("procedure_status", ""),
+            "instructions": structured.instructions,
+            "reasoning": structured.reasoning,
+        }
+        print(f"✓ {key} ({(time.perf_counter() - started):.1f}s)")
+
+    await asyncio.gather(*(generate(p, ph) for p in procedure_types for ph in phases))
+    return entries, failures
+
+
+def write_corpus(path: str, entries: dict) -> None:
+    """Write the corpus atomically, stamped with the format version and prompts fingerprint."""
+    data = {
+        "format_version": CORPUS_FORMAT_VERSION,
+        "prompts_fingerprint": PROMPTS_FINGERPRINT,
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "entries": dict(sorted(entries.items())),
+    }
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, separators=(",", ":"), ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def load_procedure_types(args) -> list:
+    """Procedure types from --procedures and --procedures-file, de-duplicated in order."""
+    procedure_types = list(args.procedures or [])
+    if args.procedures_file:
+        with open(args.procedures_file) as f:
+            procedure_types.extend(line.strip() for line in f if line.strip() and not line.startswith("#"))
+    return list(dict.fromkeys(procedure_types))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Precompute base post-surgery instructions for every procedure type and recovery phase"
+    )
+    parser.add_argument("--procedures", nargs="*", help="Procedure types (e.g. 'knee replacement')")
+    parser.add_argument("--procedures-file", help="File with one procedure type per line")
+    phase_names = [name for name, _, _ in RECOVERY_PHASES]
+    parser.add_argument("--phases", nargs="*", choices=phase_names, help="Recovery phases (default: all)")
+    parser.add_argument("--days", nargs="*", type=int, help="Days post-op, mapped to their recovery phases")
+    parser.add_argument("--status", default="completed", help="Procedure status to generate for")
+    parser.add_argument("--concurrency", type=int, default=8, help="Parallel model calls")
+    parser.add_argument("--output", default=INSTRUCTION_CORPUS_PATH, help="Corpus file to write")
+    parser.add_argument("--merge", action="store_true", help="Keep entries from an existing corpus with the same prompts")
+    args = parser.parse_args()
+
+    procedure_types = load_procedure_types(args)
+    if not procedure_types:
+        print("Error: Provide --procedures and/or --procedures-file")
+        sys.exit(1)
+    phases = list(args.phases or [])
+    phases.extend(recovery_phase(d) for d in args.days or [] if recovery_phase(d))
+    phases = list(dict.fromkeys(phases)) or phase_names
+
+    print("=" * 70)
+    print("Instruction Corpus Pre-warm")
+    print("=" * 70)
+    print(f"Procedures: {len(procedure_types)}  Phases: {', '.join(phases)}  Status: {args.status}")
+    print(f"Prompts fingerprint: {PROMPTS_FINGERPRINT}")
+    print(f"Output: {args.output}")
+    print("-" * 70)
+
+    existing = {}
+    if args.merge and os.path.exists(args.output):
+        with open(args.output) as f:
+            data = json.load(f)
+        if data.get("prompts_fingerprint") == PROMPTS_FINGERPRINT and data.get("format_version") == CORPUS_FORMAT_VERSION:
+            existing = data.get("entries") or {}
+            print(f"Merging with {len(existing)} existing entries")
+        else:
+            print("Existing corpus is stale; regenerating from scratch")
+
+    started = time.perf_counter()
+    entries, failures = asyncio.run(generate_corpus(procedure_types, phases, args.status, args.concurrency))
+    merged = {**existing, **entries}
+    write_corpus(args.output, merged)
+
+    print("-" * 70)
+    print(f"Generated {len(entries)} entries in {time.perf_counter() - started:.1f}s; {len(failures)} failed")
+    print(f"✓ Wrote {len(merged)} entries to {args.output}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
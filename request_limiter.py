@@ -0,0 +1,258 @@
+"""Concurrency limiting and admission control for the AgentCore entrypoint."""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+
+from hedging import DeadlineExceeded, time_left
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+# Assumed request duration for retry-after hints until one has been measured.
+_DEFAULT_HOLD_SECONDS = 1.0
+_HOLD_EWMA_ALPHA = 0.2
+
+
+class AdmissionRejected(RuntimeError):
+    """Raised when a request is shed because the wait queue is full."""
+
+    def __init__(self, message: str, retry_after: float):
+        """
+        Args:
+            message: Error message for the response.
+            retry_after: Suggested seconds before retrying.
+        """
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class InflightLimiter:
+    """
+    Caps the number of requests running at once; excess requests wait in a bounded queue.
+
+    Waiting requests are admitted by priority (lower value first), FIFO within a priority.
+    When the queue is full a new request is rejected at once with AdmissionRejected, unless a
+    lower-priority request is waiting: that one is shed instead, so urgent work still queues.
+
+    Unlike asyncio.Semaphore it is not bound to a single event loop, so the same
+    instance works across asyncio.run() calls (scripts, benchmarks) and the
+    AgentCore worker loop.
+    """
+
+    def __init__(self, limit: int, max_queue: int = None):
+        """
+        Args:
+            limit: Maximum number of requests in flight.
+            max_queue: Maximum number of requests waiting (None for no bound, 0 to never wait).
+        """
+        self.limit = max(1, int(limit))
+        self.max_queue = None if max_queue is None else max(0, int(max_queue))
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._waiters = {}
+        self._queued = 0
+        self._admitted = 0
+        self._waited = 0
+        self._wait_time = 0.0
+        self._rejected = 0
+        self._shed = 0
+        self._deadline_exceeded = 0
+        self._peak_in_flight = 0
+        self._peak_queue_depth = 0
+        self._hold_ewma = None
+        self._by_priority = {}
+
+    def _priority_stats(self, priority: int) -> dict:
+        stats = self._by_priority.get(priority)
+        if stats is None:
+            stats = self._by_priority[priority] = {"waited": 0, "wait_time": 0.0, "rejected": 0, "shed": 0}
+        return stats
+
+    async def acquire(self, priority: int = PRIORITY_NORMAL, deadline: float = None) -> None:
+        """
+        Wait for an in-flight slot.
+
+        Args:
+            priority: Queue priority; lower values are admitted first.
+            deadline: time.monotonic() request deadline (see hedging); waiting stops when it is reached.
+
+        Raises:
+            AdmissionRejected: If the queue is full, now or later while waiting (shed).
+            DeadlineExceeded: If the deadline was reached before a slot was free.
+        """
+        with self._lock:
+            if self._in_flight < self.limit and not self._queued:
+                self._admit_locked()
+                return
+            if deadline is not None and time_left(deadline) <= 0:
+                self._deadline_exceeded += 1
+                raise DeadlineExceeded("Deadline reached while waiting for an in-flight slot")
+            if self.max_queue is not None and self._queued >= self.max_queue:
+                if not self._shed_lower_locked(priority):
+                    self._rejected += 1
+                    self._priority_stats(priority)["rejected"] += 1
+                    raise self._rejection_locked()
+            loop = asyncio.get_running_loop()
+            waiter = loop.create_future()
+            self._waiters.setdefault(priority, deque()).append((loop, waiter))
+            self._priority_stats(priority)
+            self._queued += 1
+            self._peak_queue_depth = max(self._peak_queue_depth, self._queued)
+        started = time.perf_counter()
+        try:
+            if deadline is None:
+                await waiter
+            else:
+                await asyncio.wait({waiter}, timeout=max(0.0, time_left(deadline)))
+                if not waiter.done():
+                    self._abandon(priority, loop, waiter)
+                    raise DeadlineExceeded("Deadline reached while waiting for an in-flight slot")
+                waiter.result()
+        except asyncio.CancelledError:
+            with self._lock:
+                try:
+                    self._waiters[priority].remove((loop, waiter))
+                    self._queued -= 1
+                except ValueError:
+                    pass
+            # If release() already picked this waiter, _grant sees the cancellation and passes the slot on.
+            waiter.cancel()
+            if waiter.done() and not waiter.cancelled() and waiter.exception() is None:
+                # The slot was handed over just as we were cancelled (not shed: that holds no slot).
+                self.release()
+            raise
+        with self._lock:
+            elapsed = time.perf_counter() - started
+            self._waited += 1
+            self._wait_time += elapsed
+            stats = self._priority_stats(priority)
+            stats["waited"] += 1
+            stats["wait_time"] += elapsed
+
+    def _abandon(self, priority: int, loop, waiter) -> None:
+        """Give up a queued wait at the deadline."""
+        with self._lock:
+            self._deadline_exceeded += 1
+            try:
+                self._waiters[priority].remove((loop, waiter))
+                self._queued -= 1
+            except ValueError:
+                pass
+        # If release() already picked this waiter, _grant sees the cancellation and passes the slot on.
+        waiter.cancel()
+
+    def release(self, held: float = None) -> None:
+        """
+        Free a slot, handing it directly to the next waiter if there is one.
+
+        Args:
+            held: Seconds the slot was held, used for retry-after hints.
+        """
+        with self._lock:
+            if held is not None:
+                previous = self._hold_ewma
+                self._hold_ewma = held if previous is None else previous + _HOLD_EWMA_ALPHA * (held - previous)
+            for priority in sorted(self._waiters):
+                queue = self._waiters[priority]
+                while queue:
+                    loop, waiter = queue.popleft()
+                    self._queued -= 1
+                    if waiter.done():
+                        continue
+                    self._admitted += 1
+                    loop.call_soon_threadsafe(self._grant, waiter)
+                    return
+            self._in_flight -= 1
+
+    def _grant(self, waiter) -> None:
+        if waiter.done():
+            # Waiter was cancelled after being picked; pass the slot on.
+            self.release()
+        else:
+            waiter.set_result(None)
+
+    def _shed_lower_locked(self, priority: int) -> bool:
+        """Reject the newest waiter of the lowest priority below `priority`; False if there is none."""
+        for lower in sorted(self._waiters, reverse=True):
+            if lower <= priority:
+                return False
+            queue = self._waiters[lower]
+            while queue:
+                loop, waiter = queue.pop()
+                self._queued -= 1
+                if waiter.done():
+                    continue
+                self._shed += 1
+                self._priority_stats(lower)["shed"] += 1
+                loop.call_soon_threadsafe(self._fail, waiter, self._rejection_locked())
+                return True
+        return False
+
+    @staticmethod
+    def _fail(waiter, error: Exception) -> None:
+        if not waiter.done():
+            waiter.set_exception(error)
+
+    def _rejection_locked(self) -> AdmissionRejected:
+        # Time for the running requests and the queue ahead to drain at the current request duration.
+        hold = self._hold_ewma if self._hold_ewma is not None else _DEFAULT_HOLD_SECONDS
+        retry_after = max(0.1, round(hold * (self._queued + 1) / self.limit, 1))
+        return AdmissionRejected(
+            f"Too many requests: {self._in_flight} in flight, {self._queued} waiting; retry in {retry_after}s",
+            retry_after,
+        )
+
+    def _admit_locked(self) -> None:
+        self._in_flight += 1
+        self._admitted += 1
+        self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+
+    @asynccontextmanager
+    async def slot(self, priority: int = PRIORITY_NORMAL, deadline: float = None):
+        """Hold an in-flight slot for the duration of the block (see acquire)."""
+        await self.acquire(priority, deadline)
+        started = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.release(time.perf_counter() - started)
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.release()
+        return False
+
+    def stats(self) -> dict:
+        """Snapshot of in-flight, queue and rejection counters (by_priority keyed by priority)."""
+        with self._lock:
+            return {
+                "limit": self.limit,
+                "max_queue": self.max_queue,
+                "in_flight": self._in_flight,
+                "queue_depth": self._queued,
+                "peak_in_flight": self._peak_in_flight,
+                "peak_queue_depth": self._peak_queue_depth,
+                "admitted": self._admitted,
+                "waited": self._waited,
+                "wait_time_ms": round(self._wait_time * 1000, 3),
+                "rejected": self._rejected,
+                "shed": self._shed,
+                "deadline_exceeded": self._deadline_exceeded,
+                "mean_hold_ms": round(self._hold_ewma * 1000, 1) if self._hold_ewma is not None else None,
+                "by_priority": {
+                    priority: {
+                        "queue_depth": len(self._waiters.get(priority, ())),
+                        "waited": stats["waited"],
+                        "wait_time_ms": round(stats["wait_time"] * 1000, 3),
+                        "rejected": stats["rejected"],
+                        "shed": stats["shed"],
+                    }
+                    for priority, stats in sorted(self._by_priority.items())
+                },
+            }
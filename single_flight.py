@@ -0,0 +1,106 @@
+"""Coalescing of identical concurrent requests into one in-progress computation."""
+
+import asyncio
+import concurrent.futures
+import copy
+import hashlib
+import json
+import threading
+
+
+def payload_fingerprint(payload: dict, ignore: tuple = ()) -> str:
+    """
+    Canonical hash of a JSON payload: key order, whitespace and null fields do not matter.
+
+    Args:
+        payload: JSON-serializable request payload.
+        ignore: Top-level fields that do not affect the result (e.g. transport flags).
+
+    Returns:
+        str: Hex sha256 digest.
+    """
+    normalized = {k: v for k, v in payload.items() if k not in ignore and v is not None}
+    canonical = json.dumps(normalized, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class SingleFlight:
+    """
+    Run at most one computation per key at a time; concurrent callers with the same key share its result.
+
+    The first caller (leader) runs the computation; callers arriving while it is in progress
+    wait for the leader's outcome (result or exception) instead of starting their own. The key
+    is forgotten as soon as the leader finishes, so later requests compute afresh. Like
+    InflightLimiter it uses thread-safe futures and is not bound to one event loop.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self._leaders = 0
+        self._coalesced = 0
+        self._reruns = 0
+        self._peak_in_flight = 0
+
+    async def run(self, key: str, func, rerun=None):
+        """
+        Run `func()` for `key`, or wait for the identical computation already in progress.
+
+        Args:
+            key: Request fingerprint (see payload_fingerprint).
+            func: Zero-argument coroutine function producing the result.
+            rerun: Optional predicate a coalesced caller applies to the leader's outcome (its
+                result, or the exception it raised); when it returns True the caller runs its own
+                `func()` instead, e.g. when the leader ran out of a deadline the caller does not share.
+
+        Returns:
+            The computation's result (a shallow copy for coalesced callers).
+        """
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = concurrent.futures.Future()
+                self._in_flight[key] = future
+                self._leaders += 1
+                self._peak_in_flight = max(self._peak_in_flight, len(self._in_flight))
+            else:
+                self._coalesced += 1
+        if not leader:
+            # Shielded so a cancelled follower does not cancel the shared future.
+            try:
+                result = await asyncio.shield(asyncio.wrap_future(future))
+            except Exception as e:
+                if rerun is None or not rerun(e):
+                    raise
+            else:
+                if rerun is None or not rerun(result):
+                    return copy.copy(result)
+            with self._lock:
+                self._reruns += 1
+            return await func()
+        try:
+            result = await func()
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        except BaseException:
+            future.set_exception(RuntimeError("Coalesced request was cancelled before completing"))
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def stats(self) -> dict:
+        """Snapshot of coalescing counters."""
+        with self._lock:
+            return {
+                "in_flight": len(self._in_flight),
+                "peak_in_flight": self._peak_in_flight,
+                "leaders": self._leaders,
+                "coalesced": self._coalesced,
+                "reruns": self._reruns,
+            }
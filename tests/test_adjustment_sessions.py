@@ -0,0 +1,82 @@
+import asyncio
+import time
+
+import pytest
+
+import instruction_builder_agent
+from adjustment_sessions import followup_prompt
+from benchmark_agent import StubModel
+from hedging import DeadlineExceeded
+
+CONTEXT = {"procedure_type": "knee replacement", "days_post_op": 3}
+
+
+@pytest.fixture
+def model():
+    model = StubModel(latency_ms=0, tokens_per_second=0)
+    instruction_builder_agent.set_model_factory(lambda tier: model)
+    yield model
+    instruction_builder_agent.set_model_factory(None)
+
+
+def adjust(message, current_instructions, deadline=None):
+    return instruction_builder_agent.process_instruction_adjustment_session_async(
+        "session-1", message, current_instructions, CONTEXT, deadline
+    )
+
+
+def held_session():
+    session, _ = instruction_builder_agent.adjustment_sessions.checkout("session-1")
+    instruction_builder_agent.adjustment_sessions.checkin(session)
+    return session
+
+
+def test_followup_after_tool_round_keeps_turns_alternating(model):
+    async def rounds():
+        result = await adjust("add more detail", "")
+        for feedback in ("make it shorter", "mention ice packs"):
+            result = await adjust(feedback, result["instructions"])
+
+    asyncio.run(rounds())
+    session = held_session()
+    roles = [message["role"] for message in session.messages]
+    assert session.rounds == 3
+    assert any("toolResult" in block for message in session.messages for block in message["content"])
+    assert all(first != second for first, second in zip(roles, roles[1:]))
+    texts = [block["text"] for message in session.messages for block in message["content"] if "text" in block]
+    assert any("mention ice packs" in text for text in texts)
+
+
+def test_conversation_is_held_only_once_a_followup_arrives(model):
+    first = asyncio.run(adjust("add more detail", ""))
+    session = held_session()
+    assert session.rounds == 1
+    assert session.messages == []
+
+    asyncio.run(adjust("make it shorter", first["instructions"]))
+    assert held_session().messages
+    # Every round ran on a pooled agent, and the agents went back to the pool.
+    pool = instruction_builder_agent.get_agent_pool(instruction_builder_agent.INSTRUCTION_ADJUSTMENT_PROMPT)
+    stats = pool.stats()
+    assert stats["checkouts"] == 2
+    assert stats["builds"] == 1
+    assert stats["checked_out"] == 0
+
+
+def test_held_session_honors_deadline(model):
+    async def rounds():
+        result = await adjust("add more detail", "")
+        result = await adjust("make it shorter", result["instructions"])
+        model.latency_ms = 2000
+        started = time.monotonic()
+        with pytest.raises(DeadlineExceeded):
+            await adjust("mention ice packs", result["instructions"], deadline=time.monotonic() + 0.5)
+        return time.monotonic() - started
+
+    assert asyncio.run(rounds()) < 1.0
+
+
+def test_followup_prompt_starts_a_turn_after_an_assistant_reply():
+    messages = [{"role": "user", "content": [{"text": "hi"}]}, {"role": "assistant", "content": [{"text": "ok"}]}]
+    assert followup_prompt(messages, "next") == "next"
+    assert len(messages) == 2
@@ -0,0 +1,85 @@
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Readiness is decided at import from the environment, so each configuration runs in a fresh interpreter.
+_PROBE = """
+import json
+from starlette.testclient import TestClient
+import agent_agentcore
+response = TestClient(agent_agentcore.app).get("/ready")
+print(json.dumps({"status": response.status_code, "body": response.json()}))
+"""
+
+
+def probe_ready(**env) -> dict:
+    completed = subprocess.run(
+        [sys.executable, "-c", _PROBE],
+        capture_output=True,
+        text=True,
+        cwd=ROOT,
+        env={**os.environ, "INSTRUCTION_STORE_PATH": "", **env},
+        check=True,
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def test_ready_when_warm_up_is_disabled():
+    result = probe_ready(INSTRUCTION_WARMUP_ENABLED="false")
+    assert result["status"] == 200
+    assert result["body"] == {"ready": True, "warm_up": "disabled"}
+
+
+def test_not_ready_before_warm_up():
+    result = probe_ready(INSTRUCTION_WARMUP_ENABLED="true")
+    assert result["status"] == 503
+    assert result["body"]["ready"] is False
+
+
+def test_history_limit_must_be_a_positive_integer(monkeypatch):
+    monkeypatch.setenv("INSTRUCTION_STORE_PATH", "")
+    import agent_agentcore
+
+    def validate(limit):
+        return agent_agentcore.validate_payload({"type": "get_instruction_history", "procedure_id": 1, "limit": limit})
+
+    for limit in ("ten", 0, -3, 2.5, [5], True):
+        error = validate(limit)
+        assert error is not None and error["error"] == "limit must be a positive integer", limit
+    for limit in (None, 5, "5"):
+        assert validate(limit) is None
+
+
+def test_coalesced_follower_with_time_left_does_not_inherit_the_leaders_deadline(monkeypatch):
+    monkeypatch.setenv("INSTRUCTION_STORE_PATH", "")
+    import asyncio
+
+    import agent_agentcore
+    import instruction_builder_agent
+    from benchmark_agent import StubModel
+
+    model = StubModel(latency_ms=600, tokens_per_second=0)
+    instruction_builder_agent.set_model_factory(lambda tier: model)
+    payload = {
+        "type": "instruction_adjustment",
+        "message": "Explain the exercises in more detail",
+        "current_instructions": "Activity:\n- Do your exercises.",
+        "context": {"procedure_type": "knee replacement", "days_post_op": 3},
+    }
+
+    async def run():
+        leader = asyncio.ensure_future(agent_agentcore.invoke({**payload, "deadline_ms": 300}))
+        await asyncio.sleep(0.01)
+        follower = asyncio.ensure_future(agent_agentcore.invoke({**payload, "deadline_ms": 5000}))
+        return await leader, await follower
+
+    try:
+        leader, follower = asyncio.run(run())
+    finally:
+        instruction_builder_agent.set_model_factory(None)
+    assert leader.get("deadline_exceeded") is True
+    assert "error" not in follower
+    assert follower["instructions"]
@@ -0,0 +1,144 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from strands import Agent
+from strands.agent.state import AgentState
+from strands.telemetry.metrics import EventLoopMetrics
+
+from agent_pool import AgentPool, AgentPoolExhausted, reset_agent
+
+
+class FakeAgent:
+    def __init__(self):
+        self.messages = []
+        self.state = AgentState()
+        self.event_loop_metrics = EventLoopMetrics()
+
+
+def wait_until(condition, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+
+def test_cancelled_acquirers_do_not_leak_agents():
+    pool = AgentPool(factory=FakeAgent, size=1, name="test")
+    held = pool.acquire()
+
+    async def run():
+        waiters = [asyncio.ensure_future(pool.acquire_async(timeout=2)) for _ in range(5)]
+        await asyncio.sleep(0.05)
+        for waiter in waiters:
+            waiter.cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+        pool.release(held)
+
+    asyncio.run(run())
+    assert wait_until(lambda: pool.stats()["checked_out"] == 0 and pool.stats()["idle"] == 1)
+    assert pool.acquire(timeout=0.1) is not None
+
+
+def test_cancelled_acquirer_releases_agent_checked_out_during_cancellation():
+    pool = AgentPool(factory=FakeAgent, size=2, name="test")
+
+    async def run():
+        # Pool is empty, so the agent is built in a worker thread while we cancel.
+        waiter = asyncio.ensure_future(pool.acquire_async())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+
+    asyncio.run(run())
+    assert wait_until(lambda: pool.stats()["checked_out"] == 0)
+
+
+class CountingExecutor(ThreadPoolExecutor):
+    def __init__(self):
+        super().__init__(max_workers=2)
+        self.submitted = 0
+
+    def submit(self, *args, **kwargs):
+        self.submitted += 1
+        return super().submit(*args, **kwargs)
+
+
+def test_waiting_for_an_exhausted_pool_uses_no_executor_threads():
+    pool = AgentPool(factory=FakeAgent, size=1, name="test")
+    pool.prewarm(1)
+    executor = CountingExecutor()
+
+    async def run():
+        asyncio.get_running_loop().set_default_executor(executor)
+        held = await pool.acquire_async()
+        waiters = [asyncio.ensure_future(pool.acquire_async(timeout=5)) for _ in range(20)]
+        await asyncio.sleep(0.05)
+        assert pool.stats()["waiting"] == 20
+        assert executor.submitted == 0
+        # Other work on the default executor (e.g. store reads) is not stuck behind the waiters.
+        assert await asyncio.wait_for(asyncio.to_thread(threading.get_ident), timeout=1)
+        pool.release(held)
+        for waiter in waiters:
+            pool.release(await waiter)
+
+    asyncio.run(run())
+    assert executor.submitted == 1
+    stats = pool.stats()
+    assert stats["checkouts"] == 21
+    assert stats["waits"] == 20
+    assert stats["builds"] == 1
+    assert stats["idle"] == 1
+
+
+def test_waiter_times_out_and_discard_lets_a_waiter_rebuild():
+    pool = AgentPool(factory=FakeAgent, size=1, name="test")
+
+    async def run():
+        held = await pool.acquire_async()
+        try:
+            await pool.acquire_async(timeout=0.05)
+        except AgentPoolExhausted:
+            pass
+        else:
+            raise AssertionError("expected AgentPoolExhausted")
+        waiter = asyncio.ensure_future(pool.acquire_async(timeout=5))
+        await asyncio.sleep(0.01)
+        pool.release(held, discard=True)
+        replacement = await waiter
+        assert replacement is not held
+        pool.release(replacement)
+
+    asyncio.run(run())
+    stats = pool.stats()
+    assert stats["builds"] == 2
+    assert stats["created"] == 1
+    assert stats["checked_out"] == 0
+    assert stats["waiting"] == 0
+
+
+def test_has_capacity():
+    pool = AgentPool(factory=FakeAgent, size=1, name="test")
+    assert pool.has_capacity()
+    agent = pool.acquire()
+    assert not pool.has_capacity()
+    pool.release(agent)
+    assert pool.has_capacity()
+
+
+def test_reset_clears_state_and_metrics():
+    agent = Agent(model="stub-model", callback_handler=None)
+    agent.messages.append({"role": "user", "content": [{"text": "hi"}]})
+    agent.state.set("patient", "Jane")
+    agent.event_loop_metrics.cycle_count = 7
+    agent.event_loop_metrics.accumulated_usage["totalTokens"] = 1234
+
+    reset_agent(agent)
+
+    assert agent.messages == []
+    assert agent.state.get() == {}
+    assert agent.event_loop_metrics.cycle_count == 0
+    assert agent.event_loop_metrics.accumulated_usage["totalTokens"] == 0
@@ -0,0 +1,81 @@
+import asyncio
+
+import instruction_builder_agent
+from benchmark_agent import StubModel
+
+
+def run_batch(contexts, max_concurrency=None):
+    instruction_builder_agent.set_model_factory(lambda tier: StubModel(latency_ms=0, tokens_per_second=0))
+    try:
+        return asyncio.run(
+            instruction_builder_agent.process_instruction_generation_batch_async(contexts, max_concurrency)
+        )
+    finally:
+        instruction_builder_agent.set_model_factory(None)
+
+
+CONTEXT = {"procedure_type": "knee replacement", "days_post_op": 3}
+
+
+def test_max_concurrency_is_coerced_and_clamped():
+    for max_concurrency in ("4", -1, 0, 10_000):
+        batch = run_batch([CONTEXT, CONTEXT], max_concurrency)
+        assert batch["failed"] == 0, max_concurrency
+
+
+def test_non_dict_entries_fail_only_their_slot():
+    batch = run_batch([CONTEXT, None, "knee", CONTEXT])
+    assert batch["succeeded"] == 2
+    assert batch["failed"] == 2
+    assert "must be a context object" in batch["results"][1]["error"]
+    assert batch["results"][0]["instructions"]
+
+
+def test_non_integer_max_concurrency_is_a_request_error(monkeypatch):
+    monkeypatch.setenv("INSTRUCTION_STORE_PATH", "")
+    import agent_agentcore
+
+    payload = {"type": "instruction_generation_batch", "contexts": [CONTEXT], "max_concurrency": "four"}
+    assert agent_agentcore.validate_payload(payload)["error"] == "max_concurrency must be an integer"
+    assert agent_agentcore.validate_payload({**payload, "max_concurrency": "4"}) is None
+
+
+class ConcurrencyProbe(StubModel):
+    """Stub model that records the largest number of calls running at once."""
+
+    def __init__(self):
+        super().__init__(latency_ms=50, tokens_per_second=0)
+        self.active = 0
+        self.peak = 0
+
+    async def stream(self, *args, **kwargs):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            async for event in super().stream(*args, **kwargs):
+                yield event
+        finally:
+            self.active -= 1
+
+
+def test_batch_items_count_against_the_in_flight_limit(monkeypatch):
+    monkeypatch.setenv("INSTRUCTION_STORE_PATH", "")
+    import agent_agentcore
+    from request_limiter import InflightLimiter
+
+    limiter = InflightLimiter(2, max_queue=64)
+    monkeypatch.setattr(agent_agentcore, "request_limiter", limiter)
+    model = ConcurrencyProbe()
+    instruction_builder_agent.set_model_factory(lambda tier: model)
+    # Distinct procedures so no item is answered from the instruction cache.
+    contexts = [{"procedure_type": f"procedure {i}", "days_post_op": 3} for i in range(6)]
+    try:
+        batch = asyncio.run(
+            agent_agentcore.invoke({"type": "instruction_generation_batch", "contexts": contexts, "max_concurrency": 8})
+        )
+    finally:
+        instruction_builder_agent.set_model_factory(None)
+    assert batch["succeeded"] == 6
+    assert model.calls == 6
+    assert model.peak == 2
+    assert limiter.stats()["by_priority"][2]["waited"] == 4
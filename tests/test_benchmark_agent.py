@@ -0,0 +1,20 @@
+import asyncio
+
+from benchmark_agent import StubModel
+from instruction_builder_agent import InstructionPatchResponse, InstructionResponse
+
+
+async def structured(model, output_model, prompt):
+    messages = [{"role": "user", "content": [{"text": prompt}]}]
+    events = [event async for event in model.structured_output(output_model, messages)]
+    return events[-1]["output"]
+
+
+def test_stub_answers_direct_structured_output_requests():
+    model = StubModel(latency_ms=0, tokens_per_second=0)
+    response = asyncio.run(structured(model, InstructionResponse, "Generate instructions"))
+    assert isinstance(response, InstructionResponse)
+    assert response.instructions.startswith("Hello [PATIENT_NAME],")
+    patch = asyncio.run(structured(model, InstructionPatchResponse, "SECTION HEADINGS:\n- WOUND CARE"))
+    assert [(edit.operation, edit.anchor) for edit in patch.edits] == [("replace", "WOUND CARE")]
+    assert model.calls == 2
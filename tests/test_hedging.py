@@ -0,0 +1,26 @@
+import asyncio
+
+from hedging import Hedger
+
+
+def test_no_hedge_when_pool_is_saturated():
+    hedger = Hedger(enabled=True, percentile=50, min_samples=1, window=10)
+    calls = []
+    delays = [0.01]
+
+    async def call():
+        calls.append(1)
+        await asyncio.sleep(delays[0])
+        return "ok"
+
+    async def run():
+        await hedger.run("pool", call)
+        calls.clear()
+        delays[0] = 0.2
+        return await hedger.run("pool", call, can_hedge=lambda: False)
+
+    assert asyncio.run(run()) == "ok"
+    assert len(calls) == 1
+    stats = hedger.stats()
+    assert stats["hedged"] == 0
+    assert stats["hedges_skipped"] == 1
@@ -0,0 +1,143 @@
+import asyncio
+
+import pytest
+
+import instruction_builder_agent
+import instruction_cache
+from benchmark_agent import StubModel
+from instruction_builder_agent import (
+    instruction_cache_key,
+    personalize_instructions,
+    process_instruction_generation_async,
+    split_instruction_context,
+)
+from instruction_cache import InstructionCache
+
+PATIENT_A = {
+    "procedure_id": 1,
+    "patient_id": 10,
+    "patient_name": "Jane Doe",
+    "doctor_name": "Dr. Smith",
+    "perform_at": "2024-03-01",
+    "procedure_type": "Knee  Replacement",
+    "days_post_op": 3,
+}
+PATIENT_B = {
+    **PATIENT_A,
+    "procedure_id": 2,
+    "patient_id": 20,
+    "patient_name": "John Roe",
+    "doctor_name": "Dr. Jones",
+    "perform_at": "2024-04-11",
+    "procedure_type": "knee replacement",
+    "days_post_op": 4,
+}
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(instruction_cache.time, "monotonic", clock)
+    return clock
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = InstructionCache(max_entries=2, ttl_seconds=0)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    cache.put("a", 4)
+    cache.put("d", 5)
+    assert cache.get("c") is None
+    assert cache.get("a") == 4
+    stats = cache.stats()
+    assert (stats["entries"], stats["evictions"], stats["hits"], stats["misses"]) == (2, 2, 4, 2)
+
+
+def test_entries_expire_after_the_ttl(clock):
+    cache = InstructionCache(ttl_seconds=60)
+    cache.put("a", 1)
+    clock.now += 59
+    assert cache.get("a") == 1
+    cache.put("b", 2)
+    clock.now += 1
+    # A hit does not extend the TTL; it counts from the put.
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    clock.now += 59
+    assert cache.get("b") is None
+    stats = cache.stats()
+    assert (stats["entries"], stats["expirations"], stats["evictions"]) == (0, 2, 0)
+
+
+def test_ttl_of_zero_never_expires(clock):
+    cache = InstructionCache(ttl_seconds=0)
+    cache.put("a", 1)
+    clock.now += 10**9
+    assert cache.get("a") == 1
+
+
+def test_invalidate_drops_every_entry():
+    cache = InstructionCache()
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.invalidate() == 2
+    assert cache.get("a") is None
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_cache_key_ignores_who_the_instructions_are_for():
+    clinical_a, personalization_a = split_instruction_context(PATIENT_A)
+    clinical_b, _ = split_instruction_context(PATIENT_B)
+    assert clinical_a == clinical_b == {
+        "procedure_type": "knee replacement",
+        "recovery_phase": "early",
+        "patient_name": "[PATIENT_NAME]",
+        "doctor_name": "[DOCTOR_NAME]",
+    }
+    assert instruction_cache_key(clinical_a) == instruction_cache_key(clinical_b)
+    fields = ("procedure_id", "patient_id", "patient_name", "doctor_name", "perform_at")
+    assert personalization_a == {field: PATIENT_A[field] for field in fields}
+
+    later, _ = split_instruction_context({**PATIENT_A, "days_post_op": 30})
+    unnamed, _ = split_instruction_context({k: v for k, v in PATIENT_A.items() if k != "patient_name"})
+    assert instruction_cache_key(later) != instruction_cache_key(clinical_a)
+    assert instruction_cache_key(unnamed) != instruction_cache_key(clinical_a)
+
+
+def test_personalize_fills_names_with_neutral_fallbacks():
+    response = {"instructions": "Hello [PATIENT_NAME], call [DOCTOR_NAME].", "reasoning": "[PATIENT_NAME]"}
+    assert personalize_instructions(response, {"patient_name": "Jane", "doctor_name": "Dr. Smith"}) == {
+        "instructions": "Hello Jane, call Dr. Smith.",
+        "reasoning": "Jane",
+    }
+    assert personalize_instructions(response, {})["instructions"] == "Hello you, call your doctor."
+    assert response["instructions"] == "Hello [PATIENT_NAME], call [DOCTOR_NAME]."
+
+
+def test_patients_with_the_same_clinical_context_share_one_model_call():
+    model = StubModel(latency_ms=0, tokens_per_second=0)
+    instruction_builder_agent.set_model_factory(lambda tier: model)
+    instruction_builder_agent.instruction_cache.invalidate()
+    try:
+        first = asyncio.run(process_instruction_generation_async(PATIENT_A))
+        second = asyncio.run(process_instruction_generation_async(PATIENT_B))
+    finally:
+        instruction_builder_agent.set_model_factory(None)
+        instruction_builder_agent.instruction_cache.invalidate()
+    assert model.calls == 1
+    assert first["instructions"].startswith("Hello Jane Doe,")
+    assert second["instructions"].startswith("Hello John Roe,")
+    assert "[PATIENT_NAME]" not in second["instructions"] and "[DOCTOR_NAME]" not in second["instructions"]
+    assert "Dr. Jones" in second["instructions"]
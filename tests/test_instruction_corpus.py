@@ -0,0 +1,82 @@
+import asyncio
+import json
+
+import pytest
+
+import instruction_builder_agent
+from benchmark_agent import StubModel
+from instruction_corpus import InstructionCorpus, corpus_key
+
+ENTRY = {"instructions": "Corpus instructions for [PATIENT_NAME].", "reasoning": "Precomputed"}
+
+
+def make_corpus():
+    return InstructionCorpus(entries={corpus_key("knee replacement", "early", "completed"): ENTRY})
+
+
+def test_lookup_hit_and_miss():
+    corpus = make_corpus()
+    assert corpus.lookup({"procedure_type": "knee replacement", "recovery_phase": "early"}) == ENTRY
+    assert corpus.lookup({"procedure_type": "knee replacement", "recovery_phase": "late"}) is None
+    assert corpus.lookup({"procedure_type": "hip replacement", "recovery_phase": "early"}) is None
+    stats = corpus.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 2)
+
+
+def test_history_bypasses_lookup_but_not_draft():
+    corpus = make_corpus()
+    clinical = {
+        "procedure_type": "knee replacement",
+        "recovery_phase": "early",
+        "procedure_history": [{"type": "dvt treatment"}],
+    }
+    assert corpus.lookup(clinical) is None
+    assert corpus.lookup_draft(clinical) == ENTRY
+    stats = corpus.stats()
+    assert (stats["hits"], stats["history_bypasses"], stats["drafts"]) == (0, 1, 1)
+
+
+class PromptRecorder(StubModel):
+    def __init__(self):
+        super().__init__(latency_ms=0, tokens_per_second=0)
+        self.prompts = []
+
+    def _tool_input(self, tool_name, prompt):
+        self.prompts.append(prompt)
+        return json.dumps({"instructions": "Model instructions for [PATIENT_NAME].", "reasoning": "Model"})
+
+
+@pytest.fixture
+def model(monkeypatch):
+    monkeypatch.setattr(instruction_builder_agent, "instruction_corpus", make_corpus())
+    model = PromptRecorder()
+    instruction_builder_agent.set_model_factory(lambda tier: model)
+    instruction_builder_agent.instruction_cache.invalidate()
+    yield model
+    instruction_builder_agent.set_model_factory(None)
+    instruction_builder_agent.instruction_cache.invalidate()
+
+
+def generate(context):
+    return asyncio.run(instruction_builder_agent.process_instruction_generation_async(context))
+
+
+def test_generation_without_history_is_served_from_the_corpus(model):
+    result = generate({"procedure_type": "Knee Replacement", "days_post_op": 4, "patient_name": "Jane"})
+    assert result["instructions"] == "Corpus instructions for Jane."
+    assert model.prompts == []
+
+
+def test_generation_with_history_calls_the_model_with_the_corpus_draft(model):
+    context = {
+        "procedure_type": "Knee Replacement",
+        "days_post_op": 4,
+        "patient_name": "Jane",
+        "procedure_history": [{"type": "DVT treatment", "perform_at": "2023-05-01"}],
+    }
+    result = generate(context)
+    assert result["instructions"] == "Model instructions for Jane."
+    (prompt,) = model.prompts
+    assert "dvt treatment" in prompt
+    assert "DRAFT INSTRUCTIONS" in prompt
+    assert ENTRY["instructions"] in prompt
@@ -0,0 +1,103 @@
+import asyncio
+import json
+
+import pytest
+
+import instruction_builder_agent
+from benchmark_agent import StubModel
+from instruction_builder_agent import phases_crossed, process_instruction_refresh_async
+from instruction_sections import section_body
+
+DOCUMENT = (
+    "Hello Jane Doe,\n"
+    "\n"
+    "Activity:\n"
+    "- Rest with your leg raised.\n"
+    "- Avoid stairs for 2 weeks (per Dr. Smith).\n"
+    "\n"
+    "Wound Care:\n"
+    "- Keep the incision dry. Edited by nurse on day 2.\n"
+    "\n"
+    "Follow-Up:\n"
+    "- See Dr. Smith in 2 weeks.\n"
+)
+CONTEXT = {"procedure_type": "knee replacement", "patient_name": "Jane Doe", "doctor_name": "Dr. Smith"}
+
+
+class RefreshModel(StubModel):
+    """Answers a refresh by echoing clinician lines from CURRENT SECTION TEXT, wrapped in a greeting and headings."""
+
+    def __init__(self):
+        super().__init__(latency_ms=0, tokens_per_second=0)
+        self.prompts = []
+
+    def _tool_input(self, tool_name, prompt):
+        self.prompts.append(prompt)
+        current = prompt.split("CURRENT SECTION TEXT:\n", 1)[-1]
+        kept = [line for line in current.splitlines() if "per Dr." in line]
+        body = "\n".join(["Hello [PATIENT_NAME],", "", "ACTIVITY", "- Walk a little more each day.", *kept])
+        return json.dumps({"instructions": body, "reasoning": "Updated for the new phase"})
+
+
+@pytest.fixture
+def model():
+    model = RefreshModel()
+    instruction_builder_agent.set_model_factory(lambda tier: model)
+    instruction_builder_agent.instruction_cache.invalidate()
+    yield model
+    instruction_builder_agent.set_model_factory(None)
+    instruction_builder_agent.instruction_cache.invalidate()
+
+
+def test_phases_crossed():
+    assert phases_crossed(3, 5) == []
+    assert phases_crossed(6, 9) == ["intermediate"]
+    assert phases_crossed(1, 30) == ["early", "intermediate", "late"]
+    assert phases_crossed(30, 10) == ["intermediate"]
+    assert phases_crossed("7", "8") == ["intermediate"]
+    with pytest.raises(ValueError):
+        phases_crossed(None, 8)
+    with pytest.raises(ValueError):
+        phases_crossed(-1, 8)
+
+
+def test_refresh_keeps_other_sections_and_clinician_content(model):
+    # A cached generic section must not stand in for this patient's edited one.
+    section_context = {"procedure_type": "knee replacement", "recovery_phase": "intermediate", "section": "Activity"}
+    instruction_builder_agent.instruction_cache.put(
+        "section:" + instruction_builder_agent.instruction_cache_key(section_context),
+        {"instructions": "Generic cached text", "reasoning": ""},
+    )
+    result = asyncio.run(process_instruction_refresh_async(DOCUMENT, 6, 9, CONTEXT))
+    instructions = result["instructions"]
+
+    assert result["phases_crossed"] == ["intermediate"]
+    assert result["refreshed_sections"] == ["Activity", "Follow-Up"]
+    assert "Hello Jane Doe,\n\nActivity:\n" in instructions
+    assert "Wound Care:\n- Keep the incision dry. Edited by nurse on day 2.\n\n" in instructions
+    assert "- Avoid stairs for 2 weeks (per Dr. Smith)." in instructions
+    assert "- Walk a little more each day." in instructions
+    # Greeting and nested headings from the section output are not pasted into the document.
+    assert instructions.count("Hello") == 1
+    assert "ACTIVITY" not in instructions
+    assert "Generic cached text" not in instructions
+    assert any("Avoid stairs for 2 weeks (per Dr. Smith)" in prompt for prompt in model.prompts)
+
+
+def test_refresh_within_phase_makes_no_model_call(model):
+    result = asyncio.run(process_instruction_refresh_async(DOCUMENT, 3, 5, CONTEXT))
+    assert result["unchanged"] is True
+    assert result["instructions"] == DOCUMENT
+    assert model.prompts == []
+
+
+def test_refresh_with_an_ambiguous_section_regenerates_the_document(model):
+    document = DOCUMENT.replace("Activity:", "Activity and Rest:").replace("Wound Care:", "Activity at Home:")
+    result = asyncio.run(process_instruction_refresh_async(document, 6, 9, CONTEXT))
+    assert "matched 2 sections" in result["refresh_fallback"]
+    assert result["refreshed_sections"] == []
+
+
+def test_section_body_strips_greeting_and_headings():
+    text = "Dear [PATIENT_NAME],\n\n## Activity\n- Walk daily.\nDRIVING\n- No driving yet.\n"
+    assert section_body(text) == "- Walk daily.\n- No driving yet."
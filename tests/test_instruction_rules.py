@@ -0,0 +1,36 @@
+from instruction_builder_agent import FAST_PATH_MIN_CONFIDENCE
+from instruction_rules import apply_rule_adjustment
+
+
+def test_number_does_not_match_inside_larger_number():
+    assert apply_rule_adjustment("change 5 to 10", "- Take 25 mg of ibuprofen.") is None
+
+
+def test_duration_does_not_match_inside_larger_duration():
+    assert apply_rule_adjustment("change 2 weeks to 3 weeks", "- No driving for 12 weeks.") is None
+
+
+def test_word_does_not_match_inside_longer_word():
+    assert apply_rule_adjustment("change stairs to ramps", "- Sleep upstairs only with help.") is None
+
+
+def test_word_replaced_only_where_it_stands_alone():
+    edit = apply_rule_adjustment("change stairs to ramps", "- Avoid stairs.\n- Sleep upstairs only with help.")
+    assert edit.instructions == "- Avoid ramps.\n- Sleep upstairs only with help."
+    assert edit.confidence >= FAST_PATH_MIN_CONFIDENCE
+
+
+def test_numeric_edit_is_left_to_the_model():
+    edit = apply_rule_adjustment("change 2 weeks to 3 weeks", "- No driving for 2 weeks.")
+    assert edit.instructions == "- No driving for 3 weeks."
+    assert edit.confidence < FAST_PATH_MIN_CONFIDENCE
+
+
+def test_dose_edit_is_left_to_the_model():
+    edit = apply_rule_adjustment("change 5 mg to 10 mg", "- Take 5 mg at night; 2.5 mg in the morning.")
+    assert edit.instructions == "- Take 10 mg at night; 2.5 mg in the morning."
+    assert edit.confidence < FAST_PATH_MIN_CONFIDENCE
+
+
+def test_decimal_is_not_split():
+    assert apply_rule_adjustment("change 5 to 10", "- Take 2.5 mg daily.") is None
@@ -0,0 +1,129 @@
+import asyncio
+import json
+
+import pytest
+
+import instruction_builder_agent
+from benchmark_agent import StubModel
+from instruction_sections import (
+    AmbiguousSectionError,
+    SectionAnchorError,
+    SectionEdit,
+    apply_section_edits,
+    find_section,
+    heading_title,
+    parse_sections,
+    render_sections,
+    section_titles,
+)
+
+DOCUMENT = (
+    "Hello [PATIENT_NAME],\n"
+    "\n"
+    "Activity:\n"
+    "- Walk short distances every few hours.\n"
+    "IMPORTANT:\n"
+    "- Do not lift more than 10 pounds.\n"
+    "\n"
+    "**Wound Care and Bathing:**\n"
+    "- Keep the incision clean and dry.\n"
+    "  NOTE:\n"
+    "  Sponge baths only until the staples are out.\n"
+    "\n"
+    "WARNING SIGNS\n"
+    "- Call [DOCTOR_NAME] for a fever above 101 F.\n"
+    "\n"
+    "Pain Management:\n"
+    "- Take your pain medicine with food.\n"
+)
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        DOCUMENT,
+        "",
+        "No headings at all.\n",
+        "## Activity\nRest.\n\n## Follow-Up ##\r\nSee us in 2 weeks.",
+        "ACTIVITY\n- Rest.\n\n\n\nFOLLOW-UP\n- Call us.\n\n",
+    ],
+)
+def test_parse_and_render_round_trip(text):
+    assert render_sections(parse_sections(text)) == text
+
+
+def test_callouts_and_indented_labels_stay_inside_their_section():
+    assert section_titles(DOCUMENT) == ["Activity", "Wound Care and Bathing", "WARNING SIGNS", "Pain Management"]
+    activity = parse_sections(DOCUMENT)[1]
+    assert "IMPORTANT:\n- Do not lift more than 10 pounds." in activity.body
+    assert heading_title("Important:") == ""
+    assert heading_title("**NOTE:**") == ""
+    assert heading_title("- Activity:") == ""
+    assert heading_title("### Important") == "Important"
+
+
+def test_apply_edits_keeps_unnamed_sections_byte_for_byte():
+    edits = [
+        SectionEdit(operation="replace", anchor="Activity", content="- Walk every hour."),
+        SectionEdit(operation="insert", anchor="Wound Care and Bathing", heading="Diet", content="- Drink water."),
+        SectionEdit(operation="delete", anchor="Pain Management"),
+    ]
+    updated = apply_section_edits(DOCUMENT, edits)
+    assert section_titles(updated) == ["Activity", "Wound Care and Bathing", "Diet", "WARNING SIGNS"]
+    sections = {s.title: s for s in parse_sections(updated)}
+    assert sections["Activity"].body == "- Walk every hour.\n\n"
+    assert sections["Diet"].heading == "Diet:\n"
+    original = {s.title: s for s in parse_sections(DOCUMENT)}
+    for title in ("", "Wound Care and Bathing"):
+        assert sections[title] == original[title]
+    assert updated.endswith(original["WARNING SIGNS"].heading + original["WARNING SIGNS"].body)
+
+
+def test_partial_anchor_matches_through_the_section_vocabulary():
+    sections = parse_sections(DOCUMENT)
+    assert sections[find_section(sections, "wound care")].title == "Wound Care and Bathing"
+    assert sections[find_section(sections, "**Warning Signs:**")].title == "WARNING SIGNS"
+    with pytest.raises(SectionAnchorError, match="matched no section"):
+        find_section(sections, "Pain")
+    with pytest.raises(SectionAnchorError, match="matched no section"):
+        find_section(sections, "Medications")
+    with pytest.raises(SectionAnchorError):
+        find_section(sections, "  ")
+
+
+def test_ambiguous_anchor_is_rejected_without_applying_any_edit():
+    text = "Wound Care:\n- Keep it dry.\n\nWound Care at Night:\n- Cover it.\n\nWound Care Supplies:\n- Gauze.\n"
+    sections = parse_sections(text)
+    assert sections[find_section(sections, "Wound Care")].title == "Wound Care"
+    with pytest.raises(AmbiguousSectionError):
+        find_section(sections, "Wound")
+    twice = "Activity:\n- Rest.\n\nActivity:\n- Walk.\n"
+    edits = [SectionEdit(operation="replace", anchor="Activity", content="- Swim.")]
+    with pytest.raises(AmbiguousSectionError, match="matched 2 sections"):
+        apply_section_edits(twice, edits)
+
+
+class AmbiguousPatchModel(StubModel):
+    """Patches with an anchor that matches two headings; answers full adjustments with fixed text."""
+
+    def _tool_input(self, tool_name, prompt):
+        if tool_name == "InstructionPatchResponse":
+            edits = [{"operation": "replace", "anchor": "Wound", "content": "- Changed."}]
+            return json.dumps({"edits": edits, "reasoning": "Patch"})
+        return json.dumps({"instructions": "Regenerated instructions.", "reasoning": "Full adjustment"})
+
+
+def test_patch_with_an_ambiguous_anchor_falls_back_to_full_adjustment():
+    model = AmbiguousPatchModel(latency_ms=0, tokens_per_second=0)
+    instruction_builder_agent.set_model_factory(lambda tier: model)
+    text = "Wound Care:\n- Keep it dry.\n\nWound Care at Night:\n- Cover it.\n"
+    try:
+        result = asyncio.run(
+            instruction_builder_agent.process_instruction_patch_async(
+                "Mention the dressing change", text, {"procedure_type": "knee replacement"}
+            )
+        )
+    finally:
+        instruction_builder_agent.set_model_factory(None)
+    assert "matched 2 sections" in result["patch_fallback"]
+    assert result["instructions"] == "Regenerated instructions."
@@ -0,0 +1,116 @@
+import asyncio
+import time
+
+from instruction_store import InstructionStore
+
+
+def response(text: str, **details) -> dict:
+    return {"instructions": text, "reasoning": f"because {text}", **details}
+
+
+def wait_written(store: InstructionStore, count: int, timeout: float = 5.0) -> None:
+    until = time.monotonic() + timeout
+    while store.stats()["written"] < count:
+        assert time.monotonic() < until, store.stats()
+        time.sleep(0.01)
+
+
+def test_close_flushes_queued_records_as_versions(tmp_path):
+    store = InstructionStore(str(tmp_path / "store.sqlite3"))
+    assert store.record(7, "hash-a", "generation", response("first", model_tier="large", error="dropped"))
+    assert store.record(7, "hash-b", "adjustment", response("second"), message="shorter please")
+    assert store.record(8, "hash-a", "generation", response("other procedure"))
+    store.close()
+
+    stats = store.stats()
+    assert (stats["written"], stats["pending"], stats["dropped"]) == (3, 0, 0)
+    history = store.history(7)
+    assert [(row["version"], row["kind"], row["instructions"]) for row in history] == [
+        (2, "adjustment", "second"),
+        (1, "generation", "first"),
+    ]
+    assert history[0]["message"] == "shorter please"
+    assert history[1]["details"] == {"model_tier": "large"}
+    assert [row["version"] for row in store.history(7, limit=1)] == [2]
+    assert [row["version"] for row in store.history(8)] == [1]
+
+
+def test_latest_returns_the_newest_version_for_the_same_request(tmp_path):
+    store = InstructionStore(str(tmp_path / "store.sqlite3"))
+    store.record(7, "hash-a", "generation", response("old"))
+    store.record(7, "hash-b", "generation", response("unrelated"))
+    store.record(7, "hash-a", "generation", response("new", fast_path=True))
+    store.close()
+
+    assert store.latest(7, "hash-a") == {
+        "instructions": "new",
+        "reasoning": "because new",
+        "fast_path": True,
+        "stored_version": 3,
+    }
+    assert store.latest(7, "hash-c") is None
+    assert store.latest(8, "hash-a") is None
+    assert (store.stats()["hits"], store.stats()["misses"]) == (1, 2)
+
+
+def test_records_are_dropped_when_the_write_queue_is_full(tmp_path):
+    store = InstructionStore(str(tmp_path / "store.sqlite3"), queue_size=1)
+    store.close()
+    assert store.record(7, "hash-a", "generation", response("queued"))
+    assert not store.record(7, "hash-a", "generation", response("dropped"))
+    assert store.stats()["dropped"] == 1
+
+
+def test_disabled_store_records_and_serves_nothing():
+    store = InstructionStore("")
+    assert not store.enabled
+    assert not store.record(7, "hash-a", "generation", response("ignored"))
+    assert store.latest(7, "hash-a") is None
+    assert store.history(7) == []
+    assert store.invalidate() == 0
+
+
+def test_invalidate_bumps_a_persisted_generation_and_keeps_history(tmp_path):
+    path = str(tmp_path / "store.sqlite3")
+    store = InstructionStore(path)
+    assert store.generation == 0
+    store.record(7, "hash-a", "generation", response("kept"))
+    assert store.invalidate() == 1
+    store.close()
+    assert [row["instructions"] for row in store.history(7)] == ["kept"]
+
+    reopened = InstructionStore(path)
+    assert reopened.generation == 1
+    assert reopened.invalidate() == 2
+    reopened.close()
+
+
+def test_cache_invalidate_stops_serving_stored_versions(monkeypatch, tmp_path):
+    monkeypatch.setenv("INSTRUCTION_STORE_PATH", "")
+    import agent_agentcore
+    import instruction_builder_agent
+    from benchmark_agent import StubModel
+
+    store = InstructionStore(str(tmp_path / "store.sqlite3"))
+    monkeypatch.setattr(agent_agentcore, "instruction_store", store)
+    instruction_builder_agent.set_model_factory(lambda tier: StubModel(latency_ms=0, tokens_per_second=0))
+    payload = {
+        "type": "instruction_generation",
+        "context": {"procedure_id": 41, "procedure_type": "hip replacement", "days_post_op": 2},
+    }
+    try:
+        first = asyncio.run(agent_agentcore.invoke(payload))
+        assert "stored_version" not in first
+        wait_written(store, 1)
+        assert asyncio.run(agent_agentcore.invoke(payload))["stored_version"] == 1
+
+        before = agent_agentcore.request_hash(payload)
+        invalidated = asyncio.run(agent_agentcore.invoke({"type": "cache_invalidate"}))
+        assert invalidated["store_generation"] == 1
+        assert agent_agentcore.request_hash(payload) != before
+        assert "stored_version" not in asyncio.run(agent_agentcore.invoke(payload))
+        wait_written(store, 2)
+        assert asyncio.run(agent_agentcore.invoke(payload))["stored_version"] == 2
+    finally:
+        instruction_builder_agent.set_model_factory(None)
+        store.close()
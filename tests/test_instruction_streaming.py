@@ -0,0 +1,68 @@
+import json
+
+import pytest
+
+from instruction_streaming import InstructionTextExtractor, PlaceholderSubstituter
+
+INSTRUCTIONS = 'Line one\nTab\there "quoted" back\\slash a/b café \U0001F600 — done.\r\n\b\f'
+REPLACEMENTS = {"[PATIENT_NAME]": "Jane Doe", "[DOCTOR_NAME]": "Dr. Smith"}
+
+
+def decode(pieces) -> tuple:
+    extractor = InstructionTextExtractor()
+    text = "".join(extractor.feed(piece) for piece in pieces)
+    return text, extractor.done
+
+
+@pytest.mark.parametrize("ensure_ascii", [True, False])
+def test_extractor_decodes_escapes_across_every_split_point(ensure_ascii):
+    raw = json.dumps({"instructions": INSTRUCTIONS, "reasoning": "r"}, ensure_ascii=ensure_ascii)
+    assert decode([raw]) == (INSTRUCTIONS, True)
+    for cut in range(1, len(raw)):
+        assert decode([raw[:cut], raw[cut:]]) == (INSTRUCTIONS, True), cut
+
+
+def test_extractor_handles_one_character_fragments_and_key_spacing():
+    raw = '{"reasoning": "Uses \\"instructions\\" words", "instructions" :  "Rest \\u00e9\\ud83d\\ude00.\\n"}'
+    assert decode(raw) == ("Rest é\U0001F600.\n", True)
+
+
+def test_extractor_holds_back_an_incomplete_escape():
+    extractor = InstructionTextExtractor()
+    assert extractor.feed('{"instructions": "a\\') == "a"
+    assert extractor.feed("u00") == ""
+    assert extractor.feed("e9\\ud83d") == "é"
+    assert extractor.feed("\\ude0") == ""
+    assert extractor.feed('0 end"') == "\U0001F600 end"
+    assert extractor.done
+    assert extractor.feed('more"') == ""
+
+
+def test_extractor_waits_for_the_instructions_key():
+    extractor = InstructionTextExtractor()
+    assert extractor.feed('{"instruc') == ""
+    assert extractor.feed('tions": ') == ""
+    assert extractor.feed('"Hi') == "Hi"
+    assert not extractor.done
+
+
+def substitute(pieces) -> str:
+    substituter = PlaceholderSubstituter(REPLACEMENTS)
+    return "".join(substituter.feed(piece) for piece in pieces) + substituter.flush()
+
+
+def test_substituter_replaces_placeholders_split_at_any_point():
+    text = "Hello [PATIENT_NAME], call [DOCTOR_NAME] [1] or [PATIENT_NAME]."
+    expected = "Hello Jane Doe, call Dr. Smith [1] or Jane Doe."
+    for cut in range(len(text) + 1):
+        assert substitute([text[:cut], text[cut:]]) == expected, cut
+    assert substitute(text) == expected
+
+
+def test_substituter_holds_back_only_a_possible_placeholder():
+    substituter = PlaceholderSubstituter(REPLACEMENTS)
+    assert substituter.feed("Hello [PATIENT") == "Hello "
+    assert substituter.feed("_NAME], see [a long bracketed note") == "Jane Doe, see [a long bracketed note"
+    assert substituter.feed("tail [") == "tail "
+    assert substituter.flush() == "["
+    assert substituter.flush() == ""
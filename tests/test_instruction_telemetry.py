@@ -0,0 +1,21 @@
+from strands import Agent
+
+from benchmark_agent import StubModel
+from instruction_builder_agent import InstructionResponse
+from instruction_telemetry import invocation_usage
+
+
+def test_invocation_usage_is_per_invocation():
+    agent = Agent(
+        model=StubModel(latency_ms=0, tokens_per_second=0),
+        callback_handler=None,
+        structured_output_model=InstructionResponse,
+    )
+    first = invocation_usage(agent("Generate instructions for knee replacement").metrics)
+    second_result = agent("Generate instructions for knee replacement")
+    second = invocation_usage(second_result.metrics)
+
+    assert first["totalTokens"] > 0
+    # The agent was not reset between calls: the running total covers both, the invocation only one.
+    assert second_result.metrics.accumulated_usage["totalTokens"] == first["totalTokens"] + second["totalTokens"]
+    assert second["totalTokens"] < second_result.metrics.accumulated_usage["totalTokens"]
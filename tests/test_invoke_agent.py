@@ -0,0 +1,51 @@
+import io
+import json
+
+import invoke_agent
+from invoke_agent import invoke_bulk, load_payloads
+
+
+class FakeClient:
+    def __init__(self):
+        self.payloads = []
+
+    def invoke_agent_runtime(self, agentRuntimeArn, runtimeSessionId, payload, qualifier):
+        self.payloads.append(json.loads(payload))
+        return {"contentType": "application/json", "response": io.BytesIO(b'{"instructions": "ok"}')}
+
+
+def test_load_payloads_reports_items_that_are_not_objects(tmp_path):
+    path = tmp_path / "payloads.json"
+    path.write_text(json.dumps([
+        {"description": "wrapped", "payload": {"type": "health"}},
+        {"type": "health"},
+        "not a payload",
+        {"description": "bad wrapper", "payload": [1, 2]},
+    ]))
+    assert load_payloads(str(path)) == [
+        ("wrapped", {"type": "health"}, None),
+        ("#1", {"type": "health"}, None),
+        ("#2", None, "item is a JSON str, not an object"),
+        ("bad wrapper", None, "payload is a JSON list, not an object"),
+    ]
+
+
+def test_load_payloads_keeps_going_past_a_bad_jsonl_line(tmp_path):
+    path = tmp_path / "payloads.jsonl"
+    path.write_text('{"type": "health"}\n\n{"type": \n[]\n')
+    loaded = load_payloads(str(path))
+    assert loaded[0] == ("#0", {"type": "health"}, None)
+    assert loaded[1][1] is None and loaded[1][2].startswith("line 3 is not valid JSON")
+    assert loaded[2] == ("#2", None, "item is a JSON list, not an object")
+
+
+def test_invalid_payloads_are_recorded_without_an_invocation(monkeypatch, tmp_path):
+    client = FakeClient()
+    monkeypatch.setattr(invoke_agent, "create_client", lambda region, max_pool_connections: client)
+    output = tmp_path / "results.jsonl"
+    payloads = [("good", {"type": "health"}, None), ("bad", None, "item is a JSON int, not an object")]
+    results = invoke_bulk("arn:test", payloads, str(output), parallelism=2)
+    assert client.payloads == [{"type": "health"}]
+    assert [(r["description"], r["ok"]) for r in results] == [("good", True), ("bad", False)]
+    assert results[1]["error"] == "Invalid payload: item is a JSON int, not an object"
+    assert len(output.read_text().splitlines()) == 2
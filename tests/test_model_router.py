@@ -0,0 +1,88 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import model_router
+from model_router import TIER_LARGE, TIER_SMALL, adjustment_tier, generation_tier
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONTEXT = {"procedure_type": "knee replacement"}
+
+
+@pytest.fixture
+def routing(monkeypatch):
+    monkeypatch.setattr(model_router, "MODEL_ROUTING_ENABLED", True)
+    monkeypatch.setattr(model_router, "FORCED_TIER", "")
+    monkeypatch.setattr(model_router, "GENERATION_TIER", TIER_LARGE)
+    monkeypatch.setattr(model_router, "SMALL_TIER_MAX_MESSAGE_CHARS", 20)
+    monkeypatch.setattr(model_router, "SMALL_TIER_MAX_INSTRUCTION_CHARS", 100)
+    return monkeypatch
+
+
+def test_small_adjustments_go_to_the_small_tier(routing):
+    assert adjustment_tier("Shorter please", "x" * 100, CONTEXT) == TIER_SMALL
+    assert adjustment_tier("", "", CONTEXT) == TIER_SMALL
+
+
+@pytest.mark.parametrize(
+    "message, instructions, context",
+    [
+        ("m" * 21, "short", CONTEXT),
+        ("Shorter please", "x" * 101, CONTEXT),
+        ("Shorter please", "short", {}),
+        ("Shorter please", "short", None),
+    ],
+)
+def test_large_or_unknown_adjustments_go_to_the_large_tier(routing, message, instructions, context):
+    assert adjustment_tier(message, instructions, context) == TIER_LARGE
+
+
+def test_routing_disabled_always_uses_the_large_tier(routing):
+    routing.setattr(model_router, "MODEL_ROUTING_ENABLED", False)
+    routing.setattr(model_router, "GENERATION_TIER", TIER_SMALL)
+    assert adjustment_tier("Shorter please", "short", CONTEXT) == TIER_LARGE
+    assert generation_tier(CONTEXT) == TIER_LARGE
+
+
+def test_generation_tier_is_configurable(routing):
+    assert generation_tier(CONTEXT) == TIER_LARGE
+    routing.setattr(model_router, "GENERATION_TIER", TIER_SMALL)
+    assert generation_tier(CONTEXT) == TIER_SMALL
+    routing.setattr(model_router, "GENERATION_TIER", "medium")
+    assert generation_tier(CONTEXT) == TIER_LARGE
+
+
+def test_forced_tier_overrides_routing(routing):
+    routing.setattr(model_router, "MODEL_ROUTING_ENABLED", False)
+    routing.setattr(model_router, "FORCED_TIER", TIER_SMALL)
+    assert generation_tier(CONTEXT) == TIER_SMALL
+    assert adjustment_tier("m" * 500, "x" * 5000, {}) == TIER_SMALL
+    routing.setattr(model_router, "FORCED_TIER", "bogus")
+    assert adjustment_tier("m" * 500, "short", CONTEXT) == TIER_LARGE
+
+
+def probe_config(**env) -> dict:
+    completed = subprocess.run(
+        [sys.executable, "-c", "import json, model_router; print(json.dumps(model_router.routing_config()))"],
+        capture_output=True,
+        text=True,
+        cwd=ROOT,
+        env={
+            **{k: v for k, v in os.environ.items() if not k.startswith("INSTRUCTION_MODEL")},
+            **env,
+        },
+        check=True,
+    )
+    return json.loads(completed.stdout)
+
+
+def test_routing_is_on_by_default_only_with_a_small_model_id():
+    assert probe_config()["enabled"] is False
+    config = probe_config(INSTRUCTION_MODEL_ID_SMALL="small-model")
+    assert config["enabled"] is True
+    assert config["model_ids"] == {TIER_SMALL: "small-model", TIER_LARGE: "default"}
+    disabled = probe_config(INSTRUCTION_MODEL_ID_SMALL="small-model", INSTRUCTION_MODEL_ROUTING_ENABLED="false")
+    assert disabled["enabled"] is False
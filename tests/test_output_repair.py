@@ -0,0 +1,83 @@
+import json
+import os
+
+import pytest
+
+import instruction_builder_agent
+from benchmark_agent import StubModel
+from instruction_builder_agent import InstructionPatchResponse, InstructionResponse, create_instruction_agent
+from output_repair import repair_structured_output
+
+FIXTURES_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "output_repair_fixtures.json")
+with open(FIXTURES_PATH) as f:
+    FIXTURES = json.load(f)
+OUTPUT_MODELS = {m.__name__: m for m in (InstructionResponse, InstructionPatchResponse)}
+
+
+@pytest.mark.parametrize("fixture", FIXTURES, ids=[fixture["description"] for fixture in FIXTURES])
+def test_fixture(fixture):
+    result = repair_structured_output(fixture["raw"], OUTPUT_MODELS[fixture["output_model"]])
+    if fixture["expected"] is None:
+        assert result is None
+        return
+    assert result is not None
+    data, fixes = result
+    assert data == fixture["expected"]
+    if fixture.get("fixes") is not None:
+        assert fixes == fixture["fixes"]
+
+
+class MalformedModel(StubModel):
+    """Answers with fixed raw output, as tool input or (text=True) as a plain text reply."""
+
+    def __init__(self, raw: str, text: bool = False):
+        super().__init__(latency_ms=0, tokens_per_second=0)
+        self.raw = raw
+        self.text = text
+
+    def _tool_input(self, tool_name, prompt):
+        return self.raw
+
+    async def stream(self, messages, tool_specs=None, system_prompt=None, **kwargs):
+        if not self.text:
+            async for event in super().stream(messages, tool_specs, system_prompt, **kwargs):
+                yield event
+            return
+        self.calls += 1
+        yield {"messageStart": {"role": "assistant"}}
+        yield {"contentBlockDelta": {"delta": {"text": self.raw}}}
+        yield {"contentBlockStop": {}}
+        yield {"messageStop": {"stopReason": "end_turn"}}
+        yield {"metadata": {"usage": {"inputTokens": 1, "outputTokens": 1, "totalTokens": 2}, "metrics": {"latencyMs": 0}}}
+
+
+def run_agent(model):
+    instruction_builder_agent.set_model_factory(lambda tier: model)
+    try:
+        agent = create_instruction_agent(instruction_builder_agent.INSTRUCTION_GENERATION_PROMPT)
+        return agent("Generate instructions").structured_output
+    finally:
+        instruction_builder_agent.set_model_factory(None)
+
+
+def test_repairing_model_fixes_malformed_tool_input_in_one_call():
+    model = MalformedModel('```json\n{"instructions": "Rest.\nWalk daily.", "reasoning": "Day 1.",}\n```')
+    output = run_agent(model)
+    assert output == InstructionResponse(instructions="Rest.\nWalk daily.", reasoning="Day 1.")
+    assert model.calls == 1
+
+
+def test_repairing_model_turns_a_text_answer_into_the_tool_call():
+    text = "Rest with your leg raised and walk a little every few hours. Call your doctor for a fever."
+    model = MalformedModel(text, text=True)
+    output = run_agent(model)
+    assert output == InstructionResponse(instructions=text, reasoning="")
+    assert model.calls == 1
+
+
+def test_output_repair_hook_fits_a_wrongly_shaped_tool_input_in_one_call():
+    # Valid JSON, so it reaches the tool call unrepaired; the hook fits the fields before validation.
+    model = MalformedModel(json.dumps({"instructions": "Rest."}))
+    output = run_agent(model)
+    assert output == InstructionResponse(instructions="Rest.", reasoning="")
+    assert model.calls == 1
@@ -0,0 +1,51 @@
+import instruction_builder_agent
+from instruction_builder_agent import compact_procedure_history
+
+
+def summary_lines(history):
+    # Twelve copies of each entry overflow the budget, so they are collapsed into one line.
+    history = history * 12
+    lines, report = compact_procedure_history(history, token_budget=40, verbatim_entries=0)
+    assert report["collapsed"] == len(history)
+    return lines
+
+
+def test_group_with_undated_entries_never_shows_an_open_range():
+    history = [
+        {"type": "Wound check", "perform_at": "2024-03-01"},
+        {"type": "Wound check", "perform_at": "2024-01-15"},
+        {"type": "Wound check"},
+    ]
+    (line,) = summary_lines(history)
+    assert line == "  - wound check x36 (2024-01-15 to 2024-03-01, 12 undated)"
+
+
+def test_group_without_dates_is_marked_undated():
+    (line,) = summary_lines([{"type": "Wound check"}, {"type": "Wound check", "perform_at": None}])
+    assert line == "  - wound check x24 (undated)"
+    assert " to )" not in line
+
+
+def test_single_date_group():
+    (line,) = summary_lines([{"type": "X-ray", "perform_at": "2024-02-02T10:00:00"}])
+    assert line == "  - x-ray x12 (2024-02-02)"
+
+
+def test_over_budget_history_formats_only_the_kept_lines(monkeypatch):
+    history = [
+        {"id": i, "type": ["Dialysis", "dialysis", "X-ray"][i % 3], "perform_at": f"2024-01-{i % 28 + 1:02d}"}
+        for i in range(3000)
+    ]
+    expected_chars = sum(len(instruction_builder_agent._format_history_entry(h)) + 1 for h in history)
+    formatted = []
+    format_entry = instruction_builder_agent._format_history_entry
+    monkeypatch.setattr(
+        instruction_builder_agent, "_format_history_entry", lambda entry: formatted.append(entry) or format_entry(entry)
+    )
+    lines, report = compact_procedure_history(history, token_budget=60, verbatim_entries=3)
+    assert len(formatted) == 3
+    # Newest first; equal dates keep their order in the history.
+    assert lines[:3] == [format_entry(history[i]) for i in (27, 55, 83)]
+    assert lines[3:] == ["  - dialysis x1998 (2024-01-01 to 2024-01-28)", "  - x-ray x999 (2024-01-01 to 2024-01-28)"]
+    assert (report["verbatim"], report["collapsed"], report["omitted"]) == (3, 2997, 0)
+    assert report["dropped_chars"] == expected_chars - sum(len(line) + 1 for line in lines)
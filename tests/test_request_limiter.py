@@ -0,0 +1,177 @@
+import asyncio
+import time
+
+import pytest
+
+from hedging import DeadlineExceeded, deadline_after_ms
+from request_limiter import PRIORITY_HIGH, PRIORITY_LOW, PRIORITY_NORMAL, AdmissionRejected, InflightLimiter
+
+
+def test_queued_wait_stops_at_deadline():
+    limiter = InflightLimiter(1, max_queue=4)
+
+    async def run():
+        await limiter.acquire()
+        started = time.monotonic()
+        with pytest.raises(DeadlineExceeded):
+            await limiter.acquire(deadline=deadline_after_ms(400))
+        waited = time.monotonic() - started
+        limiter.release()
+        return waited
+
+    waited = asyncio.run(run())
+    assert waited < 0.4
+    stats = limiter.stats()
+    assert stats["deadline_exceeded"] == 1
+    assert stats["queue_depth"] == 0
+    assert stats["in_flight"] == 0
+
+
+def test_slot_freed_after_deadline_goes_to_next_waiter():
+    limiter = InflightLimiter(1, max_queue=4)
+
+    async def run():
+        await limiter.acquire()
+        late = asyncio.ensure_future(limiter.acquire(deadline=deadline_after_ms(300)))
+        patient = asyncio.ensure_future(limiter.acquire())
+        await asyncio.gather(late, return_exceptions=True)
+        limiter.release()
+        await asyncio.wait_for(patient, 1)
+        limiter.release()
+
+    asyncio.run(run())
+    assert limiter.stats()["in_flight"] == 0
+
+
+def test_cancel_during_grant_does_not_leak_the_slot():
+    limiter = InflightLimiter(1, max_queue=4)
+
+    async def run():
+        await limiter.acquire()
+        waiter = asyncio.ensure_future(limiter.acquire(deadline=deadline_after_ms(5000)))
+        await asyncio.sleep(0.01)
+        # The cancellation is delivered first, then release() picks the (still pending) waiter.
+        waiter.cancel()
+        limiter.release()
+        await asyncio.gather(waiter, return_exceptions=True)
+        await asyncio.sleep(0.01)
+        await asyncio.wait_for(limiter.acquire(), 1)
+        limiter.release()
+
+    asyncio.run(run())
+    stats = limiter.stats()
+    assert stats["in_flight"] == 0
+    assert stats["queue_depth"] == 0
+
+
+def test_cancelled_after_shed_does_not_release_a_slot_it_never_held():
+    limiter = InflightLimiter(1, max_queue=1)
+
+    async def run():
+        await limiter.acquire()
+        low = asyncio.ensure_future(limiter.acquire(priority=2, deadline=deadline_after_ms(5000)))
+        await asyncio.sleep(0.01)
+        high = asyncio.ensure_future(limiter.acquire(priority=0))
+        await asyncio.sleep(0)
+        # The shed is delivered to `low` before the cancellation reaches it.
+        low.cancel()
+        await asyncio.gather(low, return_exceptions=True)
+        assert limiter.stats()["in_flight"] == 1
+        limiter.release()
+        await asyncio.wait_for(high, 1)
+        limiter.release()
+
+    asyncio.run(run())
+    stats = limiter.stats()
+    assert stats["in_flight"] == 0
+    assert stats["shed"] == 1
+
+
+def test_waiters_are_admitted_by_priority_then_arrival():
+    limiter = InflightLimiter(1)
+    admitted = []
+
+    async def request(name, priority):
+        await limiter.acquire(priority)
+        admitted.append(name)
+
+    async def run():
+        await limiter.acquire()
+        tasks = []
+        for name, priority in (("low", PRIORITY_LOW), ("normal-1", PRIORITY_NORMAL), ("high", PRIORITY_HIGH),
+                               ("normal-2", PRIORITY_NORMAL)):
+            tasks.append(asyncio.ensure_future(request(name, priority)))
+            await asyncio.sleep(0)
+        for _ in tasks:
+            limiter.release()
+            await asyncio.sleep(0.01)
+        await asyncio.gather(*tasks)
+        limiter.release()
+
+    asyncio.run(run())
+    assert admitted == ["high", "normal-1", "normal-2", "low"]
+    assert limiter.stats()["in_flight"] == 0
+
+
+def test_full_queue_sheds_the_newest_lower_priority_waiter():
+    limiter = InflightLimiter(1, max_queue=2)
+
+    async def run():
+        await limiter.acquire()
+        older = asyncio.ensure_future(limiter.acquire(PRIORITY_LOW))
+        await asyncio.sleep(0)
+        newer = asyncio.ensure_future(limiter.acquire(PRIORITY_LOW))
+        await asyncio.sleep(0)
+        urgent = asyncio.ensure_future(limiter.acquire(PRIORITY_HIGH))
+        with pytest.raises(AdmissionRejected):
+            await asyncio.wait_for(newer, 1)
+        # Nothing below HIGH is left to shed for another LOW request: it is rejected outright.
+        with pytest.raises(AdmissionRejected):
+            await limiter.acquire(PRIORITY_LOW)
+        limiter.release()
+        await asyncio.wait_for(urgent, 1)
+        assert not older.done()
+        limiter.release()
+        await asyncio.wait_for(older, 1)
+        limiter.release()
+
+    asyncio.run(run())
+    stats = limiter.stats()
+    assert (stats["shed"], stats["rejected"], stats["in_flight"], stats["queue_depth"]) == (1, 1, 0, 0)
+    assert stats["by_priority"][PRIORITY_LOW]["shed"] == 1
+    assert stats["by_priority"][PRIORITY_LOW]["rejected"] == 1
+    assert stats["by_priority"][PRIORITY_HIGH]["waited"] == 1
+
+
+def test_retry_after_scales_with_measured_hold_time_and_queue_depth():
+    limiter = InflightLimiter(2, max_queue=2)
+
+    async def rejection():
+        try:
+            await limiter.acquire()
+        except AdmissionRejected as e:
+            return e.retry_after
+        raise AssertionError("request was admitted")
+
+    async def run():
+        await limiter.acquire()
+        await limiter.acquire()
+        queued = [asyncio.ensure_future(limiter.acquire()) for _ in range(2)]
+        await asyncio.sleep(0)
+        # No request measured yet: 1s per request, (2 waiting + this one) over 2 slots.
+        assert await rejection() == 1.5
+        limiter.release(held=3.0)
+        limiter.release(held=1.0)
+        await asyncio.gather(*queued)
+        queued = [asyncio.ensure_future(limiter.acquire()) for _ in range(2)]
+        await asyncio.sleep(0)
+        # Moving average of the holds: 3.0 + 0.2 * (1.0 - 3.0) = 2.6s.
+        assert await rejection() == 3.9
+        for _ in range(2):
+            limiter.release(held=0.001)
+        await asyncio.gather(*queued)
+        limiter.release(held=0.001)
+        limiter.release(held=0.001)
+
+    asyncio.run(run())
+    assert limiter.stats()["in_flight"] == 0
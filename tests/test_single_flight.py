@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+
+from single_flight import SingleFlight, payload_fingerprint
+
+
+def test_concurrent_callers_share_one_computation():
+    flight = SingleFlight()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"instructions": "text"}
+
+    async def run():
+        return await asyncio.gather(*(flight.run("key", compute) for _ in range(5)))
+
+    results = asyncio.run(run())
+    assert len(calls) == 1
+    assert all(result == {"instructions": "text"} for result in results)
+    # Followers get copies, so one caller changing its response does not affect the others.
+    assert len({id(result) for result in results}) == 5
+    assert flight.stats() == {"in_flight": 0, "peak_in_flight": 1, "leaders": 1, "coalesced": 4, "reruns": 0}
+
+
+def test_leader_failure_reaches_followers_and_key_is_forgotten():
+    flight = SingleFlight()
+    calls = []
+
+    async def failing():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        raise ValueError("model failed")
+
+    async def run():
+        outcomes = await asyncio.gather(*(flight.run("key", failing) for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(outcome, ValueError) for outcome in outcomes)
+
+        async def ok():
+            return "fresh"
+
+        return await flight.run("key", ok)
+
+    assert asyncio.run(run()) == "fresh"
+    assert len(calls) == 1
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_cancelled_leader_fails_followers_without_cancelling_them():
+    flight = SingleFlight()
+
+    async def slow():
+        await asyncio.sleep(5)
+
+    async def run():
+        leader = asyncio.ensure_future(flight.run("key", slow))
+        await asyncio.sleep(0.01)
+        follower = asyncio.ensure_future(flight.run("key", slow))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(RuntimeError, match="cancelled"):
+            await follower
+
+    asyncio.run(run())
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_rerun_predicate_lets_a_follower_compute_for_itself():
+    flight = SingleFlight()
+
+    async def run():
+        async def leader_call():
+            await asyncio.sleep(0.05)
+            raise TimeoutError("leader deadline")
+
+        async def follower_call():
+            return "own result"
+
+        leader = asyncio.ensure_future(flight.run("key", leader_call))
+        await asyncio.sleep(0.01)
+        follower = await flight.run("key", follower_call, rerun=lambda outcome: isinstance(outcome, TimeoutError))
+        with pytest.raises(TimeoutError):
+            await leader
+        return follower
+
+    assert asyncio.run(run()) == "own result"
+    assert flight.stats()["reruns"] == 1
+
+
+def test_payload_fingerprint_is_stable():
+    payload = {"type": "instruction_generation", "context": {"procedure_type": "knee", "days_post_op": 3}}
+    reordered = {"context": {"days_post_op": 3, "procedure_type": "knee"}, "type": "instruction_generation"}
+    assert payload_fingerprint(payload) == payload_fingerprint(reordered)
+    assert payload_fingerprint(payload) == payload_fingerprint({**payload, "session_id": None})
+    assert payload_fingerprint(payload, ignore=("stream",)) == payload_fingerprint(
+        {**payload, "stream": True}, ignore=("stream",)
+    )
+    assert payload_fingerprint(payload) != payload_fingerprint({**payload, "stream": True})
+    assert payload_fingerprint(payload) != payload_fingerprint(
+        {**payload, "context": {**payload["context"], "days_post_op": 4}}
+    )
+    assert payload_fingerprint({"message": "café"}) == payload_fingerprint({"message": "café"})
+    # Known digest: the canonical form must not drift between releases (it keys coalescing and the store).
+    assert payload_fingerprint({"a": 1}) == "015abd7f5cc57a2dd94b7590f04ad8084273905ee33ec5cebeae62276a97f862"